@@ -0,0 +1,179 @@
+"""
+Benchmark for loading PETSc HDF5 files
+
+Builds a synthetic DMPlex dump of a structured 2D quad mesh and times how
+long `PetscHDF5Reader` takes to load it. For comparison, the points and
+cells of the mesh are also built one at a time, the way the reader did it
+before it used NumPy arrays.
+
+Usage:
+    python benchmarks/bench_petsc_hdf5_reader.py [-n N] [--keep FILE]
+                                                 [--no-baseline]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import h5py
+import numpy as np
+import vtk
+
+
+def write_quad_mesh(file_name, n):
+    """
+    Write an `n` x `n` quad mesh in the layout produced by PETSc's DMView
+    with the HDF5 viewer. DAG points are numbered: cells, vertices, edges.
+    """
+    nc = n * n
+    nv = (n + 1) * (n + 1)
+    n_hedges = n * (n + 1)
+    n_vedges = (n + 1) * n
+    ne = n_hedges + n_vedges
+
+    v0 = nc
+    e0 = nc + nv
+
+    x, y = np.meshgrid(np.linspace(0., 1., n + 1), np.linspace(0., 1., n + 1))
+    vertices = np.column_stack([x.ravel(), y.ravel()])
+
+    # vertex indices of quad corners
+    i, j = np.meshgrid(np.arange(n), np.arange(n))
+    i = i.ravel()
+    j = j.ravel()
+    ll = j * (n + 1) + i
+    conn = np.column_stack([ll, ll + 1, ll + n + 2, ll + n + 1])
+
+    # horizontal edges (i, j) -> vertices (j, i), (j, i + 1)
+    hi, hj = np.meshgrid(np.arange(n), np.arange(n + 1))
+    h_start = (hj * (n + 1) + hi).ravel()
+    h_edges = np.column_stack([h_start, h_start + 1])
+    # vertical edges (i, j) -> vertices (j, i), (j + 1, i)
+    vi, vj = np.meshgrid(np.arange(n + 1), np.arange(n))
+    v_start = (vj * (n + 1) + vi).ravel()
+    v_edges = np.column_stack([v_start, v_start + n + 1])
+    edge_verts = np.vstack([h_edges, v_edges]) + v0
+
+    # cell -> bottom, right, top, left edge
+    bottom = j * n + i
+    top = (j + 1) * n + i
+    left = n_hedges + j * (n + 1) + i
+    right = left + 1
+    cell_edges = np.column_stack([bottom, right, top, left]) + e0
+
+    cones = np.concatenate([
+        np.full(nc, 4), np.zeros(nv, dtype=int), np.full(ne, 2)])
+    cells = np.concatenate([cell_edges.ravel(), edge_verts.ravel()])
+
+    with h5py.File(file_name, 'w') as f:
+        f.create_dataset('geometry/vertices', data=vertices)
+        f.create_dataset('topology/cells', data=cells.astype(np.int32))
+        f.create_dataset('topology/cones', data=cones.astype(np.int32))
+        f.create_dataset('topology/orientation',
+                         data=np.zeros(cells.shape[0], dtype=np.int32))
+
+        celltype = f.create_group('labels/celltype')
+        celltype.create_dataset('0/indices', data=np.arange(v0, v0 + nv))
+        celltype.create_dataset('1/indices', data=np.arange(e0, e0 + ne))
+        celltype.create_dataset('4/indices', data=np.arange(0, nc))
+
+        face_sets = f.create_group('labels/Face Sets')
+        face_sets.create_dataset('1/indices', data=np.arange(e0, e0 + n))
+
+        viz_cells = f.create_dataset('viz/topology/cells',
+                                     data=conn.astype(np.int32))
+        viz_cells.attrs['cell_corners'] = 4
+        viz_cells.attrs['cell_dim'] = 2
+
+        u = f.create_dataset('vertex_fields/u', data=vertices[:, 0])
+        u.attrs['vector_field_type'] = b'scalar'
+        p = f.create_dataset('cell_fields/p', data=np.arange(nc, dtype=float))
+        p.attrs['vector_field_type'] = b'scalar'
+
+    return nc, nv
+
+
+def build_per_element(file_name):
+    """
+    Build the points and cells of the mesh one at a time like the reader
+    did before it used NumPy arrays (the baseline)
+
+    @return vtkUnstructuredGrid
+    """
+    with h5py.File(file_name, 'r') as f:
+        vertices = f['geometry']['vertices']
+        cells = f['viz']['topology']['cells']
+        dim = vertices.shape[1]
+        n_points = len(f['labels']['celltype']['0']['indices'])
+
+        block = vtk.vtkUnstructuredGrid()
+        point_array = vtk.vtkPoints()
+        for i in range(n_points):
+            pt = [0, 0, 0]
+            for j in range(dim):
+                pt[j] = vertices[i][j]
+            point_array.InsertPoint(i, pt)
+        block.SetPoints(point_array)
+
+        n_cells = cells.shape[0]
+        cell_array = vtk.vtkCellArray()
+        for i in range(n_cells):
+            connectivity = cells[i]
+            elem = getattr(vtk, 'vtkQuad')()
+            for j in range(4):
+                elem.GetPointIds().SetId(j, connectivity[j])
+            cell_array.InsertNextCell(elem)
+        block.SetCells(vtk.VTK_QUAD, cell_array)
+    return block
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', type=int, default=1000,
+                        help='Number of cells in each direction')
+    parser.add_argument('--keep', default=None,
+                        help='Write the synthetic mesh to this file')
+    parser.add_argument('--no-baseline', action='store_true',
+                        help='Do not build the mesh one element at a time')
+    args = parser.parse_args()
+
+    from otter.plugins.common.PetscHDF5Reader import PetscHDF5Reader
+
+    if args.keep is None:
+        fd, file_name = tempfile.mkstemp(suffix='.h5')
+        os.close(fd)
+    else:
+        file_name = args.keep
+
+    try:
+        start = time.perf_counter()
+        nc, nv = write_quad_mesh(file_name, args.n)
+        print("Wrote {:,} cells, {:,} vertices in {:.2f} s".format(
+            nc, nv, time.perf_counter() - start))
+
+        reader = PetscHDF5Reader(file_name)
+        start = time.perf_counter()
+        reader.load()
+        elapsed = time.perf_counter() - start
+        print("Loaded {:,} cells, {:,} nodes in {:.2f} s".format(
+            reader.getTotalNumberOfElements(),
+            reader.getTotalNumberOfNodes(),
+            elapsed))
+
+        if not args.no_baseline:
+            start = time.perf_counter()
+            block = build_per_element(file_name)
+            baseline = time.perf_counter() - start
+            print("Baseline: built {:,} cells, {:,} nodes one at a time "
+                  "in {:.2f} s ({:.0f}x slower)".format(
+                      block.GetNumberOfCells(),
+                      block.GetNumberOfPoints(),
+                      baseline,
+                      baseline / elapsed))
+    finally:
+        if args.keep is None:
+            os.remove(file_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+import collections
+import vtk
+import numpy as np
+from vtk.util import numpy_support
+from PyQt5 import QtGui
+import otter.plugins.common as common
+
+ExtractedBlock = collections.namedtuple(
+    'ExtractedBlock', [
+        'geometry', 'info', 'bounds'
+    ])
+
+
+class BlockExtractor:
+    """
+    Extracts surface geometry of mesh blocks, side sets and node sets from
+    a reader output.
+
+    The data set tree is walked only once, so the cost of extracting a block
+    does not depend on the number of blocks in the file. This is meant to
+    run in the load thread, so the GUI thread gets ready-made polydata.
+    """
+
+    # Name of the cell array with block indices in merged geometry
+    BLOCK_INDEX = 'otter_block_index'
+
+    def __init__(self, data_object):
+        """
+        @param data_object Output of a reader (a composite data set or a
+                           single data set)
+        """
+        self._data_object = data_object
+        # flat index -> data object
+        self._nodes = {}
+        self._buildIndex()
+
+    def _buildIndex(self):
+        if not isinstance(self._data_object, vtk.vtkDataObjectTree):
+            return
+        it = self._data_object.NewTreeIterator()
+        it.VisitOnlyLeavesOff()
+        it.SkipEmptyNodesOn()
+        it.InitTraversal()
+        while not it.IsDoneWithTraversal():
+            self._nodes[it.GetCurrentFlatIndex()] = \
+                it.GetCurrentDataObject()
+            it.GoToNextItem()
+
+    def _leaves(self, index):
+        """
+        Get the data sets stored under a flat index
+
+        @param index Flat index (as used by vtkExtractBlock::AddIndex) or
+                     `None` for the whole data object
+        """
+        if index is None or index == 0:
+            obj = self._data_object
+        else:
+            obj = self._nodes.get(index)
+
+        if obj is None:
+            return []
+        elif isinstance(obj, vtk.vtkDataObjectTree):
+            leaves = []
+            it = obj.NewTreeIterator()
+            it.InitTraversal()
+            while not it.IsDoneWithTraversal():
+                leaves.append(it.GetCurrentDataObject())
+                it.GoToNextItem()
+            return leaves
+        else:
+            return [obj]
+
+    def extract(self, index):
+        """
+        Extract the surface of the data stored under a flat index
+
+        @param index Flat index of the block or `None` for the whole data
+                     object
+        @return ExtractedBlock
+        """
+        leaves = self._leaves(index)
+
+        n_cells = 0
+        n_points = 0
+        glob_min = QtGui.QVector3D(float('inf'), float('inf'), float('inf'))
+        glob_max = QtGui.QVector3D(float('-inf'), float('-inf'), float('-inf'))
+        surfaces = []
+        for ds in leaves:
+            n_cells += ds.GetNumberOfCells()
+            n_points += ds.GetNumberOfPoints()
+            bnd = ds.GetBounds()
+            glob_min = common.point_min(
+                QtGui.QVector3D(bnd[0], bnd[2], bnd[4]), glob_min)
+            glob_max = common.point_max(
+                QtGui.QVector3D(bnd[1], bnd[3], bnd[5]), glob_max)
+
+            # only the boundary faces of 3D cells are kept, interior faces
+            # are never sent to the mappers
+            geometry = vtk.vtkGeometryFilter()
+            geometry.SetInputData(ds)
+            geometry.Update()
+            surfaces.append(geometry.GetOutput())
+
+        if len(surfaces) == 0:
+            polydata = vtk.vtkPolyData()
+        elif len(surfaces) == 1:
+            polydata = surfaces[0]
+        else:
+            append = vtk.vtkAppendPolyData()
+            for surface in surfaces:
+                append.AddInputData(surface)
+            append.Update()
+            polydata = append.GetOutput()
+
+        info = {
+            'cells': n_cells,
+            'points': n_points
+        }
+        return ExtractedBlock(geometry=polydata, info=info,
+                              bounds=(glob_min, glob_max))
+
+    @staticmethod
+    def merge(blocks):
+        """
+        Merge surfaces of extracted blocks into a single polydata. Only
+        points and cells are kept, plus a cell array named `BLOCK_INDEX`
+        holding the position of the block in `blocks`.
+
+        @param blocks List of ExtractedBlock
+        @return vtkPolyData
+        """
+        id_type = numpy_support.get_numpy_array_type(vtk.VTK_ID_TYPE)
+        points = []
+        n_points = 0
+        # verts, lines, polys, strips: lists of offsets, connectivity and
+        # block indices
+        cells = [([], [], []) for i in range(4)]
+        for index, block in enumerate(blocks):
+            pd = block.geometry
+            if pd.GetNumberOfPoints() == 0:
+                continue
+            points.append(numpy_support.vtk_to_numpy(pd.GetPoints().GetData()))
+            cell_arrays = [
+                pd.GetVerts(), pd.GetLines(), pd.GetPolys(), pd.GetStrips()
+            ]
+            for ca, (offsets, conn, block_index) in zip(cell_arrays, cells):
+                n_cells = ca.GetNumberOfCells()
+                if n_cells == 0:
+                    continue
+                offsets.append(
+                    numpy_support.vtk_to_numpy(ca.GetOffsetsArray())[:-1])
+                conn.append(
+                    numpy_support.vtk_to_numpy(ca.GetConnectivityArray()) +
+                    n_points)
+                block_index.append(np.full(n_cells, index, dtype=np.int32))
+            n_points += pd.GetNumberOfPoints()
+
+        polydata = vtk.vtkPolyData()
+        if n_points == 0:
+            return polydata
+
+        pts = vtk.vtkPoints()
+        pts.SetData(numpy_support.numpy_to_vtk(
+            np.concatenate(points), deep=True))
+        polydata.SetPoints(pts)
+
+        all_block_index = []
+        cell_arrays = []
+        for offsets, conn, block_index in cells:
+            ca = vtk.vtkCellArray()
+            if len(offsets) > 0:
+                # shift offsets of each block by the size of connectivity
+                # of the blocks in front of it
+                sizes = [len(c) for c in conn]
+                shifts = np.cumsum([0] + sizes[:-1])
+                offs = np.concatenate(
+                    [o + s for o, s in zip(offsets, shifts)] +
+                    [np.array([sum(sizes)])])
+                ca.SetData(
+                    numpy_support.numpy_to_vtkIdTypeArray(
+                        offs.astype(id_type), deep=True),
+                    numpy_support.numpy_to_vtkIdTypeArray(
+                        np.concatenate(conn).astype(id_type), deep=True))
+                all_block_index.extend(block_index)
+            cell_arrays.append(ca)
+        polydata.SetVerts(cell_arrays[0])
+        polydata.SetLines(cell_arrays[1])
+        polydata.SetPolys(cell_arrays[2])
+        polydata.SetStrips(cell_arrays[3])
+
+        block_index = numpy_support.numpy_to_vtk(
+            np.concatenate(all_block_index), deep=True)
+        block_index.SetName(BlockExtractor.BLOCK_INDEX)
+        polydata.GetCellData().AddArray(block_index)
+
+        return polydata
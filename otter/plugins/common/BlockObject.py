@@ -1,5 +1,4 @@
 import vtk
-from PyQt5 import QtGui
 import otter.plugins.common as common
 
 
@@ -8,21 +7,20 @@ class BlockObject:
     Object that encapualates VTK around a mesh block
     """
 
-    def __init__(self, eb, camera):
-        do = eb.GetOutput()
-        self._bounds = self._computeBounds(do)
-
-        self._info = {
-            'cells': do.GetNumberOfCells(),
-            'points': do.GetNumberOfPoints(),
-        }
-
-        self._geometry = vtk.vtkCompositeDataGeometryFilter()
-        self._geometry.SetInputConnection(0, eb.GetOutputPort(0))
-        self._geometry.Update()
+    def __init__(self, block, camera):
+        """
+        @param block ExtractedBlock produced by BlockExtractor
+        @param camera vtkCamera used for the silhouette
+        """
+        self._bounds = block.bounds
+        self._info = block.info
+        # Boundary surface of the block. It is computed once and shared by
+        # all render modes (including the silhouette), so switching modes
+        # only changes actor properties.
+        self._geometry = block.geometry
 
         self._mapper = vtk.vtkPolyDataMapper()
-        self._mapper.SetInputConnection(self._geometry.GetOutputPort())
+        self._mapper.SetInputData(self._geometry)
         self._mapper.SetScalarModeToUsePointFieldData()
         self._mapper.InterpolateScalarsBeforeMappingOn()
 
@@ -42,9 +40,11 @@ class BlockObject:
         self._setUpSilhouette(camera)
 
     def _setUpSilhouette(self, camera):
+        # the input is connected when the silhouette is shown for the first
+        # time, so blocks that never show it do not pay for it
         self._silhouette = vtk.vtkPolyDataSilhouette()
-        self._silhouette.SetInputData(self._mapper.GetInput())
         self._silhouette.SetCamera(camera)
+        self._silhouette_connected = False
 
         self._silhouette_mapper = vtk.vtkPolyDataMapper()
         self._silhouette_mapper.SetInputConnection(
@@ -109,32 +109,13 @@ class BlockObject:
 
     def setSilhouetteVisible(self, visible):
         if visible:
+            if not self._silhouette_connected:
+                self._silhouette.SetInputData(self._geometry)
+                self._silhouette_connected = True
             self._silhouette_actor.VisibilityOn()
         else:
             self._silhouette_actor.VisibilityOff()
 
-    def _computeBounds(self, data_object):
-        glob_min = QtGui.QVector3D(float('inf'), float('inf'), float('inf'))
-        glob_max = QtGui.QVector3D(float('-inf'), float('-inf'), float('-inf'))
-        for i in range(data_object.GetNumberOfBlocks()):
-            current = data_object.GetBlock(i)
-            if isinstance(current, vtk.vtkUnstructuredGrid):
-                bnd = current.GetBounds()
-                bnd_min = QtGui.QVector3D(bnd[0], bnd[2], bnd[4])
-                bnd_max = QtGui.QVector3D(bnd[1], bnd[3], bnd[5])
-                glob_min = common.point_min(bnd_min, glob_min)
-                glob_max = common.point_max(bnd_max, glob_max)
-
-            elif isinstance(current, vtk.vtkMultiBlockDataSet):
-                for j in range(current.GetNumberOfBlocks()):
-                    bnd = current.GetBlock(j).GetBounds()
-                    bnd_min = QtGui.QVector3D(bnd[0], bnd[2], bnd[4])
-                    bnd_max = QtGui.QVector3D(bnd[1], bnd[3], bnd[5])
-                    glob_min = common.point_min(bnd_min, glob_min)
-                    glob_max = common.point_max(bnd_max, glob_max)
-
-        return (glob_min, glob_max)
-
     # def add(self, vtk_renderer):
     #     vtk_renderer.AddViewProp(self._actor)
     #     vtk_renderer.AddViewProp(self._silhouette_actor)
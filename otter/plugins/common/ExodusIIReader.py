@@ -1,14 +1,42 @@
+import os
+import threading
 import vtk
 import otter.plugins.common as common
 from otter.plugins.common.Reader import Reader
 from otter.plugins.common.Reader import BlockInformation, VariableInformation
+from otter.plugins.common.TimeStepCache import TimeStepCache
 
 
 class ExodusIIReader(Reader):
     """
     ExodusII file reader
+
+    The output is a copy of the output of the VTK reader, so that values of
+    time steps can be swapped into it from a cache without re-reading the
+    file. Values of time steps that were shown or prefetched are kept in a
+    `TimeStepCache`. Prefetching reads time steps in a worker thread with its
+    own VTK reader.
     """
 
+    # Size of the cache of values of time steps in MiB
+    CACHE_SIZE = 1024
+
+    OBJECT_TYPES = [
+        vtk.vtkExodusIIReader.ELEM_BLOCK,
+        vtk.vtkExodusIIReader.FACE_BLOCK,
+        vtk.vtkExodusIIReader.EDGE_BLOCK,
+        vtk.vtkExodusIIReader.ELEM_SET,
+        vtk.vtkExodusIIReader.SIDE_SET,
+        vtk.vtkExodusIIReader.FACE_SET,
+        vtk.vtkExodusIIReader.EDGE_SET,
+        vtk.vtkExodusIIReader.NODE_SET
+    ]
+
+    VARIABLE_TYPES = [
+        vtk.vtkExodusIIReader.NODAL,
+        vtk.vtkExodusIIReader.ELEM_BLOCK
+    ]
+
     def __init__(self, file_name):
         super().__init__(file_name)
         self._reader = None
@@ -16,45 +44,86 @@ class ExodusIIReader(Reader):
         self._block_info = dict()
         self._variable_info = dict()
         self._times = None
+        self._time_step = None
+        # variable name -> number of users that enabled it
+        self._variable_refs = dict()
+        # True if points move in time
+        self._displaced = False
+        # (size, modification time) of the file when it was last read
+        self._signature = None
 
-    def load(self):
+        self._cache = TimeStepCache(self.CACHE_SIZE)
+        self._output = vtk.vtkMultiBlockDataSet()
+        self._producer = vtk.vtkTrivialProducer()
+        self._producer.SetOutput(self._output)
+
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_steps = []
+        self._prefetch_names = []
+        self._prefetch_thread = None
+        self._prefetch_reader = None
+
+    def loadMetadata(self):
+        """
+        Read block, set and variable names and the totals from the file
+        header without reading any geometry
+        """
         self._reader = vtk.vtkExodusIIReader()
+        self._observeProgress(self._reader)
 
         with common.lock_file(self._file_name):
+            self._signature = self._fileSignature()
+            # reads the file information, so block and variable names are
+            # available right after it
             self._readTimeInfo()
 
-            self._reader.SetFileName(self._file_name)
             if self._times is not None:
-                self._reader.SetTimeStep(self._time_steps[-1])
-            self._reader.UpdateInformation()
-            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.NODAL, 1)
-            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.ELEM_BLOCK, 1)
-            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.GLOBAL, 1)
-            self._reader.Update()
+                self._time_step = self._time_steps[-1]
+                self._reader.SetTimeStep(self._time_step)
+            # only geometry is loaded by `load`, variables are loaded on
+            # demand via `enableVariable`
+            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.NODAL, 0)
+            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.ELEM_BLOCK, 0)
+            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.GLOBAL, 0)
 
             self._readBlockInfo()
+            self._readVariableInfo()
+
+        # the VTK reader moves points by the displacement vector (a nodal
+        # variable whose name starts with 'dis')
+        self._displaced = bool(self._reader.GetApplyDisplacements()) and any(
+            vi.object_type == Reader.VAR_NODAL and
+            vi.name.lower().startswith('dis')
+            for vi in self._variable_info.values())
+        return True
+
+    def load(self):
+        if self._reader is None:
+            self.loadMetadata()
+
+        with common.lock_file(self._file_name):
             for obj_type, data in self._block_info.items():
                 for info in data.values():
                     self._reader.SetObjectStatus(
                         info.object_type, info.object_index, 1)
-            self._readVariableInfo()
+            self._reader.Update()
+        self._updateOutput()
 
-    def _readBlockInfo(self):
-        object_types = [
-            vtk.vtkExodusIIReader.ELEM_BLOCK,
-            vtk.vtkExodusIIReader.FACE_BLOCK,
-            vtk.vtkExodusIIReader.EDGE_BLOCK,
-            vtk.vtkExodusIIReader.ELEM_SET,
-            vtk.vtkExodusIIReader.SIDE_SET,
-            vtk.vtkExodusIIReader.FACE_SET,
-            vtk.vtkExodusIIReader.EDGE_SET,
-            vtk.vtkExodusIIReader.NODE_SET
-        ]
+    def _updateOutput(self):
+        """
+        Pass the output of the VTK reader on and cache its values
+        """
+        self._output.ShallowCopy(self._reader.GetOutput())
+        if self._time_step is not None:
+            names = list(self._variable_refs.keys())
+            self._cache.put(self._time_step, names, TimeStepCache.extract(
+                self._output, names, self._displaced))
 
+    def _readBlockInfo(self):
         # Index to be used with the vtkExtractBlock::AddIndex method
         index = 0
         # Loop over all blocks of the vtk.MultiBlockDataSet
-        for obj_type in object_types:
+        for obj_type in self.OBJECT_TYPES:
             index += 1
             self._block_info[obj_type] = dict()
             for j in range(self._reader.GetNumberOfObjects(obj_type)):
@@ -104,8 +173,232 @@ class ExodusIIReader(Reader):
             self._times = times
             self._time_steps = steps
 
+    def _exodusVariableType(self, name):
+        vinfo = self._variable_info[name]
+        if vinfo.object_type == Reader.VAR_NODAL:
+            return vtk.vtkExodusIIReader.NODAL
+        else:
+            return vtk.vtkExodusIIReader.ELEM_BLOCK
+
+    def enableVariable(self, name):
+        if name not in self._variable_info:
+            return
+        refs = self._variable_refs.get(name, 0)
+        self._variable_refs[name] = refs + 1
+        if refs == 0:
+            self._reader.SetObjectArrayStatus(
+                self._exodusVariableType(name), name, 1)
+            with common.lock_file(self._file_name):
+                self._reader.Update()
+            self._updateOutput()
+
+    def disableVariable(self, name):
+        refs = self._variable_refs.get(name, 0)
+        if refs == 0:
+            return
+        elif refs == 1:
+            # nobody uses the variable anymore, it is not read from now on
+            del self._variable_refs[name]
+            self._reader.SetObjectArrayStatus(
+                self._exodusVariableType(name), name, 0)
+            TimeStepCache.remove(self._output, [name])
+        else:
+            self._variable_refs[name] = refs - 1
+
+    def _structure(self, reader):
+        """
+        Describe the mesh and the variables in a file
+
+        @param reader vtkExodusIIReader with the file header read
+        @return Object that compares equal for files with the same mesh
+                and variables
+        """
+        objects = []
+        for obj_type in self.OBJECT_TYPES:
+            for j in range(reader.GetNumberOfObjects(obj_type)):
+                objects.append((
+                    obj_type,
+                    reader.GetObjectId(obj_type, j),
+                    reader.GetObjectName(obj_type, j),
+                    reader.GetNumberOfEntriesInObject(obj_type, j)))
+        variables = []
+        for var_type in self.VARIABLE_TYPES:
+            for i in range(reader.GetNumberOfObjectArrays(var_type)):
+                variables.append((
+                    var_type,
+                    reader.GetObjectArrayName(var_type, i),
+                    reader.GetNumberOfObjectArrayComponents(var_type, i)))
+        return reader.GetTotalNumberOfNodes(), objects, variables
+
+    def _fileSignature(self):
+        """
+        @return (size, modification time) of the file, cheap to compare
+                against the file that was read
+        """
+        stat = os.stat(self._file_name)
+        return stat.st_size, stat.st_mtime_ns
+
+    def update(self):
+        if self._reader is None:
+            return Reader.CHANGED
+
+        header = vtk.vtkExodusIIReader()
+        with common.lock_file(self._file_name):
+            signature = self._fileSignature()
+            if signature == self._signature:
+                return Reader.NOCHANGE
+            header.SetFileName(self._file_name)
+            header.UpdateInformation()
+        if self._structure(header) != self._structure(self._reader):
+            return Reader.CHANGED
+
+        old_times = self._times or []
+        at_end = self._time_step is None or \
+            self._time_step == len(old_times) - 1
+
+        # the prefetch thread has to be done with the old header
+        with self._prefetch_lock:
+            self._prefetch_steps = []
+            thread = self._prefetch_thread
+        if thread is not None:
+            thread.join()
+        self._prefetch_reader = None
+
+        with common.lock_file(self._file_name):
+            # the VTK reader reads the header again only for a new file
+            # name, which also resets what is read
+            self._reader.SetFileName('')
+            self._reader.SetFileName(self._file_name)
+            self._reader.UpdateInformation()
+            for data in self._block_info.values():
+                for info in data.values():
+                    self._reader.SetObjectStatus(
+                        info.object_type, info.object_index, 1)
+            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.NODAL, 0)
+            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.ELEM_BLOCK, 0)
+            self._reader.SetAllArrayStatus(vtk.vtkExodusIIReader.GLOBAL, 0)
+            for name in self._variable_refs.keys():
+                self._reader.SetObjectArrayStatus(
+                    self._exodusVariableType(name), name, 1)
+            self._readTimeInfo()
+        if self._time_step is not None:
+            self._reader.SetTimeStep(self._time_step)
+
+        times = self._times or []
+        if times == old_times or times[:len(old_times)] != old_times:
+            # the file was written anew or its values were rewritten
+            self._cache.clear()
+            if len(times) == 0:
+                # nothing but the mesh can have changed, e.g. moved points
+                return Reader.CHANGED
+            if times != old_times:
+                at_end = True
+
+        if len(times) == 0:
+            self._time_step = None
+        elif at_end or self._time_step >= len(times):
+            self._time_step = len(times) - 1
+        if self._time_step is not None:
+            self._reader.SetTimeStep(self._time_step)
+
+        # only variables and displaced points change in time, the mesh is
+        # read again only if they are needed
+        if self._displaced or len(self._variable_refs) > 0:
+            leaves = self._cache.get(
+                self._time_step, self._variable_refs.keys())
+            if leaves is None:
+                with common.lock_file(self._file_name):
+                    self._reader.Update()
+                self._updateOutput()
+            else:
+                TimeStepCache.apply(
+                    self._output, leaves, self._variable_refs.keys())
+        # only now the file counts as read, an update that failed or
+        # returned CHANGED is tried again
+        self._signature = signature
+        return Reader.APPENDED
+
+    def hasDisplacements(self):
+        return self._displaced
+
+    def getTimes(self):
+        return self._times
+
+    def getTimeStep(self):
+        return self._time_step
+
+    def setTimeStep(self, step):
+        if self._times is None or step == self._time_step:
+            return
+        self._time_step = step
+        # the VTK reader stays on the shown time step, so enabling a
+        # variable reads it for the right time
+        self._reader.SetTimeStep(step)
+        leaves = self._cache.get(step, self._variable_refs.keys())
+        if leaves is None:
+            with common.lock_file(self._file_name):
+                self._reader.Update()
+            self._updateOutput()
+        else:
+            TimeStepCache.apply(
+                self._output, leaves, self._variable_refs.keys())
+
+    def prefetch(self, steps):
+        if self._times is None:
+            return
+        names = list(self._variable_refs.keys())
+        steps = [s for s in steps
+                 if 0 <= s < len(self._times) and
+                 not self._cache.has(s, names)]
+        with self._prefetch_lock:
+            # replaces steps that were not read yet, the user moved on
+            self._prefetch_steps = steps
+            self._prefetch_names = names
+            if self._prefetch_thread is None and len(steps) > 0:
+                self._prefetch_thread = threading.Thread(
+                    target=self._prefetchWorker, daemon=True)
+                self._prefetch_thread.start()
+
+    def _prefetchWorker(self):
+        while True:
+            with self._prefetch_lock:
+                if len(self._prefetch_steps) == 0:
+                    self._prefetch_thread = None
+                    return
+                step = self._prefetch_steps.pop(0)
+                names = self._prefetch_names
+            if not self._cache.has(step, names):
+                self._cache.put(step, names, self._readTimeStep(step, names))
+
+    def _readTimeStep(self, step, names):
+        """
+        Read values of a time step with the reader of the prefetch thread
+
+        @return Arrays as returned by `TimeStepCache.extract`
+        """
+        reader = self._prefetch_reader
+        with common.lock_file(self._file_name):
+            if reader is None:
+                reader = vtk.vtkExodusIIReader()
+                reader.SetFileName(self._file_name)
+                reader.UpdateInformation()
+                for data in self._block_info.values():
+                    for info in data.values():
+                        reader.SetObjectStatus(
+                            info.object_type, info.object_index, 1)
+                self._prefetch_reader = reader
+            reader.SetAllArrayStatus(vtk.vtkExodusIIReader.NODAL, 0)
+            reader.SetAllArrayStatus(vtk.vtkExodusIIReader.ELEM_BLOCK, 0)
+            for name in names:
+                reader.SetObjectArrayStatus(
+                    self._exodusVariableType(name), name, 1)
+            reader.SetTimeStep(step)
+            reader.Update()
+        return TimeStepCache.extract(
+            reader.GetOutput(), names, self._displaced)
+
     def getVtkOutputPort(self):
-        return self._reader.GetOutputPort(0)
+        return self._producer.GetOutputPort(0)
 
     def getBlocks(self):
         return self._block_info[vtk.vtkExodusIIReader.ELEM_BLOCK].values()
@@ -0,0 +1,267 @@
+import vtk
+import numpy as np
+from vtk.util import numpy_support
+import otter.plugins.common as common
+from otter.plugins.common.BlockExtractor import BlockExtractor
+
+
+class MergedBlockProperty:
+    """
+    Stands in for the vtkProperty of a single merged block. The color goes
+    into the lookup table entry of the block, everything else is set on the
+    property shared by all blocks.
+    """
+
+    def __init__(self, merged, index):
+        self._merged = merged
+        self._index = index
+
+    def SetColor(self, color):
+        self._merged.setBlockColor(self._index, color)
+
+    def __getattr__(self, name):
+        return getattr(self._merged.property, name)
+
+
+class MergedBlock:
+    """
+    Single block of a MergedBlocksObject. Mirrors the BlockObject API, so
+    blocks can be handled the same way whether they are merged or not.
+    """
+
+    def __init__(self, merged, index, block):
+        self._merged = merged
+        self._index = index
+        self._bounds = block.bounds
+        self._info = block.info
+        self._geometry = block.geometry
+        self._color = [1, 1, 1]
+        self._visible = True
+        self._cob = common.centerOfBounds(self._geometry.GetBounds())
+        self._property = MergedBlockProperty(merged, index)
+
+    def setColor(self, color):
+        self._color = color
+
+    @property
+    def actor(self):
+        return self._merged.actor
+
+    @property
+    def info(self):
+        return self._info
+
+    @property
+    def color(self):
+        return self._color
+
+    @property
+    def cob(self):
+        return self._cob
+
+    @property
+    def bounds(self):
+        return self._bounds
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def silhouette_actor(self):
+        return self._merged.silhouette_actor
+
+    @property
+    def silhouette_property(self):
+        return self._merged.silhouette_property
+
+    @property
+    def visible(self):
+        return self._visible
+
+    @property
+    def property(self):
+        return self._property
+
+    def setVisible(self, visible):
+        self._visible = visible
+        self._merged.setBlockVisible(self._index, visible)
+
+    def setSilhouetteVisible(self, visible):
+        self._merged.setBlockSilhouetteVisible(self._index, visible)
+
+
+class MergedBlocksObject:
+    """
+    Object that renders many mesh blocks with a single actor.
+
+    Block surfaces are merged into one polydata with a cell array holding
+    the block index. Block colors are entries of a lookup table indexed by
+    that array and hidden blocks are masked via the ghost cell array, so
+    neither needs a new actor nor touches the geometry.
+    """
+
+    def __init__(self, blocks, geometry, camera):
+        """
+        @param blocks Dictionary of block number -> ExtractedBlock
+        @param geometry Merged block surfaces produced by
+                        BlockExtractor.merge from `blocks.values()`
+        @param camera vtkCamera used for the silhouette
+        """
+        self._numbers = list(blocks.keys())
+        self._blocks = {}
+        for index, (number, block) in enumerate(blocks.items()):
+            self._blocks[number] = MergedBlock(self, index, block)
+        self._geometry = geometry
+
+        self._setUpBlockCells()
+        self._setUpLookupTable()
+
+        self._mapper = vtk.vtkPolyDataMapper()
+        self._mapper.SetInputData(self._geometry)
+        self._mapper.SetLookupTable(self._lut)
+        self._mapper.UseLookupTableScalarRangeOn()
+        self._mapper.SetScalarModeToUseCellFieldData()
+        self._mapper.SelectColorArray(BlockExtractor.BLOCK_INDEX)
+        self._mapper.SetColorModeToMapScalars()
+        self._mapper.ScalarVisibilityOn()
+
+        self._actor = vtk.vtkActor()
+        self._actor.SetMapper(self._mapper)
+        self._actor.SetScale(0.99999)
+        self._actor.VisibilityOn()
+
+        self._property = self._actor.GetProperty()
+        self._property.SetRepresentationToSurface()
+
+        self._setUpSilhouette(camera)
+
+    def _setUpBlockCells(self):
+        """
+        Set up the ghost cell array used to hide blocks and a map from block
+        index to the cells of the block
+        """
+        cell_data = self._geometry.GetCellData()
+        n_cells = self._geometry.GetNumberOfCells()
+
+        block_index = cell_data.GetArray(BlockExtractor.BLOCK_INDEX)
+        if block_index is None:
+            self._block_index = np.zeros(0, dtype=np.int32)
+        else:
+            self._block_index = numpy_support.vtk_to_numpy(block_index)
+        # cells sorted by block, cells of block `i` are
+        # `self._block_cells[self._block_start[i]:self._block_start[i + 1]]`
+        self._block_cells = np.argsort(self._block_index, kind='stable')
+        self._block_start = np.searchsorted(
+            self._block_index[self._block_cells],
+            np.arange(len(self._numbers) + 1))
+
+        self._ghosts = np.zeros(n_cells, dtype=np.uint8)
+        ghosts = numpy_support.numpy_to_vtk(
+            self._ghosts, deep=False, array_type=vtk.VTK_UNSIGNED_CHAR)
+        ghosts.SetName(vtk.vtkDataSetAttributes.GhostArrayName())
+        cell_data.AddArray(ghosts)
+
+    def _setUpLookupTable(self):
+        n_blocks = max(len(self._numbers), 1)
+        self._lut = vtk.vtkLookupTable()
+        self._lut.SetNumberOfTableValues(n_blocks)
+        # block index `i` maps to table value `i`
+        self._lut.SetTableRange(-0.5, n_blocks - 0.5)
+        self._lut.Build()
+        for index in range(n_blocks):
+            self._lut.SetTableValue(index, 1, 1, 1, 1)
+
+    def _setUpSilhouette(self, camera):
+        # hidden blocks are removed so they do not show in the silhouette;
+        # the input is connected when the silhouette is shown for the first
+        # time
+        self._remove_ghosts = vtk.vtkRemoveGhosts()
+        self._silhouette = vtk.vtkPolyDataSilhouette()
+        self._silhouette.SetCamera(camera)
+        self._silhouette_connected = False
+        self._silhouette_blocks = set()
+
+        self._silhouette_mapper = vtk.vtkPolyDataMapper()
+        self._silhouette_mapper.SetInputConnection(
+            self._silhouette.GetOutputPort())
+
+        self._silhouette_actor = vtk.vtkActor()
+        self._silhouette_actor.SetMapper(self._silhouette_mapper)
+        self._silhouette_actor.VisibilityOff()
+
+        self._silhouette_property = self._silhouette_actor.GetProperty()
+        self._silhouette_property.SetColor([0, 0, 0])
+        self._silhouette_property.SetLineWidth(3)
+
+    @property
+    def actor(self):
+        return self._actor
+
+    @property
+    def blocks(self):
+        """
+        Dictionary of block number -> MergedBlock
+        """
+        return self._blocks
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def silhouette_actor(self):
+        return self._silhouette_actor
+
+    @property
+    def silhouette_property(self):
+        return self._silhouette_property
+
+    @property
+    def property(self):
+        return self._property
+
+    def blockAtCell(self, cell_id):
+        """
+        Get the number of the block a cell of the merged geometry belongs to
+        """
+        if cell_id < 0 or cell_id >= len(self._block_index):
+            return None
+        return self._numbers[self._block_index[cell_id]]
+
+    def _blockCells(self, index):
+        start = self._block_start[index]
+        end = self._block_start[index + 1]
+        return self._block_cells[start:end]
+
+    def setBlockColor(self, index, color):
+        self._lut.SetTableValue(index, color[0], color[1], color[2], 1)
+        self._lut.Modified()
+
+    def setBlockVisible(self, index, visible):
+        cells = self._blockCells(index)
+        hidden = vtk.vtkDataSetAttributes.HIDDENCELL
+        if visible:
+            self._ghosts[cells] &= ~np.uint8(hidden)
+        else:
+            self._ghosts[cells] |= np.uint8(hidden)
+        ghosts = self._geometry.GetCellData().GetArray(
+            vtk.vtkDataSetAttributes.GhostArrayName())
+        ghosts.Modified()
+        self._geometry.Modified()
+
+    def setBlockSilhouetteVisible(self, index, visible):
+        if visible:
+            self._silhouette_blocks.add(index)
+        else:
+            self._silhouette_blocks.discard(index)
+
+        if len(self._silhouette_blocks) > 0:
+            if not self._silhouette_connected:
+                self._remove_ghosts.SetInputData(self._geometry)
+                self._silhouette.SetInputConnection(
+                    self._remove_ghosts.GetOutputPort())
+                self._silhouette_connected = True
+            self._silhouette_actor.VisibilityOn()
+        else:
+            self._silhouette_actor.VisibilityOff()
@@ -0,0 +1,507 @@
+import os
+import re
+import threading
+import concurrent.futures
+import numpy as np
+import vtk
+from vtk.util import numpy_support
+import otter.plugins.common as common
+from otter.plugins.common.Reader import Reader
+from otter.plugins.common.ExodusIIReader import ExodusIIReader
+from otter.plugins.common.TimeStepCache import TimeStepCache
+
+
+class NemesisReader(Reader):
+    """
+    Reader for ExodusII output decomposed into one file per rank (Nemesis),
+    like `out.e.128.000` ... `out.e.128.127`.
+
+    All pieces are read in parallel by a thread pool (VTK releases the GIL
+    while reading). Pieces of a block are then assembled into a single data
+    set, again in parallel, with the nodes shared by pieces merged by their
+    global IDs. The output has the same structure as the output of
+    ExodusIIReader, so it can be used the same way.
+
+    The mesh is merged once. Which point and cell of the pieces went where
+    is kept, so values of other time steps and variables are merged without
+    merging the mesh again. Like in ExodusIIReader, values of time steps are
+    kept in a `TimeStepCache` and can be prefetched in a worker thread with
+    its own VTK readers.
+    """
+
+    # Number of threads reading and assembling pieces
+    MAX_WORKERS = os.cpu_count() or 1
+
+    # <file name>.<number of pieces>.<rank>
+    PIECE_PATTERN = re.compile(r'^(.+)\.(\d+)\.(\d+)$')
+
+    GLOBAL_NODE_ID = 'GlobalNodeId'
+
+    def __init__(self, file_name):
+        super().__init__(file_name)
+        # loading fails if some of them are missing
+        self._pieces = self.pieces(file_name) or [file_name]
+        # metadata comes from the first piece, all pieces list all blocks
+        self._header = ExodusIIReader(self._pieces[0])
+        self._readers = [None] * len(self._pieces)
+        self._time_step = None
+        self._variable_refs = dict()
+        self._total_elements = None
+        self._total_nodes = None
+        # flat index -> (indices of merged points, indices of merged cells
+        # or `None`) into the concatenated pieces of the leaf
+        self._merge_index = {}
+
+        self._cache = TimeStepCache(ExodusIIReader.CACHE_SIZE)
+
+        self._output = vtk.vtkMultiBlockDataSet()
+        self._producer = vtk.vtkTrivialProducer()
+        self._producer.SetOutput(self._output)
+
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_steps = []
+        self._prefetch_names = []
+        self._prefetch_thread = None
+        self._prefetch_readers = [None] * len(self._pieces)
+
+    @staticmethod
+    def pieces(file_name):
+        """
+        Find all pieces of the decomposed output a file belongs to
+
+        @param file_name Name of one of the pieces
+        @return List of file names of the pieces or `None` if `file_name` is
+                not a piece of a decomposed output
+        """
+        match = NemesisReader.PIECE_PATTERN.match(file_name)
+        if match is None:
+            return None
+        base, n, rank = match.groups()
+        if int(n) == 0 or int(rank) >= int(n):
+            return None
+        return ['{}.{}.{:0{}d}'.format(base, n, i, len(rank))
+                for i in range(int(n))]
+
+    @staticmethod
+    def isNemesisFile(file_name):
+        """
+        @return `True` if `file_name` is a piece of a decomposed output
+        """
+        return NemesisReader.pieces(file_name) is not None
+
+    def missingRanks(self):
+        """
+        @return Ranks whose piece does not exist
+        """
+        return [rank for rank, piece in enumerate(self._pieces)
+                if not os.path.exists(piece)]
+
+    def _checkPieces(self):
+        """
+        Make sure that all pieces exist, a partial mesh is not merged
+        """
+        missing = self.missingRanks()
+        if len(missing) > 0:
+            raise RuntimeError(
+                "Loading '{}' failed: missing pieces of ranks {}".format(
+                    self._file_name, ', '.join(str(r) for r in missing)))
+
+    def loadMetadata(self):
+        self._checkPieces()
+        self._header.loadMetadata()
+        times = self._header.getTimes()
+        if times is not None:
+            self._time_step = len(times) - 1
+        return True
+
+    def load(self):
+        if self._time_step is None:
+            self.loadMetadata()
+        else:
+            self._checkPieces()
+        self._read()
+
+    def _readPiece(self, index, step, names, readers):
+        """
+        Read one piece (runs in a worker thread)
+
+        @param index Index of the piece
+        @param step Time step to read or `None`
+        @param names Names of the variables to read
+        @param readers List of VTK readers of the pieces, created on demand
+        @return Output of the VTK reader
+        """
+        reader = readers[index]
+        file_name = self._pieces[index]
+        if reader is None:
+            reader = vtk.vtkExodusIIReader()
+            reader.SetFileName(file_name)
+            reader.GenerateGlobalNodeIdArrayOn()
+            with common.lock_file(file_name):
+                reader.UpdateInformation()
+            for obj_type in ExodusIIReader.OBJECT_TYPES:
+                for j in range(reader.GetNumberOfObjects(obj_type)):
+                    reader.SetObjectStatus(obj_type, j, 1)
+            readers[index] = reader
+
+        for var_type in ExodusIIReader.VARIABLE_TYPES:
+            reader.SetAllArrayStatus(var_type, 0)
+        for name in names:
+            reader.SetObjectArrayStatus(
+                self._exodusVariableType(name), name, 1)
+        if step is not None:
+            reader.SetTimeStep(step)
+        with common.lock_file(file_name):
+            reader.Update()
+        return reader.GetOutput()
+
+    @staticmethod
+    def _leaves(outputs):
+        """
+        @return dict flat index -> list of pieces of the leaf
+        """
+        leaves = {}
+        for output in outputs:
+            it = output.NewTreeIterator()
+            it.InitTraversal()
+            while not it.IsDoneWithTraversal():
+                leaves.setdefault(it.GetCurrentFlatIndex(), []).append(
+                    it.GetCurrentDataObject())
+                it.GoToNextItem()
+        return leaves
+
+    def _read(self):
+        """
+        Read all pieces and merge them into the output
+        """
+        n_pieces = len(self._pieces)
+        names = list(self._variable_refs.keys())
+        with concurrent.futures.ThreadPoolExecutor(self.MAX_WORKERS) as ex:
+            futures = [ex.submit(self._readPiece, i, self._time_step, names,
+                                 self._readers)
+                       for i in range(n_pieces)]
+            done = concurrent.futures.as_completed(futures)
+            for i, unused in enumerate(done):
+                if self._cancelled:
+                    for f in futures:
+                        f.cancel()
+                    return
+                self._reportProgress(
+                    (i + 1) / n_pieces,
+                    "Read {} of {} pieces".format(i + 1, n_pieces))
+            outputs = [f.result() for f in futures]
+            leaves = self._leaves(outputs)
+            indices = list(leaves.keys())
+            merged = dict(zip(indices, ex.map(
+                lambda idx: self._merge(leaves[idx]), indices)))
+
+        self._output.CopyStructure(outputs[0])
+        it = self._output.NewTreeIterator()
+        it.SkipEmptyNodesOff()
+        it.InitTraversal()
+        while not it.IsDoneWithTraversal():
+            data = merged.get(it.GetCurrentFlatIndex())
+            if data is not None:
+                self._output.SetDataSet(it, data[0])
+            it.GoToNextItem()
+        self._output.Modified()
+        self._merge_index = {
+            idx: (data[2], data[3]) for idx, data in merged.items()}
+        self._computeTotals(merged)
+        if self._time_step is not None:
+            self._cache.put(self._time_step, names, TimeStepCache.extract(
+                self._output, names, self.hasDisplacements()))
+
+    def _readTimeStep(self, step, names, readers, executor=None):
+        """
+        Read values of a time step and merge them the same way the mesh was
+        merged
+
+        @param step Time step to read
+        @param names Names of the variables to read
+        @param readers List of VTK readers of the pieces, created on demand
+        @param executor Executor reading the pieces, they are read one by
+                        one if `None`
+        @return Arrays as returned by `TimeStepCache.extract`
+        """
+        indices = range(len(self._pieces))
+        if executor is None:
+            outputs = [self._readPiece(i, step, names, readers)
+                       for i in indices]
+        else:
+            outputs = list(executor.map(
+                lambda i: self._readPiece(i, step, names, readers), indices))
+        leaves = self._leaves(outputs)
+
+        displaced = self.hasDisplacements()
+        result = {}
+        for idx, (first, cells) in self._merge_index.items():
+            pieces = self._nonEmpty(leaves.get(idx, []))
+            if len(pieces) == 0:
+                continue
+            point_data = vtk.vtkPointData()
+            self._mergeArrays([p.GetPointData() for p in pieces],
+                              point_data, first, names)
+            cell_data = vtk.vtkCellData()
+            self._mergeArrays([p.GetCellData() for p in pieces],
+                              cell_data, cells, names)
+            arrays = []
+            for name in names:
+                if point_data.GetArray(name) is not None:
+                    arrays.append((True, point_data.GetArray(name)))
+                if cell_data.GetArray(name) is not None:
+                    arrays.append((False, cell_data.GetArray(name)))
+            points = None
+            if displaced:
+                points = vtk.vtkPoints()
+                points.SetData(numpy_support.numpy_to_vtk(np.concatenate(
+                    [numpy_support.vtk_to_numpy(p.GetPoints().GetData())
+                     for p in pieces])[first], deep=True))
+            result[idx] = (points, arrays)
+        return result
+
+    def _showTimeStep(self):
+        """
+        Put values of the current time step into the output, from the cache
+        if possible
+        """
+        names = list(self._variable_refs.keys())
+        leaves = self._cache.get(self._time_step, names)
+        if leaves is None:
+            if len(self._merge_index) == 0:
+                # the mesh was not merged yet
+                self._read()
+                return
+            with concurrent.futures.ThreadPoolExecutor(
+                    self.MAX_WORKERS) as ex:
+                leaves = self._readTimeStep(
+                    self._time_step, names, self._readers, ex)
+            self._cache.put(self._time_step, names, leaves)
+        TimeStepCache.apply(self._output, leaves, names)
+
+    def _computeTotals(self, merged):
+        n_elements = 0
+        node_ids = []
+        n_nodes = 0
+        for binfo in self.getBlocks():
+            data = merged.get(binfo.multiblock_index)
+            if data is None:
+                continue
+            ug, ids = data[:2]
+            n_elements += ug.GetNumberOfCells()
+            n_nodes += ug.GetNumberOfPoints()
+            if ids is not None:
+                node_ids.append(ids)
+        self._total_elements = n_elements
+        # nodes shared by blocks are counted once
+        if len(node_ids) > 0:
+            self._total_nodes = len(np.unique(np.concatenate(node_ids)))
+        else:
+            self._total_nodes = n_nodes
+
+    @staticmethod
+    def _nonEmpty(pieces):
+        """
+        @return Pieces of a leaf that have any points
+        """
+        return [p for p in pieces
+                if p is not None and p.GetNumberOfPoints() > 0]
+
+    def _merge(self, pieces):
+        """
+        Merge pieces of a leaf into a single unstructured grid. Points with
+        the same global ID (or with the same coordinates, if there are no
+        IDs) are merged into one.
+
+        @return tuple (vtkUnstructuredGrid, global node IDs or `None`,
+                indices of the merged points, indices of the merged cells or
+                `None`), indices are into the concatenated non-empty pieces
+        """
+        pieces = self._nonEmpty(pieces)
+        if len(pieces) == 0:
+            return vtk.vtkUnstructuredGrid(), None, None, None
+
+        to_numpy = numpy_support.vtk_to_numpy
+        points = np.concatenate(
+            [to_numpy(p.GetPoints().GetData()) for p in pieces])
+        ids = [p.GetPointData().GetArray(self.GLOBAL_NODE_ID) for p in pieces]
+        if all(a is not None for a in ids):
+            ids = np.concatenate([to_numpy(a) for a in ids])
+            ids, first, inverse = np.unique(
+                ids, return_index=True, return_inverse=True)
+        else:
+            ids = None
+            unused, first, inverse = np.unique(
+                points, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+        conn = []
+        offsets = []
+        n_points = 0
+        n_conn = 0
+        for p in pieces:
+            cells = p.GetCells()
+            conn.append(to_numpy(cells.GetConnectivityArray()) + n_points)
+            offsets.append(to_numpy(cells.GetOffsetsArray())[:-1] + n_conn)
+            n_points += p.GetNumberOfPoints()
+            n_conn += cells.GetNumberOfConnectivityIds()
+        offsets.append(np.array([n_conn]))
+        offsets = np.concatenate(offsets)
+        conn = inverse[np.concatenate(conn)]
+        types = np.concatenate([common.cellTypes(p)
+                                for p in pieces])
+
+        # nodes on the boundary of pieces are in node sets of all of them
+        cells = None
+        if np.all(types == vtk.VTK_VERTEX):
+            conn, cells = np.unique(conn, return_index=True)
+            offsets = np.arange(len(conn) + 1)
+            types = types[cells]
+
+        id_type = numpy_support.get_numpy_array_type(vtk.VTK_ID_TYPE)
+        cell_array = vtk.vtkCellArray()
+        cell_array.SetData(
+            numpy_support.numpy_to_vtkIdTypeArray(
+                offsets.astype(id_type), deep=True),
+            numpy_support.numpy_to_vtkIdTypeArray(
+                conn.astype(id_type), deep=True))
+        cell_types = numpy_support.numpy_to_vtk(
+            types, deep=True, array_type=vtk.VTK_UNSIGNED_CHAR)
+
+        ug = vtk.vtkUnstructuredGrid()
+        pts = vtk.vtkPoints()
+        pts.SetData(numpy_support.numpy_to_vtk(points[first], deep=True))
+        ug.SetPoints(pts)
+        ug.SetCells(cell_types, cell_array)
+
+        self._mergeArrays(
+            [p.GetPointData() for p in pieces], ug.GetPointData(), first)
+        self._mergeArrays(
+            [p.GetCellData() for p in pieces], ug.GetCellData(), cells)
+        return ug, ids, first, cells
+
+    @staticmethod
+    def _mergeArrays(sources, target, index, names=None):
+        """
+        Concatenate arrays that are in all `sources` and add them into
+        `target`, picking values at `index` (if not `None`). Only arrays
+        listed in `names` are merged, unless it is `None`.
+        """
+        to_numpy = numpy_support.vtk_to_numpy
+        first = sources[0]
+        for i in range(first.GetNumberOfArrays()):
+            arr = first.GetArray(i)
+            if arr is None:
+                continue
+            name = arr.GetName()
+            if names is not None and name not in names:
+                continue
+            arrays = [s.GetArray(name) for s in sources]
+            if any(a is None for a in arrays):
+                continue
+            values = np.concatenate([to_numpy(a) for a in arrays])
+            if index is not None:
+                values = values[index]
+            merged = numpy_support.numpy_to_vtk(
+                values, deep=True, array_type=arr.GetDataType())
+            merged.SetName(name)
+            target.AddArray(merged)
+
+    def _exodusVariableType(self, name):
+        vinfo = self._variableInfo()[name]
+        if vinfo.object_type == Reader.VAR_NODAL:
+            return vtk.vtkExodusIIReader.NODAL
+        else:
+            return vtk.vtkExodusIIReader.ELEM_BLOCK
+
+    def _variableInfo(self):
+        return {vi.name: vi for vi in self._header.getVariableInfo()}
+
+    def enableVariable(self, name):
+        if name not in self._variableInfo():
+            return
+        refs = self._variable_refs.get(name, 0)
+        self._variable_refs[name] = refs + 1
+        if refs == 0:
+            self._showTimeStep()
+
+    def disableVariable(self, name):
+        refs = self._variable_refs.get(name, 0)
+        if refs == 0:
+            return
+        elif refs == 1:
+            del self._variable_refs[name]
+            TimeStepCache.remove(self._output, [name])
+        else:
+            self._variable_refs[name] = refs - 1
+
+    def getTimes(self):
+        return self._header.getTimes()
+
+    def getTimeStep(self):
+        return self._time_step
+
+    def setTimeStep(self, step):
+        if self.getTimes() is None or step == self._time_step:
+            return
+        self._time_step = step
+        self._showTimeStep()
+
+    def prefetch(self, steps):
+        times = self.getTimes()
+        if times is None or len(self._merge_index) == 0:
+            return
+        names = list(self._variable_refs.keys())
+        steps = [s for s in steps
+                 if 0 <= s < len(times) and not self._cache.has(s, names)]
+        with self._prefetch_lock:
+            # replaces steps that were not read yet, the user moved on
+            self._prefetch_steps = steps
+            self._prefetch_names = names
+            if self._prefetch_thread is None and len(steps) > 0:
+                self._prefetch_thread = threading.Thread(
+                    target=self._prefetchWorker, daemon=True)
+                self._prefetch_thread.start()
+
+    def _prefetchWorker(self):
+        while True:
+            with self._prefetch_lock:
+                if len(self._prefetch_steps) == 0:
+                    self._prefetch_thread = None
+                    return
+                step = self._prefetch_steps.pop(0)
+                names = self._prefetch_names
+            if not self._cache.has(step, names):
+                self._cache.put(step, names, self._readTimeStep(
+                    step, names, self._prefetch_readers))
+
+    def hasDisplacements(self):
+        return self._header.hasDisplacements()
+
+    def getVtkOutputPort(self):
+        return self._producer.GetOutputPort(0)
+
+    def getBlocks(self):
+        return self._header.getBlocks()
+
+    def getSideSets(self):
+        return self._header.getSideSets()
+
+    def getNodeSets(self):
+        return self._header.getNodeSets()
+
+    def getVariableInfo(self):
+        return self._header.getVariableInfo()
+
+    def getTotalNumberOfElements(self):
+        if self._total_elements is None:
+            return self._header.getTotalNumberOfElements()
+        return self._total_elements
+
+    def getTotalNumberOfNodes(self):
+        if self._total_nodes is None:
+            return self._header.getTotalNumberOfNodes()
+        return self._total_nodes
+
+    def getDimensionality(self):
+        return self._header.getDimensionality()
@@ -6,18 +6,17 @@ class NodeSetObject:
     Object that encapualates VTK around a node set
     """
 
-    def __init__(self, eb):
-        do = eb.GetOutput()
+    def __init__(self, block):
+        """
+        @param block ExtractedBlock produced by BlockExtractor
+        """
         self._info = {
-            'points': do.GetNumberOfPoints()
+            'points': block.info['points']
         }
-
-        self._geometry = vtk.vtkCompositeDataGeometryFilter()
-        self._geometry.SetInputConnection(0, eb.GetOutputPort(0))
-        self._geometry.Update()
+        self._geometry = block.geometry
 
         self._mapper = vtk.vtkPolyDataMapper()
-        self._mapper.SetInputConnection(self._geometry.GetOutputPort())
+        self._mapper.SetInputData(self._geometry)
         self._mapper.SetScalarModeToUsePointFieldData()
         self._mapper.InterpolateScalarsBeforeMappingOn()
 
@@ -35,6 +34,10 @@ class NodeSetObject:
     def info(self):
         return self._info
 
+    @property
+    def geometry(self):
+        return self._geometry
+
     @property
     def property(self):
         return self._property
@@ -1,4 +1,5 @@
 import collections
+import vtk
 
 
 BlockInformation = collections.namedtuple(
@@ -19,15 +20,108 @@ class Reader:
     VAR_NODAL = 1
     VAR_CELL = 2
 
+    # Return codes of `update`
+    NOCHANGE = 0
+    APPENDED = 1
+    CHANGED = 2
+
     def __init__(self, file_name):
         self._file_name = file_name
+        self._progress_callback = None
+        self._cancelled = False
+
+    def setProgressCallback(self, callback):
+        """
+        Set a function called as `callback(fraction, text)` while the file
+        is loaded. It is called from the thread that loads the file.
+        """
+        self._progress_callback = callback
+
+    def cancel(self):
+        """
+        Ask `load` to stop as soon as possible. Can be called from any
+        thread. A cancelled reader can not be used anymore.
+        """
+        self._cancelled = True
+
+    def isCancelled(self):
+        return self._cancelled
+
+    def _reportProgress(self, fraction, text=''):
+        if self._progress_callback is not None:
+            self._progress_callback(fraction, text)
+
+    def _observeProgress(self, algorithm):
+        """
+        Report progress of a VTK algorithm as progress of this reader and
+        abort the algorithm when loading is cancelled
+        """
+        def onProgress(obj, event):
+            if self._cancelled:
+                obj.SetAbortExecute(1)
+            self._reportProgress(
+                obj.GetProgress(), obj.GetProgressText() or '')
+
+        algorithm.AddObserver(vtk.vtkCommand.ProgressEvent, onProgress)
 
     def load(self):
         pass
 
+    def loadMetadata(self):
+        """
+        Read only what is needed to list blocks, sets, variables and the
+        totals. Returns True if the reader supports it, in which case
+        `load` completes the loading later.
+        """
+        return False
+
+    def update(self):
+        """
+        Pick up changes of a loaded file without loading it again.
+
+        @return `NOCHANGE` if nothing changed, `APPENDED` if time steps were
+                added (or values rewritten) but the mesh is the same, so
+                objects built from the output can be kept, or `CHANGED` if
+                the file has to be loaded again
+        """
+        return Reader.CHANGED
+
+    def hasDisplacements(self):
+        """
+        Return `True` if points move in time
+        """
+        return False
+
     def getVtkOutputPort(self):
         return None
 
+    def getTimes(self):
+        """
+        Return the list of times or `None` if the file has no time steps
+        """
+        return None
+
+    def getTimeStep(self):
+        """
+        Return the index of the time step in the output
+        """
+        return None
+
+    def setTimeStep(self, step):
+        """
+        Put values of time step `step` (an index into `getTimes()`) into the
+        output
+        """
+        pass
+
+    def prefetch(self, steps):
+        """
+        Read time steps `steps` in the background, so `setTimeStep` does not
+        have to wait for the file. Replaces the steps of the previous call
+        that were not read yet.
+        """
+        pass
+
     def getBlocks(self):
         return None
 
@@ -51,3 +145,16 @@ class Reader:
 
     def getDimensionality(self):
         return None
+
+    def enableVariable(self, name):
+        """
+        Request variable `name` to be loaded. Readers that load all
+        variables up front do not need to do anything.
+        """
+        pass
+
+    def disableVariable(self, name):
+        """
+        Release variable `name` requested via `enableVariable`
+        """
+        pass
@@ -0,0 +1,100 @@
+from PyQt5 import QtCore
+
+
+class RenderScheduler(QtCore.QObject):
+    """
+    Renders a VTK render window only when something in it changed.
+
+    The scene is marked dirty by `requestRender` and by `ModifiedEvent`s of
+    the render window, its renderers and their cameras. Code that changes
+    props (actors, their properties, mappers or mapper inputs) calls
+    `requestRender`. A dirty scene is rendered on the next pass of the event
+    loop, so any number of changes before that are merged into a single
+    `Render()` call. Nothing runs while the scene is idle.
+    """
+
+    def __init__(self, render_window, parent=None):
+        """
+        @param render_window vtkRenderWindow to render
+        @param parent Parent QObject
+        """
+        super().__init__(parent)
+        self._render_window = render_window
+        self._dirty = False
+        self._rendered_frames = 0
+        self._skipped_frames = 0
+        # renderer -> observed camera
+        self._cameras = {}
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._onTimeout)
+
+        self._render_window.AddObserver('ModifiedEvent', self._onModified)
+        self._render_window.AddObserver('EndEvent', self._onEndRender)
+        renderers = self._render_window.GetRenderers()
+        renderers.InitTraversal()
+        for i in range(renderers.GetNumberOfItems()):
+            renderer = renderers.GetNextItem()
+            renderer.AddObserver('ModifiedEvent', self._onRendererModified)
+            self._observeCamera(renderer)
+
+    def requestRender(self):
+        """
+        Ask for a frame. Requests made before the frame is rendered are
+        merged into it.
+        """
+        if self._dirty:
+            self._skipped_frames += 1
+        else:
+            self._setDirty()
+
+    def isDirty(self):
+        """
+        @return `True` if the scene changed since the last frame
+        """
+        return self._dirty
+
+    def renderedFrames(self):
+        """
+        @return Number of frames rendered by the scheduler
+        """
+        return self._rendered_frames
+
+    def skippedFrames(self):
+        """
+        @return Number of requested frames that were merged into another
+                frame
+        """
+        return self._skipped_frames
+
+    def _setDirty(self):
+        self._dirty = True
+        self._timer.start()
+
+    def _observeCamera(self, renderer):
+        camera = renderer.GetActiveCamera()
+        if self._cameras.get(renderer) is camera:
+            return
+        camera.AddObserver('ModifiedEvent', self._onModified)
+        self._cameras[renderer] = camera
+
+    def _onModified(self, obj, event):
+        if not self._dirty:
+            self._setDirty()
+
+    def _onRendererModified(self, obj, event):
+        # the active camera can be replaced
+        self._observeCamera(obj)
+        self._onModified(obj, event)
+
+    def _onEndRender(self, obj, event):
+        # a frame rendered by someone else (e.g. the interactor) shows all
+        # changes made so far
+        self._dirty = False
+
+    def _onTimeout(self):
+        if self._dirty:
+            self._rendered_frames += 1
+            self._render_window.Render()
@@ -6,19 +6,15 @@ class SideSetObject:
     Object that encapualates VTK around a side set
     """
 
-    def __init__(self, eb):
-        do = eb.GetOutput()
-        self._info = {
-            'cells': do.GetNumberOfCells(),
-            'points': do.GetNumberOfPoints()
-        }
-
-        self._geometry = vtk.vtkCompositeDataGeometryFilter()
-        self._geometry.SetInputConnection(0, eb.GetOutputPort(0))
-        self._geometry.Update()
+    def __init__(self, block):
+        """
+        @param block ExtractedBlock produced by BlockExtractor
+        """
+        self._info = block.info
+        self._geometry = block.geometry
 
         self._mapper = vtk.vtkPolyDataMapper()
-        self._mapper.SetInputConnection(self._geometry.GetOutputPort())
+        self._mapper.SetInputData(self._geometry)
         self._mapper.SetScalarModeToUsePointFieldData()
         self._mapper.InterpolateScalarsBeforeMappingOn()
 
@@ -37,6 +33,10 @@ class SideSetObject:
     def info(self):
         return self._info
 
+    @property
+    def geometry(self):
+        return self._geometry
+
     @property
     def property(self):
         return self._property
@@ -0,0 +1,167 @@
+import collections
+import threading
+import vtk
+
+
+class TimeStepCache:
+    """
+    Bounded LRU cache of field values of time steps.
+
+    An entry holds the arrays of the variables of one time step for every
+    data set (leaf) of a multi-block output, keyed by the flat index of the
+    leaf. Arrays are stored by reference, so putting an entry into the cache
+    does not copy any values. When the cache is over its size, least
+    recently used time steps are dropped. The cache can be used from
+    several threads.
+    """
+
+    def __init__(self, size):
+        """
+        @param size Maximal size of the cached arrays in MiB
+        """
+        self._size = size * 1024
+        self._used = 0
+        self._lock = threading.Lock()
+        # step -> (variable names, leaves, size in KiB)
+        self._entries = collections.OrderedDict()
+
+    def has(self, step, names):
+        """
+        @return `True` if variables `names` of time step `step` are cached
+        """
+        with self._lock:
+            entry = self._entries.get(step)
+            return entry is not None and entry[0].issuperset(names)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+
+    @staticmethod
+    def extract(data, names, points=False):
+        """
+        Pick arrays of variables from a multi-block data set
+
+        @param data vtkMultiBlockDataSet
+        @param names Names of the variables
+        @param points `True` to pick points as well (needed when points
+                      move in time, i.e. when displacements are applied)
+        @return dict flat index -> (points or `None`,
+                                    list of (is point data, array))
+        """
+        leaves = {}
+        it = vtk.vtkDataObjectTreeIterator()
+        it.SetDataSet(data)
+        it.InitTraversal()
+        while not it.IsDoneWithTraversal():
+            leaf = it.GetCurrentDataObject()
+            arrays = []
+            for name in names:
+                arr = leaf.GetPointData().GetArray(name)
+                if arr is not None:
+                    arrays.append((True, arr))
+                arr = leaf.GetCellData().GetArray(name)
+                if arr is not None:
+                    arrays.append((False, arr))
+            pts = None
+            if points and leaf.IsA('vtkPointSet'):
+                pts = leaf.GetPoints()
+            leaves[it.GetCurrentFlatIndex()] = (pts, arrays)
+            it.GoToNextItem()
+        return leaves
+
+    @staticmethod
+    def apply(data, leaves, names=None):
+        """
+        Put arrays picked by `extract` into a multi-block data set with the
+        same structure
+
+        @param data vtkMultiBlockDataSet
+        @param leaves Arrays as returned by `extract`
+        @param names Names of the variables to put, all arrays in `leaves`
+                     if `None`. A cache entry can hold variables that were
+                     disabled since.
+        """
+        it = vtk.vtkDataObjectTreeIterator()
+        it.SetDataSet(data)
+        it.InitTraversal()
+        while not it.IsDoneWithTraversal():
+            entry = leaves.get(it.GetCurrentFlatIndex())
+            if entry is not None:
+                leaf = it.GetCurrentDataObject()
+                points, arrays = entry
+                if points is not None:
+                    leaf.SetPoints(points)
+                for nodal, arr in arrays:
+                    if names is not None and arr.GetName() not in names:
+                        continue
+                    if nodal:
+                        leaf.GetPointData().AddArray(arr)
+                    else:
+                        leaf.GetCellData().AddArray(arr)
+                leaf.Modified()
+            it.GoToNextItem()
+        data.Modified()
+
+    @staticmethod
+    def remove(data, names):
+        """
+        Remove arrays of variables from all data sets of a multi-block data
+        set
+
+        @param data vtkMultiBlockDataSet
+        @param names Names of the variables
+        """
+        it = vtk.vtkDataObjectTreeIterator()
+        it.SetDataSet(data)
+        it.InitTraversal()
+        while not it.IsDoneWithTraversal():
+            leaf = it.GetCurrentDataObject()
+            for name in names:
+                leaf.GetPointData().RemoveArray(name)
+                leaf.GetCellData().RemoveArray(name)
+            leaf.Modified()
+            it.GoToNextItem()
+        data.Modified()
+
+    def put(self, step, names, leaves):
+        """
+        Store arrays of a time step
+
+        @param step Time step index
+        @param names Names of the variables in `leaves`
+        @param leaves Arrays as returned by `extract`
+        """
+        size = 0
+        for points, arrays in leaves.values():
+            if points is not None:
+                size += points.GetData().GetActualMemorySize()
+            for nodal, arr in arrays:
+                size += arr.GetActualMemorySize()
+
+        with self._lock:
+            old = self._entries.pop(step, None)
+            if old is not None:
+                self._used -= old[2]
+            self._entries[step] = (frozenset(names), leaves, size)
+            self._used += size
+            while self._used > self._size and len(self._entries) > 1:
+                _, entry = self._entries.popitem(last=False)
+                self._used -= entry[2]
+
+    def get(self, step, names):
+        """
+        Get arrays of a time step
+
+        @param step Time step index
+        @param names Names of the variables that are needed
+        @return Arrays as returned by `extract` or `None` if the time step
+                is not cached or some of the variables are missing
+        """
+        with self._lock:
+            entry = self._entries.get(step)
+            if entry is None or not entry[0].issuperset(names):
+                return None
+            self._entries.move_to_end(step)
+            return entry[1]
@@ -23,6 +23,7 @@ class VTKReader(Reader):
 
     def load(self):
         self._reader = vtk.vtkUnstructuredGridReader()
+        self._observeProgress(self._reader)
 
         with common.lock_file(self._file_name):
             self._reader.SetFileName(self._file_name)
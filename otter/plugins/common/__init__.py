@@ -1,5 +1,7 @@
 import contextlib
 import fcntl
+import numpy as np
+from vtk.util import numpy_support
 from PyQt5 import QtGui
 
 
@@ -47,3 +49,42 @@ def centerOfBounds(bnds):
         -(bnds[2] + bnds[3]) / 2,
         -(bnds[4] + bnds[5]) / 2
     ]
+
+
+def toPoints(xdata, ydata):
+    """
+    Build a list of chart points from x and y data in one go
+
+    @param xdata x-coordinates (array-like)
+    @param ydata y-coordinates (array-like)
+    @return QPolygonF with the points
+    """
+    x = np.asarray(xdata, dtype=np.float64)
+    y = np.asarray(ydata, dtype=np.float64)
+    n = min(len(x), len(y))
+    points = QtGui.QPolygonF(n)
+    if n > 0:
+        # QPointF is a pair of doubles, so the polygon is filled directly
+        buf = points.data()
+        buf.setsize(n * 2 * np.dtype(np.float64).itemsize)
+        xy = np.frombuffer(buf, dtype=np.float64).reshape(n, 2)
+        xy[:, 0] = x[:n]
+        xy[:, 1] = y[:n]
+    return points
+
+
+def cellTypes(grid):
+    """
+    Get types of all cells of an unstructured grid
+
+    @param grid vtkUnstructuredGrid
+    @return numpy array of VTK cell types
+    """
+    n_cells = grid.GetNumberOfCells()
+    # newer VTK does not store the types of grids with one cell type
+    if n_cells > 0 and grid.IsHomogeneous():
+        return np.full(n_cells, grid.GetCellType(0), dtype=np.uint8)
+    types = grid.GetCellTypesArray()
+    if types is None:
+        return np.zeros(0, dtype=np.uint8)
+    return numpy_support.vtk_to_numpy(types)
@@ -0,0 +1,172 @@
+"""
+Comparison.py
+"""
+
+import csv
+import concurrent.futures
+import numpy as np
+import pandas
+
+
+def readValues(file_name):
+    """
+    Read values from the first row of a CSV file
+
+    @param file_name[str]: The name of the file to read
+    @return pandas.Series with values indexed by column names (without
+            'time')
+    """
+    # only two lines are needed, which is much cheaper than setting up
+    # pandas.read_csv for every file
+    with open(file_name, newline='') as f:
+        lines = [f.readline(), f.readline()]
+    names, row = csv.reader(lines)
+    values = pandas.Series(np.array(row, dtype=np.float64),
+                           index=[n.strip() for n in names])
+    return values.drop('time', errors='ignore')
+
+
+class Comparison:
+    """
+    Compares measured and computed values of many file pairs at once.
+
+    Files are read in parallel. Values of a pair are matched by their names
+    and all points from all pairs are kept in one table, so errors and
+    ranges are computed for all pairs in one go.
+    """
+
+    # Number of threads used for reading files
+    MAX_WORKERS = 8
+
+    def __init__(self, pairs):
+        """
+        @param pairs[list]: List of [measured, computed] file names
+        """
+        self._pairs = [tuple(p) for p in pairs]
+        # pair index -> reason the pair could not be compared
+        self._skipped = {}
+        self._points = self._buildPoints(self._readFiles())
+
+    def _readFiles(self):
+        """
+        @return dict file name -> values (or None if the file is unreadable)
+        """
+        file_names = set()
+        for pair in self._pairs:
+            file_names.update(pair)
+
+        def read(file_name):
+            try:
+                return readValues(file_name)
+            except Exception:
+                return None
+
+        with concurrent.futures.ThreadPoolExecutor(self.MAX_WORKERS) as ex:
+            return dict(zip(file_names, ex.map(read, file_names)))
+
+    def _buildPoints(self, values):
+        measured = []
+        computed = []
+        for idx, (m_file, c_file) in enumerate(self._pairs):
+            m = values[m_file]
+            c = values[c_file]
+            if m is None or c is None:
+                self._skipped[idx] = "unreadable file"
+            elif len(m) != len(c) or not m.index.isin(c.index).all():
+                self._skipped[idx] = "different values"
+            else:
+                measured.append(m)
+                computed.append(c)
+        used = [i for i in range(len(self._pairs)) if i not in self._skipped]
+
+        if len(used) == 0:
+            return pandas.DataFrame(
+                columns=['measured', 'computed', 'abs_err', 'rel_err'],
+                index=pandas.MultiIndex.from_arrays(
+                    [[], []], names=['pair', 'name']),
+                dtype=np.float64)
+
+        # (pair, name) -> value, computed values are aligned with measured
+        # ones by the join
+        points = pandas.concat(measured, keys=used, names=['pair', 'name'])
+        points = points.to_frame('measured').join(
+            pandas.concat(computed, keys=used,
+                          names=['pair', 'name']).rename('computed'))
+
+        diff = points['computed'] - points['measured']
+        points['abs_err'] = diff.abs()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            points['rel_err'] = 100. * points['abs_err'] / \
+                points['measured'].abs()
+        return points
+
+    @property
+    def pairs(self):
+        """
+        List of (measured, computed) file name pairs
+        """
+        return self._pairs
+
+    @property
+    def points(self):
+        """
+        DataFrame indexed by (pair index, value name) with 'measured',
+        'computed', 'abs_err' and 'rel_err' (in percent) columns
+        """
+        return self._points
+
+    @property
+    def skipped(self):
+        """
+        dict pair index -> reason why the pair was not compared
+        """
+        return self._skipped
+
+    def range(self):
+        """
+        @return (min, max) over all measured and computed values or `None`
+                if there are no values
+        """
+        if len(self._points) == 0:
+            return None
+        values = self._points[['measured', 'computed']].to_numpy()
+        return float(np.nanmin(values)), float(np.nanmax(values))
+
+    def stats(self):
+        """
+        Error statistics of each pair
+
+        @return DataFrame indexed by pair index with 'count', 'max_abs_err',
+                'mean_abs_err', 'max_rel_err' and 'mean_rel_err' columns
+        """
+        # zero measured values give infinite relative errors, those are not
+        # counted
+        rel_err = self._points['rel_err'].replace(np.inf, np.nan)
+        grouped = pandas.DataFrame({
+            'abs_err': self._points['abs_err'],
+            'rel_err': rel_err
+        }).groupby(level='pair')
+        stats = grouped.agg(['count', 'max', 'mean'])
+        return pandas.DataFrame({
+            'count': stats[('abs_err', 'count')],
+            'max_abs_err': stats[('abs_err', 'max')],
+            'mean_abs_err': stats[('abs_err', 'mean')],
+            'max_rel_err': stats[('rel_err', 'max')],
+            'mean_rel_err': stats[('rel_err', 'mean')]
+        })
+
+    def outside(self, abs_err=None, rel_err=None):
+        """
+        Count points with an error above a limit in each pair
+
+        @param abs_err[float]: Absolute error limit
+        @param rel_err[float]: Relative error limit in percent
+        @return pandas.Series indexed by pair index
+        """
+        if abs_err is not None:
+            mask = self._points['abs_err'] > abs_err
+        elif rel_err is not None:
+            mask = self._points['rel_err'] > rel_err
+        else:
+            mask = pandas.Series(False, index=self._points.index)
+        return mask.groupby(level='pair').sum()
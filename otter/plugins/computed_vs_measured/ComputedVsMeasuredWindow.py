@@ -3,9 +3,11 @@ ComputedVsMeasuredWindow.py
 """
 
 import os
-import csv
 from PyQt5 import QtWidgets, QtCore, QtChart, QtGui
 from otter.plugins.PluginWindowBase import PluginWindowBase
+import otter.plugins.common as common
+from otter.plugins.computed_vs_measured.Comparison import Comparison
+from otter.plugins.computed_vs_measured.Pairing import Pairing
 
 
 class ComputedVsMeasuredWindow(PluginWindowBase):
@@ -17,6 +19,12 @@ class ComputedVsMeasuredWindow(PluginWindowBase):
         super().__init__(plugin)
         self.last_updated = None
         self.s = []
+        self._comparisons = []
+        self._pairing = Pairing(
+            self.plugin.settings.value(
+                "pairing/gold_dirs", Pairing.GOLD_DIRS, type=str),
+            self.plugin.settings.value(
+                "pairing/gold_suffixes", Pairing.GOLD_SUFFIXES, type=str))
 
         self._icon_size = QtCore.QSize(32, 32)
         self.chart_corner_roundness = 4
@@ -125,6 +133,10 @@ class ComputedVsMeasuredWindow(PluginWindowBase):
 
         self.left_layout_bottom.addStretch()
 
+        self.summary = QtWidgets.QLabel()
+        self.summary.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignTop)
+        self.left_layout_bottom.addWidget(self.summary)
+
         self.left_layout.addLayout(self.left_layout_bottom)
 
         self.left_pane = QtWidgets.QWidget()
@@ -216,6 +228,54 @@ class ComputedVsMeasuredWindow(PluginWindowBase):
             self.upper_bound_series.replace(
                 1, self.smax, self.smax + self.abs_err)
 
+        self.updateSummary()
+
+    def updateSummary(self):
+        """
+        Update the summary of errors of all compared values
+        """
+        n_pairs = 0
+        n_values = 0
+        n_outside = 0
+        max_abs_err = None
+        max_rel_err = None
+        skipped = []
+        for comparison in self._comparisons:
+            points = comparison.points
+            n_pairs += len(comparison.pairs) - len(comparison.skipped)
+            n_values += len(points)
+            if len(points) > 0:
+                stats = comparison.stats()
+                max_abs_err = max(max_abs_err or 0.,
+                                  stats['max_abs_err'].max())
+                max_rel_err = max(max_rel_err or 0.,
+                                  stats['max_rel_err'].max())
+            if self.relative_error.isChecked():
+                outside = comparison.outside(rel_err=self.rel_err)
+            else:
+                outside = comparison.outside(abs_err=self.abs_err)
+            n_outside += int(outside.sum())
+            for idx, reason in comparison.skipped.items():
+                skipped.append("{} ({})".format(
+                    comparison.pairs[idx][1], reason))
+
+        lines = []
+        if n_values > 0:
+            lines.append("{} pairs, {} values, {} outside bounds".format(
+                n_pairs, n_values, n_outside))
+            lines.append(
+                "max. abs. error {:g}, max. rel. error {:g} %".format(
+                    max_abs_err, max_rel_err))
+        if len(skipped) > 0:
+            lines.append("{} pairs skipped".format(len(skipped)))
+        unmatched = self._pairing.unmatched()
+        if len(unmatched) > 0:
+            lines.append("{} files unmatched".format(len(unmatched)))
+            for file_name, reason in sorted(unmatched.items()):
+                skipped.append("{} ({})".format(file_name, reason))
+        self.summary.setText("\n".join(lines))
+        self.summary.setToolTip("\n".join(skipped))
+
     def onRelativeError(self):
         """
         Callback when relative error is selected
@@ -253,61 +313,15 @@ class ComputedVsMeasuredWindow(PluginWindowBase):
     def buildFileList(self, file_names):
         """
         Take a list of file names and build a list of file name pairs with
-        computed and measured data. We assume that 'gold' in file name refers
-        to measured data. The lack of 'gold' refers to computed.
+        computed and measured data. Files are paired by their paths, with
+        the gold directory or suffix removed from paths of files with
+        measured data (see `Pairing`). Files added before are taken into
+        account, so only pairs that were not returned before are returned.
 
         @param file_names[list]: The list of file names
         @return list of pairs [measured, computed]
         """
-        measured = []
-        computed = []
-        for file in file_names:
-            if 'gold' in file:
-                measured.append(file)
-            else:
-                computed.append(file)
-
-        measured.sort()
-        computed.sort()
-
-        flist = []
-        for m, c in zip(measured, computed):
-            flist.append([m, c])
-
-        return flist
-
-    def readFile(self, file_name):
-        """
-        Read a CSV file and return its data as a dictionary
-
-        @param file_name[str]: The name of the file to read
-        @return [dict] with the data
-        """
-        d = None
-        with open(file_name, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            d = next(reader)
-
-        data = {}
-        for k, v in d.items():
-            data[k] = float(v)
-        return data
-
-    def dataCompatible(self, data1, data2):
-        """
-        Are data we want to plot compatible? That means:
-        - do they have the same number of entries
-        - do they contains the same dictionary keys
-
-        @param data1[dict]: Data to plot
-        @param data2[dict]: Data to plot
-        @return True if 'data1' and 'data2' are compatible, False otherwise
-        """
-        if len(data1) == len(data2):
-            pairs = zip(data1, data2)
-            return not any(x != y for x, y in pairs)
-
-        return False
+        return self._pairing.add(file_names)
 
     def buildItem(self, file_name):
         """
@@ -328,57 +342,59 @@ class ComputedVsMeasuredWindow(PluginWindowBase):
         @param files[list]: The list of files to add into the plugin for
             plotting
         """
-        for f in files:
-            measured_data = self.readFile(f[0])
-            computed_data = self.readFile(f[1])
-
-            del measured_data['time']
-            del computed_data['time']
-
-            if self.dataCompatible(measured_data, computed_data):
-                series = QtChart.QScatterSeries()
-                series.setMarkerSize(10)
-                for k, v in measured_data.items():
-                    series.append(v, computed_data[k])
-
-                series.hovered.connect(self.onHovered)
-                self.chart_view.chart().addSeries(series)
-                series.attachAxis(self.axis_x)
-                series.attachAxis(self.axis_y)
-
-                # to prevent the garbagge collector to destroy the series
-                # object so we can use it later
-                self.s.append(series)
-
-                # rescale the axis
-                smin = min(min(measured_data.values()),
-                           min(computed_data.values()))
-                if len(self.s) == 1:
-                    self.smin = smin
-                else:
-                    self.smin = min(self.smin, smin)
-
-                smax = max(max(measured_data.values()),
-                           max(computed_data.values()))
-                if len(self.s) == 1:
-                    self.smax = smax
-                else:
-                    self.smax = max(self.smax, smax)
-
-                self.axis_x.setRange(self.smin, self.smax)
-                self.axis_y.setRange(self.smin, self.smax)
-
-                # add into file list
-                item1 = self.buildItem(f[0])
-                item1.setCheckable(True)
-                item1.setCheckState(QtCore.Qt.Checked)
-
-                item2 = QtGui.QStandardItem("\u25A0")
-                item2.setEditable(False)
-                item2.setForeground(series.brush())
-                item2.setData(series)
-
-                self.file_list.appendRow([item1, item2])
+        first = len(self.s) == 0
+        comparison = Comparison(files)
+        self._comparisons.append(comparison)
+        stats = comparison.stats()
+
+        for idx, points in comparison.points.groupby(level='pair'):
+            measured_file, computed_file = comparison.pairs[idx]
+
+            series = QtChart.QScatterSeries()
+            series.setMarkerSize(10)
+            series.replace(common.toPoints(points['measured'],
+                                           points['computed']))
+
+            series.hovered.connect(self.onHovered)
+            self.chart_view.chart().addSeries(series)
+            series.attachAxis(self.axis_x)
+            series.attachAxis(self.axis_y)
+
+            # to prevent the garbagge collector to destroy the series
+            # object so we can use it later
+            self.s.append(series)
+
+            # add into file list
+            item1 = self.buildItem(measured_file)
+            item1.setCheckable(True)
+            item1.setCheckState(QtCore.Qt.Checked)
+            st = stats.loc[idx]
+            item1.setToolTip(
+                "{}\n{}\n"
+                "max. abs. error: {:g} (mean {:g})\n"
+                "max. rel. error: {:g} % (mean {:g} %)".format(
+                    measured_file, computed_file,
+                    st['max_abs_err'], st['mean_abs_err'],
+                    st['max_rel_err'], st['mean_rel_err']))
+
+            item2 = QtGui.QStandardItem("\u25A0")
+            item2.setEditable(False)
+            item2.setForeground(series.brush())
+            item2.setData(series)
+
+            self.file_list.appendRow([item1, item2])
+
+        # rescale the axis
+        rng = comparison.range()
+        if rng is not None:
+            if first:
+                self.smin, self.smax = rng
+            else:
+                self.smin = min(self.smin, rng[0])
+                self.smax = max(self.smax, rng[1])
+            self.axis_x.setRange(self.smin, self.smax)
+            self.axis_y.setRange(self.smin, self.smax)
+        self.updateSummary()
 
     def onAddFiles(self):
         """
@@ -449,6 +465,8 @@ class ComputedVsMeasuredWindow(PluginWindowBase):
         for series in self.s:
             chart.removeSeries(series)
         self.s = []
+        self._comparisons = []
+        self._pairing.clear()
 
         self.smin = 0
         self.smax = 1
@@ -456,6 +474,7 @@ class ComputedVsMeasuredWindow(PluginWindowBase):
         self.axis_y.setRange(self.smin, self.smax)
 
         self.file_list.removeRows(0, self.file_list.rowCount())
+        self.updateSummary()
 
     def onNew(self):
         self.clear()
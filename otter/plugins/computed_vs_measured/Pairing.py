@@ -0,0 +1,138 @@
+"""
+Pairing.py
+"""
+
+import os
+
+
+class Pairing:
+    """
+    Pairs files with measured (gold) data with files with computed data.
+
+    A file is measured if one of its directories is a gold directory (like
+    `test/gold/out.csv`) or if its name ends with a gold suffix (like
+    `test/out_gold.csv`). Removing the gold directory or suffix gives the
+    key of the file (`test/out.csv`), which is the path of the computed file
+    it pairs with. Files are kept in a dictionary per key, so pairing is
+    linear in the number of files and files can be added in any order and in
+    several batches.
+    """
+
+    # Default names of directories with measured data
+    GOLD_DIRS = ['gold']
+    # Default suffixes of names of files with measured data
+    GOLD_SUFFIXES = ['_gold']
+
+    def __init__(self, gold_dirs=None, gold_suffixes=None):
+        """
+        @param gold_dirs[list]: Names of directories with measured data
+        @param gold_suffixes[list]: Suffixes of file names (without the
+            extension) of files with measured data
+        """
+        if gold_dirs is None:
+            gold_dirs = self.GOLD_DIRS
+        if gold_suffixes is None:
+            gold_suffixes = self.GOLD_SUFFIXES
+        # settings with a single value come back as a string
+        if isinstance(gold_dirs, str):
+            gold_dirs = [gold_dirs]
+        if isinstance(gold_suffixes, str):
+            gold_suffixes = [gold_suffixes]
+        self._gold_dirs = set(d for d in gold_dirs if len(d) > 0)
+        self._gold_suffixes = [s for s in gold_suffixes if len(s) > 0]
+        self.clear()
+
+    def clear(self):
+        """
+        Forget all files
+        """
+        # key -> file name
+        self._measured = {}
+        self._computed = {}
+        # keys that were paired
+        self._paired = set()
+        # files that were added but not used (file name -> reason)
+        self._ignored = {}
+
+    def key(self, file_name):
+        """
+        Get the key of a file
+
+        @param file_name[str]: The file name
+        @return tuple (key, measured) where `measured` is `True` for files
+                with measured data
+        """
+        path = os.path.normcase(os.path.abspath(file_name))
+        head, name = os.path.split(path)
+        measured = False
+
+        stem, ext = os.path.splitext(name)
+        for suffix in self._gold_suffixes:
+            if stem.endswith(suffix) and len(stem) > len(suffix):
+                stem = stem[:-len(suffix)]
+                measured = True
+                break
+
+        # the gold directory closest to the file is the one that counts
+        dirs = []
+        while True:
+            head, tail = os.path.split(head)
+            if len(tail) == 0:
+                break
+            if not measured and tail in self._gold_dirs:
+                measured = True
+            else:
+                dirs.append(tail)
+        dirs.reverse()
+
+        return os.path.join(head, *dirs, stem + ext), measured
+
+    def add(self, file_names):
+        """
+        Add files. Only pairs that were completed by these files are returned,
+        so this can be called repeatedly as files come in.
+
+        @param file_names[list]: The list of file names
+        @return list of new pairs [measured, computed] sorted by their keys
+        """
+        new_keys = set()
+        for file_name in file_names:
+            key, measured = self.key(file_name)
+            files = self._measured if measured else self._computed
+            other = self._computed if measured else self._measured
+            if files.get(key) == file_name:
+                continue
+            if key in self._paired or key in files:
+                self._ignored[file_name] = "duplicate of {}".format(
+                    files[key])
+                continue
+            files[key] = file_name
+            if key in other:
+                new_keys.add(key)
+
+        self._paired.update(new_keys)
+        return [[self._measured[k], self._computed[k]]
+                for k in sorted(new_keys)]
+
+    def pairs(self):
+        """
+        @return list of all pairs [measured, computed] sorted by their keys
+        """
+        return [[self._measured[k], self._computed[k]]
+                for k in sorted(self._paired)]
+
+    def unmatched(self):
+        """
+        Files that have no counterpart (yet)
+
+        @return dict file name -> reason
+        """
+        unmatched = {}
+        for k, f in self._measured.items():
+            if k not in self._paired:
+                unmatched[f] = "no computed file"
+        for k, f in self._computed.items():
+            if k not in self._paired:
+                unmatched[f] = "no measured file"
+        unmatched.update(self._ignored)
+        return unmatched
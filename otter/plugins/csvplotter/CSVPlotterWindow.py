@@ -8,6 +8,8 @@ from otter.plugins.PluginWindowBase import PluginWindowBase
 from otter.plugins.csvplotter.FilesWidget import FilesWidget
 from otter.plugins.csvplotter.ChartSetupWidget import ChartSetupWidget
 from otter.plugins.csvplotter.ChartWidget import ChartWidget
+from otter.plugins.csvplotter.FileWatcher import FileWatcher
+from otter.plugins.csvplotter.Dashboard import Dashboard
 
 
 class CSVPlotterWindow(PluginWindowBase):
@@ -17,13 +19,13 @@ class CSVPlotterWindow(PluginWindowBase):
 
     def __init__(self, plugin):
         super().__init__(plugin)
-        self.last_updated = None
 
         self.setAcceptDrops(True)
         self.setWindowTitle("CVS Plotter")
 
         self.setupWidgets()
         self.setupMenuBar()
+        self.onCacheToggled(self._cache_action.isChecked())
 
         self.files_widget.loadFile.connect(self.onLoadFile)
         self.files_widget.loadFile.connect(self.chart_setup_widget.onLoadFile)
@@ -40,6 +42,8 @@ class CSVPlotterWindow(PluginWindowBase):
             self.chart_widget.onChartSeriesAdded)
         self.chart_setup_widget.chartSeriesReset.connect(
             self.chart_widget.onChartSeriesReset)
+        self.chart_setup_widget.chartSeriesRemoved.connect(
+            self.chart_widget.onChartSeriesRemoved)
         self.chart_setup_widget.chartSeriesUpdate.connect(
             self.chart_widget.onChartSeriesUpdate)
         self.chart_setup_widget.chartSeriesVisibilityChanged.connect(
@@ -67,8 +71,17 @@ class CSVPlotterWindow(PluginWindowBase):
         self.chart_setup_widget.axisMinimumChanged.connect(
             self.chart_widget.onAxisMinimumChanged)
 
-        self.update_timer = QtCore.QTimer()
-        self.update_timer.timeout.connect(self.onUpdateTimer)
+        self.file_watcher = FileWatcher(self)
+        self.file_watcher.fileChanged.connect(self.onFileChanged)
+
+        # other files in the file list are overlaid in the dashboard mode
+        self.dashboard = Dashboard(self)
+        self.dashboard.updated.connect(self.onDashboardUpdated)
+        self._dashboard_series = set()
+        self.chart_setup_widget.chartRemoveSeries.connect(
+            self.onChartRemoveSeries)
+        self.chart_setup_widget.chartSeriesVisibilityChanged.connect(
+            self.onChartSeriesVisibilityChanged)
 
     def setupWidgets(self):
         self.setContentsMargins(0, 0, 0, 0)
@@ -121,23 +134,154 @@ class CSVPlotterWindow(PluginWindowBase):
         self._close_action = file_menu.addAction(
             "Close", self.onClose, "Ctrl+W")
 
+        view_menu = self._menubar.addMenu("View")
+        self._dashboard_action = view_menu.addAction(
+            "Dashboard", self.onDashboardToggled)
+        self._dashboard_action.setCheckable(True)
+        self._dashboard_action.setToolTip(
+            "Plot checked variables from all files in the list")
+        view_menu.addSeparator()
+        self._cache_action = view_menu.addAction("Cache large files")
+        self._cache_action.setCheckable(True)
+        self._cache_action.setToolTip(
+            "Keep binary copies of large files, so they open faster")
+        self._cache_action.setChecked(
+            self.plugin.settings.value("cache_large_files", False, type=bool))
+        self._cache_action.toggled.connect(self.onCacheToggled)
+
+    def closeEvent(self, event):
+        self.plugin.settings.setValue(
+            "cache_large_files", self._cache_action.isChecked())
+        super().closeEvent(event)
+
+    def onCacheToggled(self, checked):
+        if checked:
+            cache_dir = QtCore.QStandardPaths.writableLocation(
+                QtCore.QStandardPaths.CacheLocation)
+            self.chart_setup_widget.cache_dir = os.path.join(
+                cache_dir, 'csvplotter')
+        else:
+            self.chart_setup_widget.cache_dir = None
+
     def onLoadFile(self, file_name):
         """
         Load file handler
         @param file_name[str] Name of the file
         """
-        self.last_updated = os.path.getmtime(file_name)
-        self.update_timer.start(1000)
+        self.file_watcher.removeAllPaths()
+        self.file_watcher.addPath(file_name)
+        if self._dashboard_action.isChecked():
+            self.dashboard.setFiles(
+                self._dashboardFiles(), self._dashboardColumns())
 
-    def onUpdateTimer(self):
+    def onFileChanged(self, file_name):
         """
-        Update timer handler
+        Called when a watched file was written to
+        @param file_name[str] Name of the file
         """
-        last_updated = os.path.getmtime(self.files_widget.currentFileName())
-        if last_updated != self.last_updated:
-            self.last_updated = last_updated
+        current = os.path.abspath(self.files_widget.currentFileName())
+        if file_name == current:
             self.chart_setup_widget.updateFile()
 
+    def _dashboardFiles(self):
+        """
+        Files shown in the dashboard mode besides the current one
+        """
+        current = os.path.abspath(self.files_widget.currentFileName())
+        files = [os.path.abspath(f) for f in self.files_widget.fileNames()]
+        return [f for f in files if f != current]
+
+    def _dashboardColumns(self):
+        """
+        Columns read from the dashboard files, the ones that are plotted
+        """
+        pri_var = self.chart_setup_widget.primaryVariable()
+        return [pri_var] + self.chart_setup_widget.checkedVariables()
+
+    def _dashboardSeriesName(self, file_name, var):
+        files = self.files_widget.fileNames()
+        if len(files) > 1:
+            root = os.path.commonpath([os.path.abspath(f) for f in files])
+            label = os.path.relpath(file_name, root)
+        else:
+            label = os.path.basename(file_name)
+        return "{}: {}".format(label, var)
+
+    def onDashboardToggled(self):
+        self._removeDashboardSeries()
+        if self._dashboard_action.isChecked():
+            self.dashboard.setFiles(
+                self._dashboardFiles(), self._dashboardColumns())
+        else:
+            self.dashboard.setFiles([])
+
+    def _removeDashboardSeries(self):
+        for name in self._dashboard_series:
+            if name in self.chart_widget.series:
+                self.chart_widget.onChartSeriesRemoved(name)
+        self._dashboard_series = set()
+
+    def _updateDashboardSeries(self, file_name, pri_var, var):
+        """
+        Plot new data of a variable from a dashboard file
+        """
+        data = self.dashboard.data(file_name)
+        if data is None or pri_var not in data.data or var not in data.data:
+            return
+        xdata = data.data[pri_var]
+        ydata = data.data[var]
+        name = self._dashboardSeriesName(file_name, var)
+        if name not in self.chart_widget.series:
+            self.chart_widget.onChartSeriesAdded(pri_var, name, xdata, ydata)
+            self.chart_widget.onChartSeriesVisibilityChanged(name, True)
+            self._dashboard_series.add(name)
+        else:
+            plotted = len(self.chart_widget.data[name])
+            if data.first_new_row < plotted:
+                self.chart_widget.onChartSeriesReset(name)
+                plotted = 0
+            self.chart_widget.onChartSeriesUpdate(
+                name, xdata[plotted:], ydata[plotted:])
+
+    def onDashboardUpdated(self, file_names):
+        """
+        Plot new data from the dashboard files. Called once per dashboard
+        tick with all files that changed, the chart is repainted once.
+        """
+        pri_var = self.chart_setup_widget.primaryVariable()
+        variables = self.chart_setup_widget.checkedVariables()
+        self.chart_widget.setUpdatesEnabled(False)
+        for file_name in file_names:
+            for var in variables:
+                self._updateDashboardSeries(file_name, pri_var, var)
+        self.chart_widget.setUpdatesEnabled(True)
+
+    def onChartRemoveSeries(self):
+        # all series are gone, dashboard files will be plotted from scratch
+        self._dashboard_series = set()
+        if self._dashboard_action.isChecked():
+            # e.g. the primary variable changed
+            self.dashboard.setColumns(self._dashboardColumns())
+            QtCore.QTimer.singleShot(0, self.onDashboardReplot)
+
+    def onDashboardReplot(self):
+        self.onDashboardUpdated(self.dashboard.files())
+
+    def onChartSeriesVisibilityChanged(self, var, visible):
+        if not self._dashboard_action.isChecked():
+            return
+        pri_var = self.chart_setup_widget.primaryVariable()
+        if visible:
+            # plotted once the column is read
+            self.dashboard.setColumns(self._dashboardColumns())
+        for file_name in self.dashboard.files():
+            name = self._dashboardSeriesName(file_name, var)
+            if visible:
+                self._updateDashboardSeries(file_name, pri_var, var)
+            elif name in self._dashboard_series:
+                self.chart_widget.onChartSeriesRemoved(name)
+                self._dashboard_series.discard(name)
+
     def onExportPdf(self):
         self.onExport("pdf")
 
@@ -240,6 +240,7 @@ class ChartSetupWidget(QtWidgets.QWidget):
     chartRemoveSeries = QtCore.pyqtSignal()
     chartSeriesAdded = QtCore.pyqtSignal(str, str, object, object)
     chartSeriesReset = QtCore.pyqtSignal(str)
+    chartSeriesRemoved = QtCore.pyqtSignal(str)
     chartSeriesUpdate = QtCore.pyqtSignal(str, object, object)
     chartSeriesVisibilityChanged = QtCore.pyqtSignal(str, bool)
     chartSeriesNameChanged = QtCore.pyqtSignal(str, str)
@@ -259,6 +260,12 @@ class ChartSetupWidget(QtWidgets.QWidget):
 
         # CSV reader
         self.reader = None
+        # directory for caches of large files, `None` to not cache
+        self.cache_dir = None
+        # variables that have a series in the chart. Series are added when
+        # a variable is checked and removed when it is unchecked, so only
+        # data of plotted variables is loaded
+        self._series = set()
 
         self.layout_main = QtWidgets.QVBoxLayout()
         self.layout_main.setContentsMargins(0, 0, 0, 0)
@@ -374,7 +381,10 @@ class ChartSetupWidget(QtWidgets.QWidget):
         """
         Load file handler
         """
-        self.reader = PostprocessorReader(file_name)
+        self.chartRemoveSeries.emit()
+        self._series = set()
+        self.reader = PostprocessorReader(
+            file_name, cache_dir=self.cache_dir, columns=[])
         for row, var in enumerate(self.reader.variables()):
             self.variables.blockSignals(True)
             si_name = QtGui.QStandardItem(var)
@@ -412,6 +422,26 @@ class ChartSetupWidget(QtWidgets.QWidget):
 
         self.variables_view.hideColumn(self.IDX_VARIABLE_NAME_HIDDEN)
 
+    def primaryVariable(self):
+        """
+        Get the name of the primary variable
+        """
+        idx = self.primary_variable.currentIndex()
+        return self.primary_variable.itemText(idx)
+
+    def checkedVariables(self):
+        """
+        Get names of variables that are plotted
+        """
+        names = []
+        parent = self.variables.invisibleRootItem().index()
+        for row in range(self.variables.rowCount()):
+            item = self.variables.item(row, self.IDX_VARIABLE_NAME)
+            if (not self.variables_view.isRowHidden(row, parent) and
+                    item.checkState() == QtCore.Qt.Checked):
+                names.append(item.data())
+        return names
+
     def updateFile(self):
         """
         Update file
@@ -425,24 +455,46 @@ class ChartSetupWidget(QtWidgets.QWidget):
         xdata = self.reader[pri_var]
         end = len(xdata)
 
-        if start >= end:
-            parent = self.variables.invisibleRootItem().index()
-            for row in range(self.variables.rowCount()):
-                if not self.variables_view.isRowHidden(row, parent):
-                    var = self.variables.item(row,
-                                              self.IDX_VARIABLE_NAME).data()
-                    self.chartSeriesReset.emit(var)
-                    ydata = self.reader[var]
-                    self.chartSeriesUpdate.emit(var, xdata, ydata)
-        else:
-            parent = self.variables.invisibleRootItem().index()
-            for row in range(self.variables.rowCount()):
-                if not self.variables_view.isRowHidden(row, parent):
-                    var = self.variables.item(row,
-                                              self.IDX_VARIABLE_NAME).data()
-                    ydata = self.reader[var]
-                    self.chartSeriesUpdate.emit(
-                        var, xdata[start:end], ydata[start:end])
+        if self.reader.first_new_row < start:
+            # rows we already plotted changed
+            for var in self._series:
+                self.chartSeriesReset.emit(var)
+                ydata = self.reader[var]
+                self.chartSeriesUpdate.emit(var, xdata, ydata)
+        elif start < end:
+            for var in self._series:
+                ydata = self.reader[var]
+                self.chartSeriesUpdate.emit(
+                    var, xdata[start:end], ydata[start:end])
+
+    def _removeSeries(self, var):
+        """
+        Remove the series of a variable from the chart and drop its data
+        """
+        self._series.discard(var)
+        self.chartSeriesRemoved.emit(var)
+        if var != self.primaryVariable():
+            self.reader.dropColumns([var])
+
+    def _addSeries(self, row):
+        """
+        Add a series for a variable into the chart and set it up
+        """
+        pri_var = self.primaryVariable()
+        item = self.variables.item(row, self.IDX_VARIABLE_NAME)
+        var = item.data()
+        # load both columns in one pass over the file
+        self.reader.loadColumns([pri_var, var])
+        self.chartSeriesAdded.emit(
+            pri_var, var, self.reader[pri_var], self.reader[var])
+        self._series.add(var)
+
+        color = self.variables.item(row, self.IDX_COLOR).foreground().color()
+        self.chartSeriesColorChanged.emit(var, color)
+        for idx in [self.IDX_AXIS, self.IDX_LINE_STYLE, self.IDX_LINE_WIDTH]:
+            self.onVariablesChanged(self.variables.item(row, idx))
+        self.chartSeriesNameChanged.emit(var, item.text())
+        self.chartSeriesVisibilityChanged.emit(var, True)
 
     def onPrimaryVariableChanged(self, idx):
         """
@@ -464,25 +516,33 @@ class ChartSetupWidget(QtWidgets.QWidget):
 
             # series
             self.chartRemoveSeries.emit()
+            self._series = set()
             for row in range(self.variables.rowCount()):
-                if row != disabled_row:
-                    var = self.variables.item(
-                        row, self.IDX_VARIABLE_NAME).data()
-                    self.chartSeriesAdded.emit(
-                        pri_var, var, self.reader[pri_var], self.reader[var])
-
-                    color = self.variables.item(
-                        row, self.IDX_COLOR).foreground().color()
-                    self.chartSeriesColorChanged.emit(var, color)
+                item = self.variables.item(row, self.IDX_VARIABLE_NAME)
+                if (row != disabled_row and
+                        item.checkState() == QtCore.Qt.Checked):
+                    self._addSeries(row)
+            # the previous primary variable may no longer be needed
+            self.reader.dropColumns(
+                [v for v in self.reader.variables()
+                 if v != pri_var and v not in self._series])
 
     def onVariablesChanged(self, item):
         """
         Variables changed handler
         """
-        if item.column() == self.IDX_VARIABLE_NAME:
+        name = self.variables.item(item.row(), self.IDX_VARIABLE_NAME).data()
+        if name not in self._series:
+            if (item.column() == self.IDX_VARIABLE_NAME and
+                    item.checkState() == QtCore.Qt.Checked):
+                self._addSeries(item.row())
+        elif item.column() == self.IDX_VARIABLE_NAME:
             checked = item.checkState() == QtCore.Qt.Checked
             self.chartSeriesVisibilityChanged.emit(item.data(), checked)
-            self.chartSeriesNameChanged.emit(item.data(), item.text())
+            if checked:
+                self.chartSeriesNameChanged.emit(item.data(), item.text())
+            else:
+                self._removeSeries(item.data())
         elif item.column() == self.IDX_COLOR:
             name = self.variables.item(
                 item.row(), self.IDX_VARIABLE_NAME).data()
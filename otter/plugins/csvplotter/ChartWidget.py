@@ -4,11 +4,17 @@ ChartWidget.py
 
 import os
 from PyQt5 import QtWidgets, QtCore, QtGui, QtChart
+import otter.plugins.common as common
+from otter.plugins.csvplotter.SeriesData import SeriesData
 
 
 class ChartWidget(QtChart.QChartView):
     """
     Widget for ploting charts
+
+    Series hold only a decimated copy of the data (see SeriesData.decimate)
+    with a few points per pixel of the visible x-range. Points are picked
+    again whenever the x-range or the size of the chart changes.
     """
 
     def __init__(self, parent):
@@ -17,12 +23,11 @@ class ChartWidget(QtChart.QChartView):
         self.chart_corner_roundness = 4
         self.pri_var = ""
         self.series = {}
+        self.data = {}
         self.pen = {}
         self.xmin = None
         self.xmax = None
         self.yaxis = {}
-        self.ymin = {}
-        self.ymax = {}
         self.axes = {
             'x': QtChart.QValueAxis(),
             'y': QtChart.QValueAxis(),
@@ -59,6 +64,51 @@ class ChartWidget(QtChart.QChartView):
 
         self.chart().legend().setVisible(False)
 
+        # names of series whose points need to be picked again
+        self._stale = set()
+        self._replot_timer = QtCore.QTimer(self)
+        self._replot_timer.setSingleShot(True)
+        self._replot_timer.setInterval(0)
+        self._replot_timer.timeout.connect(self.onReplotTimer)
+        # True if y-axes should be rescaled on the next replot
+        self._rescale = False
+        self.axes['x'].rangeChanged.connect(self.onXAxisRangeChanged)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.onXAxisRangeChanged()
+
+    def onXAxisRangeChanged(self, *args):
+        """
+        Called when the visible x-range changed (zoom, axis limits, ...)
+        """
+        self._stale.update(self.series.keys())
+        self._replot_timer.start()
+
+    def onReplotTimer(self):
+        """
+        Pick points of the stale series that are visible
+        """
+        if self._rescale:
+            self.rescaleYAxes()
+        for name in list(self._stale):
+            if self.series[name].isVisible():
+                self.replotSeries(name)
+
+    def replotSeries(self, name):
+        """
+        Fill a series with the decimated data for the visible x-range
+        """
+        axis = self.axes['x']
+        n_buckets = int(self.chart().plotArea().width())
+        if n_buckets < 1:
+            n_buckets = self.width()
+        log = isinstance(axis, QtChart.QLogValueAxis)
+        x, y = self.data[name].decimate(axis.min(), axis.max(), n_buckets,
+                                        log)
+        self.series[name].replace(common.toPoints(x, y))
+        self._stale.discard(name)
+
     def dragEnterEvent(self, event):
         """
         Eneter drag event handler
@@ -75,10 +125,10 @@ class ChartWidget(QtChart.QChartView):
         """
         self.chart().removeAllSeries()
         self.series = {}
+        self.data = {}
+        self._stale = set()
         self.yaxis = {}
         self.pen = {}
-        self.ymin = {}
-        self.ymax = {}
 
     def onChartSeriesAdded(self, pri_var, name, xdata, ydata):
         """
@@ -87,8 +137,6 @@ class ChartWidget(QtChart.QChartView):
         self.pri_var = pri_var
         series = QtChart.QLineSeries()
         series.setName(name)
-        for x, y in zip(xdata, ydata):
-            series.append(x, y)
         self.chart().addSeries(series)
         series.setVisible(False)
         series.attachAxis(self.axes['x'])
@@ -96,45 +144,57 @@ class ChartWidget(QtChart.QChartView):
         series.hovered.connect(self.onHovered)
 
         self.series[name] = series
-        self.xmin = min(xdata)
-        self.xmax = max(xdata)
+        self.data[name] = SeriesData()
+        self.data[name].append(xdata, ydata)
+        self._stale.add(name)
+        self._replot_timer.start()
+        xmin = [d.xmin for d in self.data.values() if d.xmin is not None]
+        xmax = [d.xmax for d in self.data.values() if d.xmax is not None]
+        self.xmin = min(xmin) if len(xmin) > 0 else None
+        self.xmax = max(xmax) if len(xmax) > 0 else None
         self.yaxis[name] = 'left'
-        self.ymin[name] = min(ydata)
-        self.ymax[name] = max(ydata)
         self.pen[name] = series.pen()
 
         self.rescaleXAxis()
         self.rescaleYAxes(True)
 
+    def onChartSeriesRemoved(self, name):
+        """
+        Remove a single series from a chart
+        """
+        self.chart().removeSeries(self.series[name])
+        del self.series[name]
+        del self.data[name]
+        del self.yaxis[name]
+        del self.pen[name]
+        self._stale.discard(name)
+        self.rescaleYAxes()
+        self.setAxesVisibility()
+
     def onChartSeriesReset(self, name):
         """
         Series reset
         """
         self.series[name].clear()
-        self.ymin[name] = None
-        self.ymax[name] = None
+        self.data[name].clear()
 
     def onChartSeriesUpdate(self, name, xdata, ydata):
         """
         Update series
         """
-        series = self.series[name]
-        for x, y in zip(xdata, ydata):
-            series.append(x, y)
-        if self.ymin[name] is None:
-            self.ymin[name] = min(ydata)
-        else:
-            self.ymin[name] = min(self.ymin[name], min(ydata))
-        if self.ymax[name] is None:
-            self.ymax[name] = max(ydata)
-        else:
-            self.ymax[name] = max(self.ymax[name], max(ydata))
-        self.rescaleYAxes()
+        self.data[name].append(xdata, ydata)
+        self._stale.add(name)
+        # many series are usually updated at once, so axes are rescaled
+        # only once after all of them were updated
+        self._rescale = True
+        self._replot_timer.start()
 
     def rescaleXAxis(self):
         """
         rescale X-axis
         """
+        if self.xmin is None or self.xmax is None:
+            return
         self.axes['x'].setRange(self.xmin, self.xmax)
         self.min['x'] = self.xmin
         self.max['x'] = self.xmax
@@ -143,28 +203,32 @@ class ChartWidget(QtChart.QChartView):
         """
         Rescale Y-axes
         """
+        self._rescale = False
         ymin = []
         ymax = []
         y2min = []
         y2max = []
 
         for name, s in self.series.items():
+            data = self.data[name]
+            if data.ymin is None:
+                continue
             if force or s.isVisible():
                 if self.yaxis[name] == 'left':
-                    ymin.append(self.ymin[name])
-                    ymax.append(self.ymax[name])
+                    ymin.append(data.ymin)
+                    ymax.append(data.ymax)
                 else:
-                    y2min.append(self.ymin[name])
-                    y2max.append(self.ymax[name])
+                    y2min.append(data.ymin)
+                    y2max.append(data.ymax)
 
         if len(ymin) > 0 and len(ymax) > 0:
-            self.axes['y'].setRange(min(ymin), max(ymax))
-            self.min['y'] = ymin
-            self.max['y'] = ymax
+            self.min['y'] = min(ymin)
+            self.max['y'] = max(ymax)
+            self.axes['y'].setRange(self.min['y'], self.max['y'])
         if len(y2min) > 0 and len(y2max) > 0:
-            self.axes['y2'].setRange(min(y2min), max(y2max))
-            self.min['y2'] = y2min
-            self.max['y2'] = y2max
+            self.min['y2'] = min(y2min)
+            self.max['y2'] = max(y2max)
+            self.axes['y2'].setRange(self.min['y2'], self.max['y2'])
 
     def setAxesVisibility(self):
         """
@@ -186,6 +250,8 @@ class ChartWidget(QtChart.QChartView):
         Series visibility changed
         """
         series = self.series[name]
+        if visible and name in self._stale:
+            self.replotSeries(name)
         series.setVisible(visible)
         self.rescaleYAxes()
         self.setAxesVisibility()
@@ -211,11 +277,13 @@ class ChartWidget(QtChart.QChartView):
         """
         series = self.series[name]
         if axis == 'left':
-            series.detachAxis(self.axes['y2'])
-            series.attachAxis(self.axes['y'])
+            old_axis, new_axis = self.axes['y2'], self.axes['y']
         else:
-            series.detachAxis(self.axes['y'])
-            series.attachAxis(self.axes['y2'])
+            old_axis, new_axis = self.axes['y'], self.axes['y2']
+        if old_axis in series.attachedAxes():
+            series.detachAxis(old_axis)
+        if new_axis not in series.attachedAxes():
+            series.attachAxis(new_axis)
         self.yaxis[name] = axis
         self.rescaleYAxes()
         self.setAxesVisibility()
@@ -323,6 +391,9 @@ class ChartWidget(QtChart.QChartView):
                     series.detachAxis(old_axis)
                     series.attachAxis(new_axis)
             self.chart().removeAxis(old_axis)
+            if axis_name == 'x':
+                new_axis.rangeChanged.connect(self.onXAxisRangeChanged)
+                self.onXAxisRangeChanged()
 
     def onAxisMaximumChanged(self, axis_name, value):
         """
@@ -444,7 +515,8 @@ class ChartWidget(QtChart.QChartView):
                 lines = []
                 pri_var_idx = hdrs[self.pri_var]
                 for (name, series) in self.series.items():
-                    if series.isVisible():
+                    # series from other files are not exported
+                    if series.isVisible() and name in hdrs:
                         var_idx = hdrs[name]
 
                         pen = self.pen[name]
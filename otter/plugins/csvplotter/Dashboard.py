@@ -0,0 +1,193 @@
+"""
+Dashboard.py
+"""
+
+import collections
+import os
+from PyQt5 import QtCore
+from otter.plugins.csvplotter.MooseDataFrame import MooseDataFrame
+from otter.plugins.csvplotter.PostprocessorReader import PostprocessorReader
+from otter.plugins.csvplotter.FileWatcher import FileWatcher
+
+# Data of a followed file handed over to the GUI. `data` is a DataFrame with
+# the rows read so far, rows starting at `first_new_row` are new.
+DashboardData = collections.namedtuple(
+    'DashboardData', ['data', 'first_new_row'])
+
+
+class ReadTask(QtCore.QRunnable):
+    """
+    Reads new data of a single file in a thread pool
+    """
+
+    def __init__(self, generation, reader, columns, signals):
+        super().__init__()
+        self._generation = generation
+        self._reader = reader
+        self._columns = columns
+        self._signals = signals
+
+    def run(self):
+        loaded = False
+        if self._columns is not None:
+            n_columns = len(self._reader.data.columns)
+            self._reader.loadColumns(self._columns)
+            loaded = len(self._reader.data.columns) != n_columns
+        retcode = self._reader.update()
+        if loaded and retcode == MooseDataFrame.NOCHANGE:
+            retcode = MooseDataFrame.UPDATED
+        # the row of an incomplete line is rewritten by the next update, so
+        # it is left out and the handed over rows are never touched again
+        data = self._reader.data.iloc[:self._reader.complete_rows]
+        self._signals.finished.emit(
+            self._generation, self._reader.filename, retcode,
+            DashboardData(data, min(self._reader.first_new_row, len(data))))
+
+
+class ReadTaskSignals(QtCore.QObject):
+    """
+    Signals of ReadTask (QRunnable is not a QObject)
+    """
+
+    # generation, file name, return code of MooseDataFrame.update,
+    # DashboardData
+    finished = QtCore.pyqtSignal(int, str, int, object)
+
+
+class Dashboard(QtCore.QObject):
+    """
+    Follows many CSV files at once.
+
+    Changed files are collected and read once per `TICK` ms on a thread
+    pool. Reads are incremental, so the cost of a tick depends on the number
+    of changed files and the rows appended to them, not on the size of the
+    files. When all reads of a tick are done, `updated` is emitted once with
+    the changes in all files, so the GUI can be updated in one go.
+
+    Readers are only used by the read tasks. The GUI gets the data read by a
+    task as a `DashboardData`, which is not modified afterwards. Results of
+    tasks started for a previous set of files are dropped.
+
+    Only the columns that are plotted are read. Columns added later are read
+    by the next read of each file.
+    """
+
+    # Interval between reads in milliseconds
+    TICK = 500
+
+    # List of names of files whose data changed. Their data is available
+    # through `data(file_name)`.
+    updated = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._readers = {}
+        # names of the columns to read, `None` for all columns
+        self._columns = None
+        # file name -> DashboardData delivered by the last `updated`
+        self._data = {}
+        # incremented when the followed files change, results of tasks
+        # started with a different generation are dropped
+        self._generation = 0
+        # files that changed since the last tick
+        self._changed = set()
+        # files being read and results of the reads that finished
+        self._reading = set()
+        self._results = []
+
+        self._pool = QtCore.QThreadPool(self)
+        self._signals = ReadTaskSignals(self)
+        self._signals.finished.connect(self.onReadFinished)
+
+        self._watcher = FileWatcher(self)
+        self._watcher.fileChanged.connect(self.onFileChanged)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.onTick)
+
+    def files(self):
+        """
+        @return List of followed files
+        """
+        return list(self._readers.keys())
+
+    def data(self, file_name):
+        """
+        @return DashboardData of a followed file, `None` if the file was not
+                read yet
+        """
+        return self._data.get(file_name)
+
+    def setFiles(self, file_names, columns=None):
+        """
+        Set the files to follow. Files are read in full on the next tick.
+
+        @param file_names List of file names
+        @param columns Names of the columns to read, `None` for all columns
+        """
+        # running tasks finish with readers that are no longer used, tasks
+        # that did not start yet are dropped
+        self._generation += 1
+        self._pool.clear()
+        self._watcher.removeAllPaths()
+        self._readers = {}
+        self._data = {}
+        self._changed = set()
+        self._reading = set()
+        self._results = []
+        self._columns = None if columns is None else list(columns)
+        for file_name in file_names:
+            file_name = os.path.abspath(file_name)
+            self._readers[file_name] = PostprocessorReader(
+                file_name, update=False, columns=self._columns)
+            self._watcher.addPath(file_name)
+            self._changed.add(file_name)
+
+        if len(self._readers) > 0:
+            self._timer.start(self.TICK)
+        else:
+            self._timer.stop()
+
+    def setColumns(self, columns):
+        """
+        Set the columns to read. Columns that were not read so far are read
+        from all files on the next tick, columns no longer in use are kept.
+
+        @param columns Names of the columns
+        """
+        if self._columns is None:
+            return
+        new = [c for c in columns if c not in self._columns]
+        if len(new) == 0:
+            return
+        self._columns = self._columns + new
+        self._changed.update(self._readers.keys())
+
+    def onFileChanged(self, file_name):
+        if file_name in self._readers:
+            self._changed.add(file_name)
+
+    def onTick(self):
+        # a new batch starts only after the previous one was delivered, so
+        # a reader is never used by two threads at once
+        if len(self._reading) > 0 or len(self._changed) == 0:
+            return
+        self._reading = self._changed
+        self._changed = set()
+        for file_name in self._reading:
+            task = ReadTask(self._generation, self._readers[file_name],
+                            self._columns, self._signals)
+            self._pool.start(task)
+
+    def onReadFinished(self, generation, file_name, retcode, data):
+        if generation != self._generation or file_name not in self._reading:
+            return
+        self._reading.discard(file_name)
+        if retcode != MooseDataFrame.NOCHANGE:
+            self._results.append((file_name, data))
+        if len(self._reading) == 0 and len(self._results) > 0:
+            results = self._results
+            self._results = []
+            for file_name, data in results:
+                self._data[file_name] = data
+            self.updated.emit([file_name for file_name, data in results])
@@ -0,0 +1,157 @@
+"""
+FileWatcher.py
+"""
+
+import os
+import math
+import time
+from PyQt5 import QtCore
+
+
+class FileWatcher(QtCore.QObject):
+    """
+    Watches files for changes without polling.
+
+    Change notifications come from the OS (via QFileSystemWatcher) and are
+    debounced per file: `fileChanged` is emitted once the file was not
+    written to for `DEBOUNCE` ms. While the file keeps being written to or
+    the last line of a file is not finished, the notification is held back,
+    but at most for `MAX_DELAY` ms, so data keeps flowing even if the writer
+    never stops or never ends the line. Files that are replaced
+    (written to a new file and renamed) or created after they were added are
+    picked up via their parent directory.
+    """
+
+    fileChanged = QtCore.pyqtSignal(str)
+
+    # Time in milliseconds without writes after which a change is reported
+    DEBOUNCE = 100
+    # Longest time in milliseconds a change can be held back
+    MAX_DELAY = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files = set()
+        # path -> (time of the first, time of the last unreported change)
+        self._pending = {}
+
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self.onFileChanged)
+        self._watcher.directoryChanged.connect(self.onDirectoryChanged)
+
+        # fires at the earliest time a pending change can be reported
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.onTimeout)
+
+    def files(self):
+        """
+        @return List of watched files
+        """
+        return list(self._files)
+
+    def addPath(self, path):
+        """
+        Start watching a file
+
+        @param path Path to the file, it does not have to exist yet
+        """
+        path = os.path.abspath(path)
+        self._files.add(path)
+        self._watch(path)
+
+    def removePath(self, path):
+        """
+        Stop watching a file
+
+        @param path Path to the file
+        """
+        path = os.path.abspath(path)
+        self._files.discard(path)
+        self._pending.pop(path, None)
+        if path in self._watcher.files():
+            self._watcher.removePath(path)
+        directory = os.path.dirname(path)
+        if not any(os.path.dirname(f) == directory for f in self._files):
+            if directory in self._watcher.directories():
+                self._watcher.removePath(directory)
+
+    def removeAllPaths(self):
+        """
+        Stop watching all files
+        """
+        for path in self.files():
+            self.removePath(path)
+
+    def _watch(self, path):
+        directory = os.path.dirname(path)
+        if directory not in self._watcher.directories() and \
+                os.path.isdir(directory):
+            self._watcher.addPath(directory)
+        if path not in self._watcher.files() and os.path.exists(path):
+            self._watcher.addPath(path)
+
+    def onFileChanged(self, path):
+        if path not in self._files:
+            return
+        # a replaced file is no longer watched
+        self._watch(path)
+        self._changed(path)
+
+    def onDirectoryChanged(self, directory):
+        for path in self._files:
+            if os.path.dirname(path) == directory and \
+                    path not in self._watcher.files() and \
+                    os.path.exists(path):
+                self._watch(path)
+                self._changed(path)
+
+    def _changed(self, path):
+        now = time.monotonic()
+        first, last = self._pending.get(path, (now, now))
+        self._pending[path] = (first, now)
+        self._schedule(now)
+
+    def _schedule(self, now):
+        """
+        Start the timer for the earliest time a pending change is due
+        """
+        if len(self._pending) == 0:
+            self._timer.stop()
+            return
+        debounce = self.DEBOUNCE / 1000
+        due = []
+        for first, last in self._pending.values():
+            if last + debounce > now:
+                t = last + debounce
+            else:
+                # quiet, but the last line is not finished yet
+                t = now + debounce
+            due.append(min(t, first + self.MAX_DELAY / 1000))
+        self._timer.start(max(0, math.ceil(1000 * (min(due) - now))))
+
+    def _lineFinished(self, path):
+        """
+        @return `True` if the file ends with a line end (or is empty)
+        """
+        try:
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return True
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b'\n'
+        except OSError:
+            return True
+
+    def onTimeout(self):
+        now = time.monotonic()
+        for path, (first, last) in list(self._pending.items()):
+            quiet = 1000 * (now - last) >= self.DEBOUNCE
+            waited = 1000 * (now - first)
+            if (quiet and self._lineFinished(path)) or \
+                    waited >= self.MAX_DELAY:
+                # a handler of an earlier path may have removed this one
+                if self._pending.pop(path, None) is not None:
+                    self.fileChanged.emit(path)
+        self._schedule(time.monotonic())
@@ -83,6 +83,13 @@ class FilesWidget(QtWidgets.QWidget):
         file_name = str(self.file_list.itemData(index))
         return file_name
 
+    def fileNames(self):
+        """
+        Get names of all files in the list
+        """
+        return [str(self.file_list.itemData(i))
+                for i in range(self.file_list.count())]
+
     def updateControls(self):
         """
         Update controls
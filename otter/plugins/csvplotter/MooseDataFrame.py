@@ -7,7 +7,14 @@
 # Licensed under LGPL 2.1, please see LICENSE for details
 # https://www.gnu.org/licenses/lgpl-2.1.html
 
+import io
 import os
+import json
+import struct
+import hashlib
+import tempfile
+import threading
+import numpy
 import pandas
 
 
@@ -17,20 +24,81 @@ class MooseDataFrame(object):
 
     This utilizes a pandas.DataFrame for storing and accessing CSV data, while
     allowing for the file to exist/not-exist.
+
+    The file is expected to grow by appending lines (as MOOSE does while it
+    runs), so after the first read only the bytes past the last complete line
+    are parsed. Appended rows are written into column buffers that grow
+    geometrically and the data frame is a view of them, so an update costs
+    time proportional to the new rows only. If the file shrinks or its header
+    changes, it is read again from the start.
+
+    With `cache_dir` set, numeric data of large files is saved into a binary
+    file in that directory after the file was read in full. The cache is
+    written in a background thread and keeps the types of the columns. The
+    next time the same file (same size and modification time) is opened, the
+    cache is memory-mapped instead of parsing the CSV, so only the columns
+    that are actually accessed are read from disk. When the cache directory
+    grows over `CACHE_MAX_SIZE`, the oldest caches are removed.
+
+    With `columns` set, only the listed columns are parsed. More columns can
+    be loaded with `loadColumns` and dropped with `dropColumns` later, so
+    memory use depends on the columns in use, not on the width of the file.
     """
     NOCHANGE = 0
     UPDATED = 1
     INVALID = 2
     OLDFILE = 3
 
+    # Version of the cache format
+    CACHE_VERSION = 2
+    # Smallest file size in bytes for which a cache is written
+    CACHE_MIN_SIZE = 16 * 1024 * 1024
+    # Size in bytes the cache directory is pruned to
+    CACHE_MAX_SIZE = 4 * 1024 * 1024 * 1024
+    # Leading bytes of cache files
+    CACHE_MAGIC = b'MOOSECSV'
+    # Alignment of columns in cache files in bytes
+    CACHE_ALIGN = 64
+    # Smallest number of rows the column buffers are allocated for
+    BUFFER_MIN_ROWS = 1024
+
     def __init__(self, filename, index=None, run_start_time=None, update=True,
-                 peacock_index=False):
+                 peacock_index=False, cache_dir=None, columns=None):
         self._filename = filename
         self._data = pandas.DataFrame()
         self._modified = None
         self._index = index
         self._add_peacock_index = peacock_index
         self._run_start_time = run_start_time
+        # header line of the file
+        self._header = None
+        # raw column names from the header
+        self._columns = None
+        # byte offset past the last complete line that was parsed
+        self._offset = 0
+        # True if the last parsed row had no line end, i.e. it may still be
+        # being written
+        self._partial = False
+        # index of the first row added or changed by the last update
+        self._first_new_row = 0
+        self._cache_dir = cache_dir
+        # thread writing the cache
+        self._cache_writer = None
+        # names of columns to load, `None` for all columns
+        self._usecols = None if columns is None else set(columns)
+        if self._usecols is not None and index:
+            self._usecols.add(index)
+        # byte offset past all parsed data (including an incomplete row)
+        self._end = 0
+        # data from the cache (all columns, memory-mapped) and the byte
+        # offset past its last complete row
+        self._base = None
+        self._base_offset = 0
+        self._base_partial = False
+        # column name -> buffer backing the data frame, `None` until rows are
+        # appended
+        self._buffers = None
+        self._index_buffer = None
         if update:
             self.update()
 
@@ -56,6 +124,24 @@ class MooseDataFrame(object):
     def filename(self):
         return self._filename
 
+    @property
+    def first_new_row(self):
+        """
+        Index of the first row added or changed by the last update. Rows in
+        front of it are the same as before the update.
+        """
+        return self._first_new_row
+
+    @property
+    def complete_rows(self):
+        """
+        Number of rows parsed from complete lines. Only the last row can come
+        from an incomplete line, which is parsed again by the next update.
+        """
+        if self._partial:
+            return len(self._data) - 1
+        return len(self._data)
+
     def __getitem__(self, key):
         """
         Provides [] access to data.
@@ -91,6 +177,430 @@ class MooseDataFrame(object):
         """
         self._modified = None
         self._data = pandas.DataFrame()
+        self._header = None
+        self._columns = None
+        self._offset = 0
+        self._partial = False
+        self._first_new_row = 0
+        self._end = 0
+        self._base = None
+        self._base_offset = 0
+        self._base_partial = False
+        self._buffers = None
+        self._index_buffer = None
+
+    def _processChunk(self, data):
+        """
+        Apply the index settings to freshly parsed rows
+        """
+        if self._index:
+            data.set_index(self._index, inplace=True)
+
+        if self._add_peacock_index:
+            series = pandas.Series(data.index, index=data.index)
+            data.insert(0, 'index (Peacock)', series)
+        return data
+
+    def _setTail(self, body, start):
+        """
+        Remember where the last complete line of `body` ends
+
+        Args:
+            body[bytes]: Data read from the file starting at offset `start`
+            start[int]: File offset of `body`
+        """
+        last_eol = body.rfind(b'\n')
+        self._offset = start + last_eol + 1
+        self._partial = len(body[last_eol + 1:].strip()) > 0
+        self._end = start + len(body)
+
+    def _projection(self, names=None):
+        """
+        Columns to parse, in the order they appear in the file
+
+        Args:
+            names[list]: Columns to consider, all columns in use if `None`
+        """
+        if names is None:
+            if self._usecols is None:
+                return None
+            names = self._usecols
+        return [c for c in self._columns if c in names]
+
+    def _parse(self, body, names=None):
+        """
+        Parse rows (without the header line) of the file
+
+        Args:
+            body[bytes]: Rows to parse
+            names[list]: Columns to parse, all columns in use if `None`
+        """
+        return pandas.read_csv(io.BytesIO(body), header=None,
+                               names=self._columns,
+                               usecols=self._projection(names))
+
+    def _readFull(self, f):
+        """
+        Read the whole file
+        """
+        stat = os.fstat(f.fileno())
+        header = f.readline()
+        body = f.read()
+        self._first_new_row = 0
+        self._header = header
+        self._columns = pandas.read_csv(io.BytesIO(header)).columns
+        self._setTail(body, len(header))
+        self._base = None
+        self._base_offset = len(header)
+        self._base_partial = False
+        self._buffers = None
+        if (self._cache_dir is not None and
+                stat.st_size >= self.CACHE_MIN_SIZE):
+            # all columns are parsed once, so they can be cached
+            data = self._parse(body, self._columns)
+            meta = {
+                'version': self.CACHE_VERSION,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'header': self._header.decode('utf-8', 'surrogateescape'),
+                'offset': self._offset,
+                'partial': self._partial,
+                'end': self._end
+            }
+            # the thread gets its own (shallow) copy, the data frame is
+            # modified in place below
+            self._cache_writer = threading.Thread(
+                target=self._writeCache,
+                args=(self._cacheFileName(), data.copy(deep=False), meta),
+                daemon=True)
+            self._cache_writer.start()
+            projection = self._projection()
+            if projection is not None:
+                data = data[projection]
+        else:
+            data = self._parse(body)
+        self._data = self._processChunk(data)
+
+    def _cacheFileName(self):
+        """
+        Returns:
+            Name of the cache file, unique for the path of the CSV file
+        """
+        path = os.path.abspath(self._filename)
+        digest = hashlib.sha1(
+            path.encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(self._cache_dir, digest + '.cache')
+
+    def waitForCache(self):
+        """
+        Wait until the cache is written
+        """
+        if self._cache_writer is not None:
+            self._cache_writer.join()
+            self._cache_writer = None
+
+    @classmethod
+    def _writeCache(cls, file_name, data, meta):
+        """
+        Save parsed data of the file into the cache. Runs in a background
+        thread.
+
+        The cache file starts with `CACHE_MAGIC` and the offset of the JSON
+        metadata at its end. Columns are stored one after another, so
+        reading one column does not touch the others.
+
+        Args:
+            file_name[str]: Name of the cache file
+            data[pandas.DataFrame]: Data as parsed from the file
+            meta[dict]: Description of the CSV file
+
+        Returns:
+            True if the cache was written
+        """
+        if len(data.columns) == 0:
+            return False
+        for t in data.dtypes:
+            if (not isinstance(t, numpy.dtype) or
+                    not pandas.api.types.is_numeric_dtype(t)):
+                return False
+
+        dir_name = os.path.dirname(file_name)
+        tmp = None
+        try:
+            os.makedirs(dir_name, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                    dir=dir_name, suffix='.tmp', delete=False) as f:
+                tmp = f.name
+                f.write(cls.CACHE_MAGIC + bytes(cls.CACHE_ALIGN -
+                                                len(cls.CACHE_MAGIC)))
+                columns = []
+                for name in data.columns:
+                    values = numpy.ascontiguousarray(data[name].to_numpy())
+                    columns.append([str(name), values.dtype.str, f.tell()])
+                    f.write(values.tobytes())
+                    f.write(bytes(-f.tell() % cls.CACHE_ALIGN))
+                meta = dict(meta, rows=len(data), columns=columns)
+                meta_offset = f.tell()
+                f.write(json.dumps(meta).encode('utf-8'))
+                f.seek(len(cls.CACHE_MAGIC))
+                f.write(struct.pack('<Q', meta_offset))
+            os.replace(tmp, file_name)
+        except OSError:
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+        cls._pruneCache(dir_name, keep=file_name)
+        return True
+
+    @classmethod
+    def _pruneCache(cls, dir_name, keep):
+        """
+        Remove the oldest caches until the directory is not larger than
+        `CACHE_MAX_SIZE`
+
+        Args:
+            dir_name[str]: Cache directory
+            keep[str]: Name of the cache file that is never removed
+        """
+        try:
+            entries = []
+            for entry in os.scandir(dir_name):
+                if entry.is_file() and entry.path != keep:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(e[1] for e in entries) + os.path.getsize(keep)
+            for mtime, size, path in sorted(entries):
+                if total <= cls.CACHE_MAX_SIZE:
+                    break
+                os.remove(path)
+                total -= size
+        except OSError:
+            pass
+
+    def _readCache(self):
+        """
+        Load data from the cache if it matches the file
+
+        Returns:
+            True if the data was loaded from the cache
+        """
+        try:
+            stat = os.stat(self._filename)
+            raw = numpy.memmap(self._cacheFileName(), dtype=numpy.uint8,
+                               mode='r')
+            n = len(self.CACHE_MAGIC)
+            if raw[:n].tobytes() != self.CACHE_MAGIC:
+                return False
+            meta_offset = struct.unpack('<Q', raw[n:n + 8].tobytes())[0]
+            meta = json.loads(raw[meta_offset:].tobytes().decode('utf-8'))
+            if (meta['version'] != self.CACHE_VERSION or
+                    meta['size'] != stat.st_size or
+                    meta['mtime'] != stat.st_mtime_ns):
+                return False
+            rows = meta['rows']
+            columns = {}
+            for name, dtype, offset in meta['columns']:
+                dtype = numpy.dtype(dtype)
+                values = raw[offset:offset + rows * dtype.itemsize]
+                if len(values) != rows * dtype.itemsize:
+                    return False
+                # a plain array viewing the mapped file, so results of
+                # operations on the columns are not memory maps
+                columns[name] = numpy.asarray(values).view(dtype)
+        except (OSError, ValueError, KeyError, IndexError, TypeError,
+                struct.error):
+            return False
+
+        self._header = meta['header'].encode('utf-8', 'surrogateescape')
+        self._columns = pandas.Index(list(columns.keys()))
+        self._offset = meta['offset']
+        self._partial = meta['partial']
+        self._end = meta['end']
+        self._first_new_row = 0
+        # no copy, the data frame is backed by the memory-mapped file
+        self._base = pandas.DataFrame(columns, copy=False)
+        self._base_offset = self._offset
+        self._base_partial = self._partial
+        self._buffers = None
+        projection = self._projection()
+        if projection is None:
+            data = self._base
+        else:
+            # only the columns in use are copied into memory
+            data = self._base[projection]
+        self._data = self._processChunk(data)
+        return True
+
+    def _readTail(self, f):
+        """
+        Read the lines appended to the file since the last read
+
+        Returns:
+            False if nothing new was read
+        """
+        f.seek(self._offset)
+        body = f.read()
+        if len(body.strip()) == 0:
+            return False
+
+        row = len(self._data)
+        if self._partial:
+            # the last row was incomplete, it is part of `body` again
+            row -= 1
+
+        chunk = self._parse(body)
+        self._first_new_row = row
+        if not self._index:
+            chunk.index = pandas.RangeIndex(row, row + len(chunk))
+        chunk = self._processChunk(chunk)
+        if self._canBuffer(chunk):
+            self._appendRows(chunk, row)
+        else:
+            self._data = pandas.concat([self._data.iloc[:row], chunk])
+            self._buffers = None
+        self._setTail(body, self._offset)
+        return True
+
+    def _canBuffer(self, chunk):
+        """
+        Check if rows of `chunk` can be added into the column buffers. Only
+        data with the same numeric columns is buffered.
+        """
+        if list(chunk.columns) != list(self._data.columns):
+            return False
+        frames = [chunk] if self._buffers is not None else [self._data, chunk]
+        for data in frames:
+            dtypes = list(data.dtypes)
+            if self._index:
+                dtypes.append(data.index.dtype)
+            if not all(isinstance(t, numpy.dtype) and
+                       pandas.api.types.is_numeric_dtype(t) for t in dtypes):
+                return False
+        return True
+
+    @staticmethod
+    def _growBuffer(buffer, rows, capacity, dtype):
+        """
+        Copy first `rows` values of `buffer` into a bigger buffer
+        """
+        grown = numpy.empty(capacity, dtype=dtype)
+        grown[:rows] = buffer[:rows]
+        return grown
+
+    def _appendRows(self, chunk, row):
+        """
+        Write rows of `chunk` into the column buffers, starting at `row`, and
+        make the data frame a view of the buffers
+        """
+        if self._buffers is None:
+            # the data was read in one piece, from now on it grows
+            self._buffers = {name: self._data[name].to_numpy()
+                             for name in self._data.columns}
+            if self._index:
+                self._index_buffer = self._data.index.to_numpy()
+        n_rows = row + len(chunk)
+        columns = [(name, chunk[name].to_numpy())
+                   for name in self._buffers.keys()]
+        if self._index:
+            columns.append((None, chunk.index.to_numpy()))
+        for name, values in columns:
+            if name is None:
+                buffer = self._index_buffer
+            else:
+                buffer = self._buffers[name]
+            dtype = numpy.result_type(buffer.dtype, values.dtype)
+            if (len(buffer) < n_rows or dtype != buffer.dtype or
+                    not buffer.flags.writeable):
+                capacity = max(2 * n_rows, self.BUFFER_MIN_ROWS)
+                buffer = self._growBuffer(buffer, row, capacity, dtype)
+            buffer[row:n_rows] = values
+            if name is None:
+                self._index_buffer = buffer
+            else:
+                self._buffers[name] = buffer
+
+        self._data = pandas.DataFrame(
+            {name: buffer[:n_rows] for name, buffer in self._buffers.items()},
+            copy=False)
+        if self._index:
+            self._data.index = pandas.Index(
+                self._index_buffer[:n_rows], name=self._index, copy=False)
+
+    def loadColumns(self, names):
+        """
+        Load more columns. Does nothing if all columns are loaded.
+
+        Args:
+            names[list]: Names of the columns
+        """
+        if self._usecols is None:
+            return
+        names = [n for n in names if n not in self._usecols]
+        if len(names) == 0:
+            return
+        self._usecols.update(names)
+        if self._header is None:
+            return
+        names = self._projection(names)
+        if len(names) == 0:
+            return
+        if len(self._data.columns) == 0:
+            # nothing to add the columns to, so just read the file again
+            self.clear()
+            self.update()
+            return
+
+        try:
+            values = self._readColumns(names)
+            if len(values) != len(self._data):
+                raise ValueError("File changed")
+            for name in names:
+                self._data[name] = values[name].to_numpy()
+            # new columns are not in the buffers
+            self._buffers = None
+        except Exception:
+            # the file changed in the meantime, read it again
+            self.clear()
+            self.update()
+
+    def _readColumns(self, names):
+        """
+        Read columns for all rows that were parsed so far
+        """
+        parts = []
+        start = len(self._header)
+        if self._base is not None:
+            parts.append(self._base[names])
+            start = self._base_offset
+            if self._base_partial:
+                # the incomplete row is read from the file below
+                parts[0] = parts[0].iloc[:-1]
+        with open(self._filename, 'rb') as f:
+            f.seek(start)
+            body = f.read(self._end - start)
+        if len(body.strip()) > 0:
+            parts.append(self._parse(body, names))
+        if len(parts) == 0:
+            return pandas.DataFrame(columns=names)
+        return pandas.concat(parts, ignore_index=True)
+
+    def dropColumns(self, names):
+        """
+        Drop loaded columns to free memory. They will be loaded again by
+        `loadColumns`. Does nothing if all columns are loaded.
+
+        Args:
+            names[list]: Names of the columns
+        """
+        if self._usecols is None:
+            return
+        names = [n for n in names if n in self._usecols and n != self._index]
+        self._usecols.difference_update(names)
+        self._data = self._data.drop(
+            columns=[n for n in names if n in self._data.columns])
+        if self._buffers is not None:
+            for name in names:
+                self._buffers.pop(name, None)
 
     def update(self):
         """
@@ -116,19 +626,24 @@ class MooseDataFrame(object):
             retcode = MooseDataFrame.INVALID
 
         else:
+            self._first_new_row = len(self._data)
             modified = os.path.getmtime(self._filename)
             if modified != self._modified:
                 retcode = MooseDataFrame.UPDATED
                 try:
                     self._modified = modified
-                    self._data = pandas.read_csv(self._filename)
-                    if self._index:
-                        self._data.set_index(self._index, inplace=True)
-
-                    if self._add_peacock_index:
-                        series = pandas.Series(self._data.index,
-                                               index=self._data.index)
-                        self._data.insert(0, 'index (Peacock)', series)
+                    with open(self._filename, 'rb') as f:
+                        header = f.readline()
+                        if (self._header is None or
+                                header != self._header or
+                                self.filesize < self._offset):
+                            # new, truncated or rewritten file
+                            if not (self._cache_dir is not None and
+                                    self._readCache()):
+                                f.seek(0)
+                                self._readFull(f)
+                        elif not self._readTail(f):
+                            retcode = MooseDataFrame.NOCHANGE
                     # message.mooseDebug("Reading csv file: {}".format(
                     #    self._filename))
                 except Exception:
@@ -17,6 +17,9 @@ class PostprocessorReader(MooseDataFrame):
 
     Args:
         filename[str]: The csv file to read.
+
+    With `columns` given (see MooseDataFrame), `variables()` lists all
+    columns of the file, but column data is loaded only when it is accessed.
     """
 
     def __init__(self, filename, **kwargs):
@@ -33,6 +36,10 @@ class PostprocessorReader(MooseDataFrame):
             warning: When true (default) an error is produced if the users
             tries to use 'time' option, which does nothing.
         """
+        if isinstance(keys, str):
+            self.loadColumns([keys])
+        else:
+            self.loadColumns(keys)
         return self._data[keys]
 
     def __contains__(self, variable):
@@ -42,6 +49,8 @@ class PostprocessorReader(MooseDataFrame):
         return variable in self.variables()
 
     def variables(self):
+        if self._usecols is not None and self._columns is not None:
+            return self._columns
         return self._data.keys()
 
     def repr(self):
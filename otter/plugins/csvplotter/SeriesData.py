@@ -0,0 +1,164 @@
+import numpy as np
+
+
+class SeriesData:
+    """
+    x and y values of a chart series.
+
+    Values are kept in NumPy buffers that grow by doubling, so appending new
+    rows does not copy the data already stored. Charts do not plot these
+    values directly, but a decimated subset of them (see `decimate`).
+
+    Extrema are updated from the appended values only, so they are always
+    available without looking at the whole data. NaNs are ignored.
+    """
+
+    # Initial capacity of the buffers
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all values
+        """
+        self._x = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self._y = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self._size = 0
+        # True if x-values never decrease
+        self._sorted = True
+        self._xmin = None
+        self._xmax = None
+        self._ymin = None
+        self._ymax = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def x(self):
+        return self._x[:self._size]
+
+    @property
+    def y(self):
+        return self._y[:self._size]
+
+    @property
+    def xmin(self):
+        return self._xmin
+
+    @property
+    def xmax(self):
+        return self._xmax
+
+    @property
+    def ymin(self):
+        return self._ymin
+
+    @property
+    def ymax(self):
+        return self._ymax
+
+    @staticmethod
+    def _extrema(values, vmin, vmax):
+        """
+        Extend extrema `vmin`, `vmax` (which are `None` if not known yet)
+        by `values`
+        """
+        # fmin/fmax skip NaNs and return NaN only if there is nothing else
+        lo = float(np.fmin.reduce(values))
+        hi = float(np.fmax.reduce(values))
+        if not np.isnan(lo):
+            vmin = lo if vmin is None else min(vmin, lo)
+        if not np.isnan(hi):
+            vmax = hi if vmax is None else max(vmax, hi)
+        return vmin, vmax
+
+    def append(self, xdata, ydata):
+        """
+        Append values
+
+        @param xdata x-values (array-like)
+        @param ydata y-values (array-like)
+        """
+        x = np.asarray(xdata, dtype=np.float64)
+        y = np.asarray(ydata, dtype=np.float64)
+        n = min(len(x), len(y))
+        if n == 0:
+            return
+
+        end = self._size + n
+        if end > len(self._x):
+            capacity = max(end, 2 * len(self._x))
+            self._x = np.resize(self._x, capacity)
+            self._y = np.resize(self._y, capacity)
+
+        if self._sorted:
+            if self._size > 0 and x[0] < self._x[self._size - 1]:
+                self._sorted = False
+            elif n > 1 and np.any(x[1:n] < x[:n - 1]):
+                self._sorted = False
+
+        self._x[self._size:end] = x[:n]
+        self._y[self._size:end] = y[:n]
+        self._size = end
+
+        self._xmin, self._xmax = self._extrema(x[:n], self._xmin, self._xmax)
+        self._ymin, self._ymax = self._extrema(y[:n], self._ymin, self._ymax)
+
+    def decimate(self, xmin, xmax, n_buckets, log=False):
+        """
+        Pick values to plot over an x-range.
+
+        The range is split into `n_buckets` buckets of the same width and
+        from each bucket only the first, last, minimal and maximal values are
+        kept, so peaks stay visible. With one bucket per pixel, the plot
+        looks the same as if all values were plotted. The closest value on
+        either side of the range is kept, so lines reach the plot edges.
+
+        Values are returned as they are if there are not many of them or if
+        the x-values are not sorted.
+
+        @param xmin Lower bound of the x-range
+        @param xmax Upper bound of the x-range
+        @param n_buckets Number of buckets
+        @param log `True` if the buckets should have the same width on a
+                   logarithmic scale
+        @return Tuple (x, y) with the values to plot
+        """
+        x = self.x
+        y = self.y
+        if not self._sorted or xmin is None or xmax is None or \
+                xmax <= xmin or n_buckets < 1 or (log and xmin <= 0):
+            return x, y
+
+        lo = max(np.searchsorted(x, xmin, side='left') - 1, 0)
+        hi = min(np.searchsorted(x, xmax, side='right') + 1, len(x))
+        if hi - lo <= 4 * n_buckets:
+            return x[lo:hi], y[lo:hi]
+
+        xs = x[lo:hi]
+        ys = y[lo:hi]
+        if log:
+            edges = np.geomspace(xmin, xmax, n_buckets + 1)
+        else:
+            edges = np.linspace(xmin, xmax, n_buckets + 1)
+        starts = np.unique(np.searchsorted(xs, edges[:-1], side='left'))
+        # values outside of the range end up in the first and last bucket
+        starts[0] = 0
+        starts = starts[starts < len(xs)]
+        ends = np.append(starts[1:], len(xs))
+
+        # bucket of each value
+        bucket = np.repeat(np.arange(len(starts)), ends - starts)
+        keep = [starts, ends - 1]
+        # NaNs are ignored, buckets with NaNs only keep their first and last
+        # values
+        for reduce in [np.fmin, np.fmax]:
+            extreme = reduce.reduceat(ys, starts)
+            hits = np.flatnonzero(ys == extreme[bucket])
+            unused, first = np.unique(bucket[hits], return_index=True)
+            keep.append(hits[first])
+        idx = np.unique(np.concatenate(keep))
+        return xs[idx], ys[idx]
@@ -0,0 +1,279 @@
+import collections
+import threading
+import numpy as np
+import vtk
+from vtk.util import numpy_support
+
+PickedCell = collections.namedtuple(
+    'PickedCell', [
+        'key', 'geometry', 'cell_id', 'point_id', 'position'
+    ])
+
+
+class BlockPicker:
+    """
+    Picks cells and points of block surfaces under the mouse.
+
+    Every surface gets a vtkStaticCellLocator. Locators are built once in a
+    background thread after the surfaces are added (a pick that needs a
+    locator that is not ready yet builds it on the spot). A pick casts a ray
+    from the camera through the mouse position, drops blocks whose bounding
+    box the ray misses and queries locators of the remaining ones nearest
+    first, so a pick does not depend on the number of cells in the mesh.
+    """
+
+    # Tolerance of ray-cell intersections, relative to the size of a surface
+    TOLERANCE = 1e-6
+
+    def __init__(self, renderer):
+        """
+        @param renderer vtkRenderer the surfaces are shown in
+        """
+        self._renderer = renderer
+        self._lock = threading.Lock()
+        # list of (key, actor, geometry)
+        self._targets = []
+        # target index -> (copy of the geometry, vtkStaticCellLocator)
+        self._locators = {}
+        self._generic_cell = vtk.vtkGenericCell()
+
+    def clear(self):
+        with self._lock:
+            self._targets = []
+            self._locators = {}
+
+    def add(self, key, actor, geometry):
+        """
+        Add a surface that can be picked
+
+        @param key Value identifying the surface in picked results
+        @param actor vtkActor showing the surface
+        @param geometry vtkPolyData with the surface
+        """
+        self._targets.append((key, actor, geometry))
+
+    def build(self):
+        """
+        Build locators of all surfaces in a background thread
+        """
+        # locators are built for shallow copies, so building them does not
+        # touch data that is being rendered
+        copies = []
+        for key, actor, geometry in self._targets:
+            data = vtk.vtkPolyData()
+            data.ShallowCopy(geometry)
+            copies.append(data)
+        with self._lock:
+            self._locators = {}
+            locators = self._locators
+        thread = threading.Thread(
+            target=self._buildLocators, args=(copies, locators), daemon=True)
+        thread.start()
+
+    def _buildLocators(self, copies, locators):
+        for index, data in enumerate(copies):
+            self._locator(index, data, locators)
+
+    def _locator(self, index, data, locators):
+        """
+        Get the locator of a target, building it if needed
+
+        Locators are built without holding the lock, so a pick does not wait
+        for the background thread to build locators of other targets. If
+        both build the same locator, the first one stored is used.
+
+        @return (data the locator was built for, vtkStaticCellLocator)
+        """
+        with self._lock:
+            entry = locators.get(index)
+        if entry is not None:
+            return entry
+        data.BuildCells()
+        locator = vtk.vtkStaticCellLocator()
+        locator.SetDataSet(data)
+        locator.BuildLocator()
+        with self._lock:
+            return locators.setdefault(index, (data, locator))
+
+    def isReady(self):
+        """
+        @return `True` if locators of all surfaces are built
+        """
+        with self._lock:
+            return len(self._locators) == len(self._targets)
+
+    def _ray(self, x, y):
+        """
+        @return end points of the ray through display point (x, y) in world
+                coordinates
+        """
+        points = []
+        for z in [0., 1.]:
+            self._renderer.SetDisplayPoint(x, y, z)
+            self._renderer.DisplayToWorld()
+            pt = np.array(self._renderer.GetWorldPoint())
+            points.append(pt[:3] / pt[3])
+        return points
+
+    @staticmethod
+    def _intersectBoxes(p0, p1, bounds):
+        """
+        Intersect segment p0-p1 with axis aligned boxes
+
+        @param bounds (n, 6) array of box bounds
+        @return array of parameters where the segment enters the boxes, the
+                value is `inf` for boxes the segment misses
+        """
+        d = p1 - p0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv = 1. / d
+            t1 = (bounds[:, 0::2] - p0) * inv
+            t2 = (bounds[:, 1::2] - p0) * inv
+        # nan comes from a segment lying in the plane of a box face
+        t_enter = np.nanmax(np.minimum(t1, t2), axis=1, initial=0.)
+        t_exit = np.nanmin(np.maximum(t1, t2), axis=1, initial=1.)
+        return np.where(t_enter <= t_exit, t_enter, np.inf)
+
+    def pick(self, x, y):
+        """
+        Pick the cell under display point (x, y)
+
+        @return PickedCell or `None` if there is nothing under the point
+        """
+        targets = self._targets
+        if len(targets) == 0:
+            return None
+        p0, p1 = self._ray(x, y)
+
+        bounds = np.array([actor.GetBounds() for k, actor, g in targets])
+        # flat blocks have boxes with zero thickness
+        pad = 1e-6 * np.linalg.norm(
+            bounds[:, 1::2].max(axis=0) - bounds[:, 0::2].min(axis=0))
+        bounds[:, 0::2] -= pad
+        bounds[:, 1::2] += pad
+        t_enter = self._intersectBoxes(p0, p1, bounds)
+        visible = np.array([actor.GetVisibility() for k, actor, g in targets],
+                           dtype=bool)
+        t_enter[~visible] = np.inf
+
+        best = None
+        for index in np.argsort(t_enter):
+            # blocks are sorted by where the ray enters them, so no block
+            # further on can have a closer cell
+            if np.isinf(t_enter[index]) or \
+                    (best is not None and t_enter[index] > best[0]):
+                break
+            hit = self._pickTarget(index, x, y, p0, p1)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = (hit[0], index) + hit[1:]
+
+        if best is None:
+            return None
+        t, index, data, cell_id, position = best
+        key, actor, geometry = targets[index]
+        return PickedCell(key=key, geometry=geometry, cell_id=cell_id,
+                          point_id=self._closestPoint(data, cell_id, position),
+                          position=position)
+
+    def _pickTarget(self, index, x, y, p0, p1):
+        """
+        Intersect the ray with the cells of a single target
+
+        @return (parameter along the ray, data, cell ID, position in model
+                coordinates) of the closest visible cell or `None`
+        """
+        key, actor, geometry = self._targets[index]
+        locators = self._locators
+        entry = locators.get(index)
+        if entry is None:
+            data = vtk.vtkPolyData()
+            data.ShallowCopy(geometry)
+            entry = self._locator(index, data, locators)
+        data, locator = entry
+
+        # the ray goes into model coordinates of the actor, which can be
+        # scaled or moved (e.g. when exploded)
+        matrix = vtk.vtkMatrix4x4()
+        vtk.vtkMatrix4x4.Invert(actor.GetMatrix(), matrix)
+        q0 = np.array(matrix.MultiplyPoint(list(p0) + [1.]))
+        q1 = np.array(matrix.MultiplyPoint(list(p1) + [1.]))
+        q0 = q0[:3] / q0[3]
+        q1 = q1[:3] / q1[3]
+
+        if data.GetNumberOfPolys() + data.GetNumberOfStrips() > 0:
+            cell_ids, positions = self._intersectCells(
+                data, locator, q0, q1)
+            if len(cell_ids) == 0:
+                return None
+        else:
+            # a ray hardly ever hits lines or vertices exactly, those are
+            # picked with a tolerance by the VTK picker
+            cell_ids, positions = self._pickWithCellPicker(
+                x, y, actor, matrix)
+            if len(cell_ids) == 0:
+                return None
+
+        d = q1 - q0
+        t = (positions - q0) @ d / (d @ d)
+        ghosts = data.GetCellData().GetArray(
+            vtk.vtkDataSetAttributes.GhostArrayName())
+        if ghosts is not None:
+            hidden = numpy_support.vtk_to_numpy(ghosts)[cell_ids] & \
+                vtk.vtkDataSetAttributes.HIDDENCELL
+            t[hidden != 0] = np.inf
+        i = np.argmin(t)
+        if np.isinf(t[i]):
+            return None
+        return t[i], data, int(cell_ids[i]), positions[i]
+
+    def _intersectCells(self, data, locator, q0, q1):
+        """
+        Intersect segment q0-q1 with the cells of a surface. Only cells in
+        the locator bins along the segment are tested.
+
+        @return (cell IDs, (n, 3) array of intersection points)
+        """
+        # without a tolerance, cells lying on a boundary of the locator bins
+        # can be missed
+        tol = self.TOLERANCE * data.GetLength()
+        ids = vtk.vtkIdList()
+        locator.FindCellsAlongLine(q0, q1, tol, ids)
+        cell_ids = []
+        positions = []
+        t = vtk.reference(0.)
+        sub_id = vtk.reference(0)
+        for i in range(ids.GetNumberOfIds()):
+            cell_id = ids.GetId(i)
+            data.GetCell(cell_id, self._generic_cell)
+            x = [0., 0., 0.]
+            pcoords = [0., 0., 0.]
+            if self._generic_cell.IntersectWithLine(
+                    q0, q1, tol, t, x, pcoords, sub_id):
+                cell_ids.append(cell_id)
+                positions.append(x)
+        return (np.array(cell_ids, dtype=int),
+                np.array(positions, dtype=float).reshape(-1, 3))
+
+    def _pickWithCellPicker(self, x, y, actor, matrix):
+        picker = vtk.vtkCellPicker()
+        picker.PickFromListOn()
+        picker.AddPickList(actor)
+        if not picker.Pick(x, y, 0, self._renderer):
+            return np.zeros(0, dtype=int), np.zeros((0, 3))
+        pos = np.array(matrix.MultiplyPoint(
+            list(picker.GetPickPosition()) + [1.]))
+        return np.array([picker.GetCellId()]), np.array([pos[:3] / pos[3]])
+
+    @staticmethod
+    def _closestPoint(data, cell_id, position):
+        """
+        @return ID of the point of a cell closest to `position`
+        """
+        ids = vtk.vtkIdList()
+        data.GetCellPoints(cell_id, ids)
+        point_ids = [ids.GetId(i) for i in range(ids.GetNumberOfIds())]
+        if len(point_ids) == 0:
+            return None
+        coords = np.array([data.GetPoint(i) for i in point_ids])
+        dist = np.linalg.norm(coords - position, axis=1)
+        return point_ids[int(np.argmin(dist))]
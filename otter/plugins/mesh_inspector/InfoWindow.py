@@ -273,6 +273,23 @@ class InfoWindow(QtWidgets.QScrollArea):
             self._loadNodeSets(params['nodesets'])
             self._fillSummary(params)
 
+    def onGeometryLoaded(self):
+        """
+        Called when the geometry of the file is ready. Sends the current
+        state of blocks and sets, since the changes made while it was being
+        loaded had nothing to apply to.
+        """
+        for row in range(self._block_model.rowCount()):
+            self.onBlockChanged(self._block_model.item(row, self.IDX_NAME))
+            self.onBlockChanged(self._block_model.item(row, self.IDX_COLOR))
+        for row in range(self._sideset_model.rowCount()):
+            self.onSidesetChanged(
+                self._sideset_model.item(row, self.IDX_NAME))
+        for row in range(self._nodeset_model.rowCount()):
+            self.onNodesetChanged(
+                self._nodeset_model.item(row, self.IDX_NAME))
+        self.setEnabled(True)
+
     def onBlockChanged(self, item):
         if item.column() == self.IDX_NAME:
             visible = item.checkState() == QtCore.Qt.Checked
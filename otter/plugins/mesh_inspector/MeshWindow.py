@@ -1,18 +1,24 @@
 import os
+import time
 import vtk
 from PyQt5 import QtCore, QtWidgets, QtGui
 from vtk.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 from otter.plugins.PluginWindowBase import PluginWindowBase
 from otter.plugins.common.OtterInteractorStyle3D import OtterInteractorStyle3D
 from otter.plugins.common.OtterInteractorStyle2D import OtterInteractorStyle2D
+from otter.plugins.common.Reader import Reader
 from otter.plugins.common.ExodusIIReader import ExodusIIReader
+from otter.plugins.common.NemesisReader import NemesisReader
 from otter.plugins.common.VTKReader import VTKReader
 from otter.plugins.common.PetscHDF5Reader import PetscHDF5Reader
 from otter.plugins.common.LoadFileEvent import LoadFileEvent
 from otter.plugins.common.NotificationWidget import NotificationWidget
+from otter.plugins.common.RenderScheduler import RenderScheduler
 from otter.plugins.common.FileChangedNotificationWidget import \
     FileChangedNotificationWidget
+from otter.plugins.common.BlockExtractor import BlockExtractor
 from otter.plugins.common.BlockObject import BlockObject
+from otter.plugins.common.MergedBlocksObject import MergedBlocksObject
 from otter.plugins.common.SideSetObject import SideSetObject
 from otter.plugins.common.NodeSetObject import NodeSetObject
 import otter.plugins.common as common
@@ -22,6 +28,7 @@ from otter.plugins.mesh_inspector.SelectedMeshEntityInfoWidget import \
     SelectedMeshEntityInfoWidget
 from otter.plugins.mesh_inspector.ExplodeWidget import ExplodeWidget
 from otter.plugins.mesh_inspector.Selection import Selection
+from otter.plugins.mesh_inspector.BlockPicker import BlockPicker
 from otter.plugins.mesh_inspector.color_profiles import default
 from otter.plugins.mesh_inspector.color_profiles import light
 from otter.plugins.mesh_inspector.color_profiles import dark
@@ -30,23 +37,112 @@ from otter.plugins.mesh_inspector.color_profiles import dark
 class LoadThread(QtCore.QThread):
     """ Worker thread for loading ExodusII files """
 
-    def __init__(self, file_name):
+    metadataLoaded = QtCore.pyqtSignal()
+    # percent done, description of the current step
+    progress = QtCore.pyqtSignal(int, str)
+
+    def __init__(self, file_name, merge_threshold, reader=None):
+        """
+        @param file_name File to load
+        @param merge_threshold Minimum number of blocks for which the block
+                               surfaces are merged into a single polydata
+        @param reader Reader that loaded the file before. If given, only the
+                      changes since then are read (see `Reader.update`).
+        """
         super().__init__()
-        if file_name.endswith('.e') or file_name.endswith('.exo'):
+        self._merge_threshold = merge_threshold
+        self._update = reader is not None
+        self._result = None
+        if reader is not None:
+            self._reader = reader
+        elif file_name.endswith('.e') or file_name.endswith('.exo'):
             self._reader = ExodusIIReader(file_name)
+        elif NemesisReader.isNemesisFile(file_name):
+            self._reader = NemesisReader(file_name)
         elif file_name.endswith('.vtk'):
             self._reader = VTKReader(file_name)
         elif file_name.endswith('.h5'):
             self._reader = PetscHDF5Reader(file_name)
         else:
             self._reader = None
+        # block number -> ExtractedBlock
+        self._blocks = {}
+        self._side_sets = {}
+        self._node_sets = {}
+        self._merged_geometry = None
 
     def run(self):
-        self._reader.load()
+        if self._update:
+            self._result = self._reader.update()
+            # the mesh is the same, but moving points have to be extracted
+            # again
+            if self._result == Reader.APPENDED and \
+                    self._reader.hasDisplacements():
+                self._extractBlocks()
+            return
+
+        self._reader.setProgressCallback(self.onReaderProgress)
+        try:
+            if self._reader.loadMetadata():
+                self.metadataLoaded.emit()
+            self._reader.load()
+            if not self._reader.isCancelled():
+                self._extractBlocks()
+        finally:
+            self._reader.setProgressCallback(None)
+
+    def onReaderProgress(self, fraction, text):
+        self.progress.emit(int(100 * fraction), text)
+
+    def _extractBlocks(self):
+        port = self._reader.getVtkOutputPort()
+        data = port.GetProducer().GetOutputDataObject(port.GetIndex())
+        extractor = BlockExtractor(data)
+        objects = [
+            (self._blocks, list(self._reader.getBlocks())),
+            (self._side_sets, list(self._reader.getSideSets())),
+            (self._node_sets, list(self._reader.getNodeSets()))
+        ]
+        total = sum(len(infos) for unused, infos in objects)
+        done = 0
+        for extracted, infos in objects:
+            for info in infos:
+                if self._reader.isCancelled():
+                    return
+                extracted[info.number] = \
+                    extractor.extract(info.multiblock_index)
+                done += 1
+                self.progress.emit(
+                    100 * done // total,
+                    "Built {} of {} blocks and sets".format(done, total))
+        if len(self._blocks) >= self._merge_threshold:
+            self._merged_geometry = BlockExtractor.merge(
+                list(self._blocks.values()))
 
     def getReader(self):
         return self._reader
 
+    def getResult(self):
+        """
+        @return Result of `Reader.update` when updating a loaded file
+        """
+        return self._result
+
+    def getBlocks(self):
+        return self._blocks
+
+    def getSideSets(self):
+        return self._side_sets
+
+    def getNodeSets(self):
+        return self._node_sets
+
+    def getMergedGeometry(self):
+        """
+        @return Merged block surfaces or `None` if blocks were not merged
+        """
+        return self._merged_geometry
+
 
 class MeshWindow(PluginWindowBase):
     """
@@ -54,6 +150,7 @@ class MeshWindow(PluginWindowBase):
     """
 
     fileLoaded = QtCore.pyqtSignal(object)
+    geometryLoaded = QtCore.pyqtSignal()
     boundsChanged = QtCore.pyqtSignal(list)
 
     SIDESET_CLR = QtGui.QColor(255, 173, 79)
@@ -77,13 +174,21 @@ class MeshWindow(PluginWindowBase):
     COLOR_PROFILE_LIGHT = 1
     COLOR_PROFILE_DARK = 2
 
+    # Files with at least this many blocks are rendered with a single actor
+    MERGED_BLOCKS_THRESHOLD = 1000
+
     def __init__(self, plugin):
         super().__init__(plugin)
         self._load_thread = None
+        # cancelled load threads that did not stop yet
+        self._cancelled_threads = []
+        self._metadata_loaded = False
         self._progress = None
+        self._progress_label = None
         self._file_name = None
         self._file_watcher = QtCore.QFileSystemWatcher()
         self._selected_block = None
+        self._merged_blocks = None
 
         self.setupWidgets()
         self.setupMenuBar()
@@ -95,6 +200,8 @@ class MeshWindow(PluginWindowBase):
 
         self.connectSignals()
         self.setupVtk()
+        self._render_scheduler = RenderScheduler(
+            self._vtk_render_window, self)
         self.setColorProfile()
 
         self._vtk_interactor.Initialize()
@@ -106,16 +213,13 @@ class MeshWindow(PluginWindowBase):
         self.clear()
         self.show()
 
-        self._update_timer = QtCore.QTimer()
-        self._update_timer.timeout.connect(self.onUpdateWindow)
-        self._update_timer.start(250)
-
         QtCore.QTimer.singleShot(1, self._updateViewModeLocation)
 
     def setupWidgets(self):
         self._vtk_widget = QVTKRenderWindowInteractor(self)
         self._vtk_renderer = vtk.vtkRenderer()
         self._vtk_widget.GetRenderWindow().AddRenderer(self._vtk_renderer)
+        self._picker = BlockPicker(self._vtk_renderer)
 
         self.setCentralWidget(self._vtk_widget)
 
@@ -223,6 +327,12 @@ class MeshWindow(PluginWindowBase):
         self._view_info_wnd_action.setCheckable(True)
         color_profile_menu = view_menu.addMenu("Color profile")
         self.setupColorProfileMenu(color_profile_menu)
+        view_menu.addSeparator()
+        self._merge_blocks_action = view_menu.addAction("Merge blocks")
+        self._merge_blocks_action.setCheckable(True)
+        self._merge_blocks_action.setChecked(
+            self.plugin.settings.value("merge_blocks", False, type=bool))
+        self._merge_blocks_action.toggled.connect(self.onMergeBlocksToggled)
 
         tools_menu = self._menubar.addMenu("Tools")
         self.setupSelectModeMenu(tools_menu)
@@ -303,10 +413,13 @@ class MeshWindow(PluginWindowBase):
 
     def updateMenuBar(self):
         self._view_info_wnd_action.setChecked(self._info_window.isVisible())
-        self._tools_explode_action.setEnabled(self._file_name is not None)
+        # exploding moves block actors, merged blocks share one
+        self._tools_explode_action.setEnabled(
+            self._file_name is not None and self._merged_blocks is None)
 
     def connectSignals(self):
         self.fileLoaded.connect(self._info_window.onFileLoaded)
+        self.geometryLoaded.connect(self._info_window.onGeometryLoaded)
         self.boundsChanged.connect(
             self._info_window.onBoundsChanged)
         self._info_window.blockVisibilityChanged.connect(
@@ -382,8 +495,10 @@ class MeshWindow(PluginWindowBase):
 
     def clear(self):
         self._blocks = {}
+        self._merged_blocks = None
         self._side_sets = {}
         self._node_sets = {}
+        self._picker.clear()
         self._vtk_renderer.RemoveAllViewProps()
 
         watched_files = self._file_watcher.files()
@@ -391,6 +506,7 @@ class MeshWindow(PluginWindowBase):
             self._file_watcher.removePath(file)
 
         self._selection = None
+        self._render_scheduler.requestRender()
 
     def checkFileExists(self, file_name):
         if os.path.exists(file_name):
@@ -406,18 +522,101 @@ class MeshWindow(PluginWindowBase):
         if not self.checkFileExists(file_name):
             return
 
+        self._progress_label = "Loading {}...".format(
+            os.path.basename(file_name))
         self._progress = QtWidgets.QProgressDialog(
-            "Loading {}...".format(os.path.basename(file_name)),
-            None, 0, 0, self)
+            self._progress_label, "Cancel", 0, 100, self)
         self._progress.setWindowModality(QtCore.Qt.WindowModal)
         self._progress.setMinimumDuration(0)
+        # steps of loading report their progress from 0 to 100 one after
+        # another, so the dialog must not close when a step is done
+        self._progress.setAutoReset(False)
+        self._progress.setAutoClose(False)
+        self._progress.canceled.connect(self.onLoadCancelled)
         self._progress.show()
 
-        self._load_thread = LoadThread(file_name)
+        self._metadata_loaded = False
+        if self._merge_blocks_action.isChecked():
+            merge_threshold = 0
+        else:
+            merge_threshold = self.MERGED_BLOCKS_THRESHOLD
+        self._load_thread = LoadThread(file_name, merge_threshold)
+        self._load_thread.metadataLoaded.connect(self.onMetadataLoaded)
+        self._load_thread.progress.connect(self.onLoadProgress)
         self._load_thread.finished.connect(self.onLoadFinished)
         self._load_thread.start(QtCore.QThread.IdlePriority)
 
+    def onLoadProgress(self, percent, text):
+        if self._isStaleLoadSignal() or self._progress is None:
+            return
+        if len(text) > 0:
+            text = "{}\n{}".format(self._progress_label, text)
+        else:
+            text = self._progress_label
+        self._progress.setLabelText(text)
+        # a modal dialog processes events here, so loading can finish
+        # during the call
+        self._progress.setValue(percent)
+
+    def _isStaleLoadSignal(self):
+        """
+        Signals of a cancelled load thread that were queued before it was
+        cancelled are still delivered, those must be ignored
+        """
+        return self.sender() is not self._load_thread
+
+    def onLoadCancelled(self):
+        """
+        Called when the user cancels loading. The load thread can not be
+        stopped right away, so it is left to finish and its result is
+        dropped.
+        """
+        thread = self._load_thread
+        thread.getReader().cancel()
+        thread.metadataLoaded.disconnect(self.onMetadataLoaded)
+        thread.progress.disconnect(self.onLoadProgress)
+        thread.finished.disconnect(self.onLoadFinished)
+        self._cancelled_threads.append(thread)
+        thread.finished.connect(
+            lambda: self._cancelled_threads.remove(thread))
+        self._load_thread = None
+
+        self._progress.hide()
+        self._progress = None
+        file_name = thread.getReader().getFileName()
+        self.onNewFile()
+        self._info_window.setEnabled(True)
+        self.showNotification("Loading of '{}' was cancelled.".format(
+            os.path.basename(file_name)))
+
+    def _fileParams(self, reader):
+        return {
+            'blocks': reader.getBlocks(),
+            'sidesets': reader.getSideSets(),
+            'nodesets': reader.getNodeSets(),
+            'total_elems': reader.getTotalNumberOfElements(),
+            'total_nodes': reader.getTotalNumberOfNodes()
+        }
+
+    def onMetadataLoaded(self):
+        """
+        Called when the file header was read. Geometry is still being
+        loaded in the background at this point, so the info window is shown
+        but disabled until it is done.
+        """
+        if self._isStaleLoadSignal():
+            return
+        reader = self._load_thread.getReader()
+        self._metadata_loaded = True
+        self._info_window.setEnabled(False)
+        self.fileLoaded.emit(self._fileParams(reader))
+        self._progress_label = "Loading geometry of {}...".format(
+            os.path.basename(reader.getFileName()))
+        self._progress.setLabelText(self._progress_label)
+
     def onLoadFinished(self):
+        if self._isStaleLoadSignal():
+            return
         reader = self._load_thread.getReader()
 
         self._addBlocks()
@@ -436,14 +635,10 @@ class MeshWindow(PluginWindowBase):
         self._cube_axes_actor.SetBounds(*bnds)
         self._vtk_renderer.AddViewProp(self._cube_axes_actor)
 
-        params = {
-            'blocks': reader.getBlocks(),
-            'sidesets': reader.getSideSets(),
-            'nodesets': reader.getNodeSets(),
-            'total_elems': reader.getTotalNumberOfElements(),
-            'total_nodes': reader.getTotalNumberOfNodes()
-        }
-        self.fileLoaded.emit(params)
+        if self._metadata_loaded:
+            self.geometryLoaded.emit()
+        else:
+            self.fileLoaded.emit(self._fileParams(reader))
         self.boundsChanged.emit(bnds)
 
         self._file_name = reader.getFileName()
@@ -452,9 +647,10 @@ class MeshWindow(PluginWindowBase):
         self._file_watcher.addPath(self._file_name)
         self._file_changed_notification.setFileName(self._file_name)
 
-        self._selection = Selection(self._geometry.GetOutput())
+        self._selection = Selection(self._geometry)
         self._setSelectionProperties(self._selection)
         self._vtk_renderer.AddActor(self._selection.getActor())
+        self._picker.build()
 
         self._progress.hide()
         self._progress = None
@@ -472,51 +668,51 @@ class MeshWindow(PluginWindowBase):
         camera.SetPosition(focal_point[0], focal_point[1], 1)
         camera.SetRoll(0)
         self._vtk_renderer.ResetCamera()
+        self._render_scheduler.requestRender()
 
     def _addBlocks(self):
-        camera = self._vtk_renderer.GetActiveCamera()
-        reader = self._load_thread.getReader()
-
-        for index, binfo in enumerate(reader.getBlocks()):
-            eb = vtk.vtkExtractBlock()
-            eb.SetInputConnection(reader.getVtkOutputPort())
-            eb.AddIndex(binfo.multiblock_index)
-            eb.Update()
+        blocks = self._load_thread.getBlocks()
+        merged_geometry = self._load_thread.getMergedGeometry()
+        if merged_geometry is not None:
+            self._addMergedBlocks(blocks, merged_geometry)
+            return
 
-            block = BlockObject(eb, camera)
+        camera = self._vtk_renderer.GetActiveCamera()
+        for number, data in blocks.items():
+            block = BlockObject(data, camera)
             self._setBlockProperties(block)
-            self._blocks[binfo.number] = block
+            self._blocks[number] = block
 
             self._vtk_renderer.AddViewProp(block.actor)
             self._vtk_renderer.AddViewProp(block.silhouette_actor)
-            # FIXME: make this work with multiple blocks
+            self._picker.add(number, block.actor, block.geometry)
+            # cells and points are selected from the geometry of the block
+            # they were picked in
             self._geometry = block.geometry
 
-    def _addSidesets(self):
-        reader = self._load_thread.getReader()
+    def _addMergedBlocks(self, blocks, geometry):
+        camera = self._vtk_renderer.GetActiveCamera()
+        self._merged_blocks = MergedBlocksObject(blocks, geometry, camera)
+        for number, block in self._merged_blocks.blocks.items():
+            self._setBlockProperties(block)
+            self._blocks[number] = block
 
-        for index, finfo in enumerate(reader.getSideSets()):
-            eb = vtk.vtkExtractBlock()
-            eb.SetInputConnection(reader.getVtkOutputPort())
-            eb.AddIndex(finfo.multiblock_index)
-            eb.Update()
+        self._vtk_renderer.AddViewProp(self._merged_blocks.actor)
+        self._vtk_renderer.AddViewProp(self._merged_blocks.silhouette_actor)
+        self._picker.add(None, self._merged_blocks.actor, geometry)
+        self._geometry = self._merged_blocks.geometry
 
-            sideset = SideSetObject(eb)
-            self._side_sets[finfo.number] = sideset
+    def _addSidesets(self):
+        for number, data in self._load_thread.getSideSets().items():
+            sideset = SideSetObject(data)
+            self._side_sets[number] = sideset
             self._vtk_renderer.AddViewProp(sideset.actor)
             self._setSideSetProperties(sideset)
 
     def _addNodeSets(self):
-        reader = self._load_thread.getReader()
-
-        for index, ninfo in enumerate(reader.getNodeSets()):
-            eb = vtk.vtkExtractBlock()
-            eb.SetInputConnection(reader.getVtkOutputPort())
-            eb.AddIndex(ninfo.multiblock_index)
-            eb.Update()
-
-            nodeset = NodeSetObject(eb)
-            self._node_sets[ninfo.number] = nodeset
+        for number, data in self._load_thread.getNodeSets().items():
+            nodeset = NodeSetObject(data)
+            self._node_sets[number] = nodeset
             self._vtk_renderer.AddViewProp(nodeset.actor)
             self._setNodeSetProperties(nodeset)
 
@@ -551,6 +747,8 @@ class MeshWindow(PluginWindowBase):
         self._ori_marker.SetInteractive(False)
 
     def onBlockVisibilityChanged(self, block_id, visible):
+        if block_id not in self._blocks:
+            return
         block = self._getBlock(block_id)
         block.setVisible(visible)
         if (self.renderMode() == self.HIDDEN_EDGES_REMOVED or
@@ -558,8 +756,11 @@ class MeshWindow(PluginWindowBase):
             block.setSilhouetteVisible(block.visible)
         else:
             block.setSilhouetteVisible(False)
+        self._render_scheduler.requestRender()
 
     def onBlockColorChanged(self, block_id, qcolor):
+        if block_id not in self._blocks:
+            return
         clr = [qcolor.redF(), qcolor.greenF(), qcolor.blueF()]
         block = self._getBlock(block_id)
         block.setColor(clr)
@@ -569,26 +770,35 @@ class MeshWindow(PluginWindowBase):
             property.SetColor([1, 1, 1])
         else:
             property.SetColor(clr)
+        self._render_scheduler.requestRender()
 
     def onSidesetVisibilityChanged(self, sideset_id, visible):
+        if sideset_id not in self._side_sets:
+            return
         sideset = self._getSideSet(sideset_id)
         sideset.setVisible(visible)
+        self._render_scheduler.requestRender()
 
     def onNodesetVisibilityChanged(self, nodeset_id, visible):
+        if nodeset_id not in self._node_sets:
+            return
         nodeset = self._getNodeSet(nodeset_id)
         nodeset.setVisible(visible)
+        self._render_scheduler.requestRender()
 
     def onCubeAxisVisibilityChanged(self, visible):
         if visible:
             self._cube_axes_actor.VisibilityOn()
         else:
             self._cube_axes_actor.VisibilityOff()
+        self._render_scheduler.requestRender()
 
     def onOrientationmarkerVisibilityChanged(self, visible):
         if visible:
             self._ori_marker.EnabledOn()
         else:
             self._ori_marker.EnabledOff()
+        self._render_scheduler.requestRender()
 
     def onOpenFile(self):
         file_name, f = QtWidgets.QFileDialog.getOpenFileName(
@@ -596,6 +806,7 @@ class MeshWindow(PluginWindowBase):
             'Open File',
             "",
             "ExodusII files (*.e *.exo);;"
+            "Nemesis files (*.e.* *.exo.*);;"
             "HDF5 PETSc files (*.h5);;"
             "VTK Unstructured Grid files (*.vtk)")
         if file_name:
@@ -623,6 +834,7 @@ class MeshWindow(PluginWindowBase):
             block.setSilhouetteVisible(False)
         for sideset in self._side_sets.values():
             self._setSideSetProperties(sideset)
+        self._render_scheduler.requestRender()
 
     def onShadedWithEdgesTriggered(self, checked):
         self._render_mode = self.SHADED_WITH_EDGES
@@ -632,6 +844,7 @@ class MeshWindow(PluginWindowBase):
             block.setSilhouetteVisible(False)
         for sideset in self._side_sets.values():
             self._setSideSetProperties(sideset)
+        self._render_scheduler.requestRender()
 
     def onHiddenEdgesRemovedTriggered(self, checked):
         self._render_mode = self.HIDDEN_EDGES_REMOVED
@@ -641,6 +854,7 @@ class MeshWindow(PluginWindowBase):
             block.setSilhouetteVisible(block.visible)
         for sideset in self._side_sets.values():
             self._setSideSetProperties(sideset)
+        self._render_scheduler.requestRender()
 
     def onTransluentTriggered(self, checked):
         self._render_mode = self.TRANSLUENT
@@ -650,6 +864,7 @@ class MeshWindow(PluginWindowBase):
             block.setSilhouetteVisible(block.visible)
         for sideset in self._side_sets.values():
             self._setSideSetProperties(sideset)
+        self._render_scheduler.requestRender()
 
     def onPerspectiveToggled(self, checked):
         if checked:
@@ -771,9 +986,6 @@ class MeshWindow(PluginWindowBase):
             property.SetAmbient(1)
             property.SetDiffuse(0)
 
-    def onUpdateWindow(self):
-        self._vtk_render_window.Render()
-
     def event(self, e):
         if e.type() == LoadFileEvent.TYPE:
             self.loadFile(e.fileName())
@@ -784,6 +996,8 @@ class MeshWindow(PluginWindowBase):
     def closeEvent(self, event):
         self.plugin.settings.setValue("tools/select_mode", self._select_mode)
         self.plugin.settings.setValue("color_profile", self._color_profile_id)
+        self.plugin.settings.setValue(
+            "merge_blocks", self._merge_blocks_action.isChecked())
         super().closeEvent(event)
 
     def onFileChanged(self, path):
@@ -799,7 +1013,7 @@ class MeshWindow(PluginWindowBase):
         self._notification.setText(text)
         self._notification.adjustSize()
         width = self.geometry().width()
-        left = (width - self._notification.width()) / 2
+        left = int((width - self._notification.width()) / 2)
         # top = 10
         top = self.height() - self._notification.height() - 10
         self._notification.setGeometry(
@@ -821,7 +1035,72 @@ class MeshWindow(PluginWindowBase):
         self._file_changed_notification.show()
 
     def onReloadFile(self):
-        self.loadFile(self._file_name)
+        """
+        Read what changed in the file. If only time steps were appended, the
+        blocks, side sets, node sets and the camera are kept.
+        """
+        if self._load_thread is not None and self._load_thread.isRunning():
+            return
+        if self._load_thread is None or len(self._blocks) == 0:
+            self.loadFile(self._file_name)
+            return
+
+        if self._merged_blocks is not None:
+            merge_threshold = 0
+        else:
+            merge_threshold = len(self._blocks) + 1
+        self._load_thread = LoadThread(
+            self._file_name, merge_threshold,
+            self._load_thread.getReader())
+        self._load_thread.finished.connect(self.onUpdateFinished)
+        self._load_thread.start(QtCore.QThread.IdlePriority)
+
+    def onUpdateFinished(self):
+        if self._isStaleLoadSignal():
+            return
+        result = self._load_thread.getResult()
+        if result == Reader.CHANGED:
+            self.loadFile(self._file_name)
+            return
+        if result == Reader.NOCHANGE:
+            return
+
+        blocks = self._load_thread.getBlocks()
+        if len(blocks) == 0:
+            return
+        # the mesh is the same, so only the points move
+        merged_geometry = self._load_thread.getMergedGeometry()
+        if merged_geometry is not None:
+            self._updatePoints(
+                self._merged_blocks.geometry, merged_geometry)
+        for number, data in blocks.items():
+            self._updatePoints(self._blocks[number].geometry, data.geometry)
+        for number, data in self._load_thread.getSideSets().items():
+            self._updatePoints(
+                self._side_sets[number].geometry, data.geometry)
+        for number, data in self._load_thread.getNodeSets().items():
+            self._updatePoints(
+                self._node_sets[number].geometry, data.geometry)
+        self._picker.build()
+
+        gmin = QtGui.QVector3D(float('inf'), float('inf'), float('inf'))
+        gmax = QtGui.QVector3D(float('-inf'), float('-inf'), float('-inf'))
+        for data in blocks.values():
+            bmin, bmax = data.bounds
+            gmin = common.point_min(bmin, gmin)
+            gmax = common.point_max(bmax, gmax)
+        bnds = [gmin.x(), gmax.x(), gmin.y(), gmax.y(), gmin.z(), gmax.z()]
+        self._cube_axes_actor.SetBounds(*bnds)
+        self.boundsChanged.emit(bnds)
+        self._render_scheduler.requestRender()
+
+    def _updatePoints(self, geometry, new_geometry):
+        """
+        Move points of a polydata shown in the window
+        """
+        if geometry.GetNumberOfPoints() == new_geometry.GetNumberOfPoints():
+            geometry.SetPoints(new_geometry.GetPoints())
+            geometry.Modified()
 
     def _showSelectedMeshEntity(self):
         self._selected_mesh_ent_info.adjustSize()
@@ -844,6 +1123,7 @@ class MeshWindow(PluginWindowBase):
             self._setBlockProperties(block, selected=True)
         else:
             self._selected_mesh_ent_info.hide()
+        self._render_scheduler.requestRender()
 
     def _deselectBlocks(self):
         blk_id = self._selected_block
@@ -876,7 +1156,16 @@ class MeshWindow(PluginWindowBase):
                 return blk_id
         return None
 
+    def _selectMergedBlock(self, pt):
+        picked = self._picker.pick(pt.x(), pt.y())
+        if picked is not None:
+            blk_id = self._merged_blocks.blockAtCell(picked.cell_id)
+            self.onBlockSelectionChanged(blk_id)
+
     def _selectBlock(self, pt):
+        if self._merged_blocks is not None:
+            self._selectMergedBlock(pt)
+            return
         picker = vtk.vtkPropPicker()
         if picker.PickProp(pt.x(), pt.y(), self._vtk_renderer):
             actor = picker.GetViewProp()
@@ -889,16 +1178,28 @@ class MeshWindow(PluginWindowBase):
         }
         return nfo
 
+    def _pick(self, pt):
+        """
+        Pick the cell under a point in the window
+
+        @return tuple (PickedCell or `None`, time the pick took in seconds)
+        """
+        start = time.perf_counter()
+        picked = self._picker.pick(pt.x(), pt.y())
+        return picked, time.perf_counter() - start
+
     def _selectCell(self, pt):
-        picker = vtk.vtkCellPicker()
-        if picker.Pick(pt.x(), pt.y(), 0, self._vtk_renderer):
-            cell_id = picker.GetCellId()
+        picked, pick_time = self._pick(pt)
+        if picked is not None:
+            cell_id = picked.cell_id
+            self._selection.setInput(picked.geometry)
             self._selection.selectCell(cell_id)
             self._setSelectionProperties(self._selection)
 
             unstr_grid = self._selection.get()
             cell = unstr_grid.GetCell(0)
             nfo = self._buildCellInfo(cell)
+            nfo['pick_time'] = pick_time
             self._selected_mesh_ent_info.setCellInfo(cell_id, nfo)
             self._showSelectedMeshEntity()
 
@@ -910,15 +1211,17 @@ class MeshWindow(PluginWindowBase):
         return nfo
 
     def _selectPoint(self, pt):
-        picker = vtk.vtkPointPicker()
-        if picker.Pick(pt.x(), pt.y(), 0, self._vtk_renderer):
-            point_id = picker.GetPointId()
+        picked, pick_time = self._pick(pt)
+        if picked is not None and picked.point_id is not None:
+            point_id = picked.point_id
+            self._selection.setInput(picked.geometry)
             self._selection.selectPoint(point_id)
             self._setSelectionProperties(self._selection)
 
             unstr_grid = self._selection.get()
             points = unstr_grid.GetPoints()
             nfo = self._buildPointInfo(points)
+            nfo['pick_time'] = pick_time
             self._selected_mesh_ent_info.setPointInfo(point_id, nfo)
             self._showSelectedMeshEntity()
 
@@ -946,6 +1249,11 @@ class MeshWindow(PluginWindowBase):
         if self._selection is not None:
             self.onBlockSelectionChanged(None)
             self._selection.clear()
+        self._render_scheduler.requestRender()
+
+    def onMergeBlocksToggled(self, checked):
+        if self._file_name is not None:
+            self.loadFile(self._file_name)
 
     def onColorProfileTriggered(self, action):
         action.setChecked(True)
@@ -1036,3 +1344,4 @@ class MeshWindow(PluginWindowBase):
             dir = -dist * dir
             pos = [dir.x(), dir.y(), dir.z()]
             block.actor.SetPosition(pos)
+        self._render_scheduler.requestRender()
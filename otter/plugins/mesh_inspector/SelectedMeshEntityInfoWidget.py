@@ -40,12 +40,14 @@ class SelectedMeshEntityInfoWidget(QtWidgets.QWidget):
             text += "\nX: {:.5f}".format(coords[0])
             text += "\nY: {:.5f}".format(coords[1])
             text += "\nZ: {:.5f}".format(coords[2])
+        text += self._formatPickTime(info)
         self.setText(text)
 
     def setCellInfo(self, cell_id, info):
         text = "Element ID: {}".format(cell_id)
         if 'type' in info:
             text += "\nType: {}".format(self._cellTypeToName(info['type']))
+        text += self._formatPickTime(info)
         self.setText(text)
 
     def setBlockInfo(self, blk_id, info):
@@ -77,6 +79,11 @@ class SelectedMeshEntityInfoWidget(QtWidgets.QWidget):
             text += "\n  Z: {:.5f}..{:.5f}".format(bmin.z(), bmax.z())
         return text
 
+    def _formatPickTime(self, info):
+        if 'pick_time' in info:
+            return "\nPicked in {:.1f} ms".format(1000 * info['pick_time'])
+        return ""
+
     def _cellTypeToName(self, cell_type):
         type_dict = {
             3: 'Edge2',
@@ -22,6 +22,12 @@ class Selection(object):
         self._actor = vtk.vtkActor()
         self._actor.SetMapper(self._mapper)
 
+    def setInput(self, data):
+        """
+        @param data vtkDataObject to select entities from
+        """
+        self._extract_selection.SetInputData(0, data)
+
     def getActor(self):
         return self._actor
 
@@ -8,6 +8,7 @@ from otter.plugins.model_inspector.InputReader import InputReader
 from otter.plugins.common.LoadFileEvent import LoadFileEvent
 import otter.plugins.common as common
 from otter.plugins.common.OtterInteractorStyle3D import OtterInteractorStyle3D
+from otter.plugins.common.RenderScheduler import RenderScheduler
 from otter.assets import Assets
 
 
@@ -91,9 +92,8 @@ class ModelWindow(PluginWindowBase):
         self._setupCubeAxisActor()
 
         self.show()
-        self._update_timer = QtCore.QTimer()
-        self._update_timer.timeout.connect(self.onUpdateWindow)
-        self._update_timer.start(250)
+        self._render_scheduler = RenderScheduler(
+            self._vtk_render_window, self)
 
     def setupWidgets(self):
         self._frame = QtWidgets.QFrame(self)
@@ -199,6 +199,7 @@ class ModelWindow(PluginWindowBase):
         self._component_bounds = {}
         self._bnds = None
         self._vtk_renderer.RemoveAllViewProps()
+        self._render_scheduler.requestRender()
 
     def loadFile(self, file_name):
         self.clear()
@@ -321,6 +322,7 @@ class ModelWindow(PluginWindowBase):
 
         self._vtk_renderer.ResetCamera()
         self._vtk_renderer.GetActiveCamera().Zoom(1.5)
+        self._render_scheduler.requestRender()
 
         self.fileLoaded.emit(self._components.values())
 
@@ -386,6 +388,7 @@ class ModelWindow(PluginWindowBase):
         if self._show_captions:
             actor = self._caption_actors[component_name]
             actor.SetVisibility(visible)
+        self._render_scheduler.requestRender()
 
     def onComponentColorChanged(self, component_name, qcolor):
         self._component_color[component_name] = qcolor
@@ -395,6 +398,7 @@ class ModelWindow(PluginWindowBase):
             if actor is not None:
                 property = actor.GetProperty()
                 self._setPropertyColor(property, qcolor)
+        self._render_scheduler.requestRender()
 
     def _setPropertyColor(self, property, qcolor):
         clr = [qcolor.redF(), qcolor.greenF(), qcolor.blueF()]
@@ -420,12 +424,14 @@ class ModelWindow(PluginWindowBase):
             self._cube_axes_actor.VisibilityOn()
         else:
             self._cube_axes_actor.VisibilityOff()
+        self._render_scheduler.requestRender()
 
     def onOrientationmarkerVisibilityChanged(self, visible):
         if visible:
             self._ori_marker.EnabledOn()
         else:
             self._ori_marker.EnabledOff()
+        self._render_scheduler.requestRender()
 
     def onClicked(self, pos):
         picker = vtk.vtkPicker()
@@ -454,6 +460,7 @@ class ModelWindow(PluginWindowBase):
             self.componentSelected.emit(comp_name)
 
         self._last_picked_actor = picked_actor
+        self._render_scheduler.requestRender()
 
     def _setupCubeAxisActor(self):
         actor = vtk.vtkCubeAxesActor()
@@ -489,6 +496,7 @@ class ModelWindow(PluginWindowBase):
             if visible:
                 caption_actor = self._caption_actors[comp_name]
                 caption_actor.SetVisibility(state)
+        self._render_scheduler.requestRender()
 
     def renderMode(self):
         return self._render_mode
@@ -507,6 +515,7 @@ class ModelWindow(PluginWindowBase):
 
         for actor in self._silhouette_actors.values():
             actor.VisibilityOff()
+        self._render_scheduler.requestRender()
 
     def onShadedWithEdgesTriggered(self, checked):
         self._render_mode = self.SHADED_WITH_EDGES
@@ -527,6 +536,7 @@ class ModelWindow(PluginWindowBase):
                 property = sil_actor.GetProperty()
                 self._setPropertyColor(property, QtGui.QColor(0, 0, 0))
                 property.SetLineWidth(3)
+        self._render_scheduler.requestRender()
 
     def onHiddenEdgesRemovedTriggered(self, checked):
         self._render_mode = self.SILHOUETTE
@@ -543,6 +553,7 @@ class ModelWindow(PluginWindowBase):
                 property = sil_actor.GetProperty()
                 self._setPropertyColor(property, QtGui.QColor(0, 0, 0))
                 property.SetLineWidth(3)
+        self._render_scheduler.requestRender()
 
     def onPerspectiveToggled(self, checked):
         if checked:
@@ -663,9 +674,6 @@ class ModelWindow(PluginWindowBase):
         elif event.key() == QtCore.Qt.Key_6:
             self._setCameraPostion("+z")
 
-    def onUpdateWindow(self):
-        self._vtk_render_window.Render()
-
     def event(self, e):
         if e.type() == LoadFileEvent.TYPE:
             self.loadFile(e.fileName())
@@ -691,3 +699,4 @@ class ModelWindow(PluginWindowBase):
             actor.SetVisibility(checked)
         for name, actor in self._pps_caption_actors.items():
             actor.SetVisibility(checked)
+        self._render_scheduler.requestRender()
@@ -1,7 +1,7 @@
 import vtk
 from PyQt5.QtWidgets import QLineEdit, QComboBox, QLabel, QTreeView, \
-    QAbstractItemView
-from PyQt5.QtCore import Qt
+    QAbstractItemView, QHBoxLayout, QPushButton, QSlider
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QColor, QStandardItemModel, QStandardItem, QBrush
 from otter.plugins.viz.PropsBase import PropsBase
 from otter.plugins.common.Reader import Reader
@@ -16,11 +16,21 @@ class FileProps(PropsBase):
     IDX_COLOR = 1
     IDX_ID = 2
 
+    # Interval between frames of the time step playback in milliseconds
+    PLAYBACK_INTERVAL = 50
+    # Number of time steps read ahead of the shown one
+    PREFETCH_STEPS = 10
+
     def __init__(self, reader, parent):
         super().__init__(parent)
         self._reader = reader
         self._block_actors = {}
         self._vtk_extract_block = {}
+        self._active_variable = None
+
+        self._play_timer = QTimer(self)
+        self._play_timer.setInterval(self.PLAYBACK_INTERVAL)
+        self._play_timer.timeout.connect(self.onPlayTimer)
 
         self._colors = [
             QColor(156, 207, 237),
@@ -44,6 +54,7 @@ class FileProps(PropsBase):
         self._file_name.setReadOnly(True)
         self._layout.addWidget(self._file_name)
         self._setupVariableWidget()
+        self._setupTimeWidget()
         self._setupBlocksWidget()
         self._layout.addStretch()
 
@@ -58,6 +69,36 @@ class FileProps(PropsBase):
         self._variable.addItem("Block colors", None)
         self._layout.addWidget(self._variable)
 
+    def _setupTimeWidget(self):
+        times = self._reader.getTimes()
+        if times is None:
+            self._time_step = None
+            return
+
+        layout = QHBoxLayout()
+        self._play = QPushButton("\u25b6")
+        self._play.setCheckable(True)
+        self._play.setFixedWidth(32)
+        self._play.toggled.connect(self.onPlayToggled)
+        layout.addWidget(self._play)
+
+        self._time_step = QSlider(Qt.Horizontal)
+        self._time_step.setRange(0, len(times) - 1)
+        self._time_step.setValue(self._reader.getTimeStep())
+        self._time_step.valueChanged.connect(self.onTimeStepChanged)
+        layout.addWidget(self._time_step)
+
+        self._time = QLabel()
+        self._time.setMinimumWidth(60)
+        layout.addWidget(self._time)
+        self._layout.addLayout(layout)
+        self._updateTimeLabel()
+
+    def _updateTimeLabel(self):
+        times = self._reader.getTimes()
+        self._time.setText("t = {:g}".format(
+            times[self._reader.getTimeStep()]))
+
     def _setupBlocksWidget(self):
         self._lbl_blocks = QLabel("Blocks")
         self._layout.addWidget(self._lbl_blocks)
@@ -164,9 +205,24 @@ class FileProps(PropsBase):
             binfo = item.data()
             actor = self._block_actors[binfo.number]
             actor.SetVisibility(visible)
+        self.parentWidget().requestRender()
+
+    def _setActiveVariable(self, vinfo):
+        """
+        Make sure only the variable being displayed is loaded by the reader
+        """
+        name = None if vinfo is None else vinfo.name
+        if name == self._active_variable:
+            return
+        if self._active_variable is not None:
+            self._reader.disableVariable(self._active_variable)
+        self._active_variable = name
+        if name is not None:
+            self._reader.enableVariable(name)
 
     def onVariableChanged(self, index):
         vinfo = self._variable.itemData(index)
+        self._setActiveVariable(vinfo)
         if vinfo is None:
             for bnum, actor in self._block_actors.items():
                 mapper = actor.GetMapper()
@@ -184,6 +240,36 @@ class FileProps(PropsBase):
                 mapper.InterpolateScalarsBeforeMappingOn()
                 mapper.SetColorModeToMapScalars()
                 mapper.SetScalarRange(range)
+        self.parentWidget().requestRender()
+
+    def onTimeStepChanged(self, step):
+        self._reader.setTimeStep(step)
+        self._reader.prefetch(range(step + 1, step + 1 + self.PREFETCH_STEPS))
+        self._updateTimeLabel()
+        # colors follow the range of the shown time step
+        self.onVariableChanged(self._variable.currentIndex())
+        self.parentWidget().requestRender()
+
+    def onPlayToggled(self, checked):
+        if checked:
+            self._play.setText("\u25a0")
+            # start over when at the end
+            if self._time_step.value() == self._time_step.maximum():
+                self._time_step.setValue(0)
+            self._reader.prefetch(range(
+                self._time_step.value() + 1,
+                self._time_step.value() + 1 + self.PREFETCH_STEPS))
+            self._play_timer.start()
+        else:
+            self._play.setText("\u25b6")
+            self._play_timer.stop()
+
+    def onPlayTimer(self):
+        step = self._time_step.value() + 1
+        if step > self._time_step.maximum():
+            self._play.setChecked(False)
+        else:
+            self._time_step.setValue(step)
 
     def _getVariableValuesRange(self, vinfo):
         # NOTE: IDK if the data obtained via mapper.GetInputAsDataSet()
@@ -192,6 +278,7 @@ class FileProps(PropsBase):
         range = [None, None]
         for actor in self._block_actors.values():
             mapper = actor.GetMapper()
+            mapper.Update()
             data_set = mapper.GetInputAsDataSet()
             data = None
             if vinfo.object_type == Reader.VAR_NODAL:
@@ -2,13 +2,15 @@ import os
 import vtk
 from vtk.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 from PyQt5.QtWidgets import QProgressDialog, QMessageBox, QFileDialog
-from PyQt5.QtCore import QThread, QTimer, Qt
+from PyQt5.QtCore import QThread, Qt, pyqtSignal
 from otter.plugins.common.LoadFileEvent import LoadFileEvent
 from otter.plugins.common.ExodusIIReader import ExodusIIReader
+from otter.plugins.common.NemesisReader import NemesisReader
 from otter.plugins.common.VTKReader import VTKReader
 from otter.plugins.common.PetscHDF5Reader import PetscHDF5Reader
 from otter.plugins.common.OtterInteractorStyle3D import OtterInteractorStyle3D
 from otter.plugins.common.OtterInteractorStyle2D import OtterInteractorStyle2D
+from otter.plugins.common.RenderScheduler import RenderScheduler
 from otter.plugins.PluginWindowBase import PluginWindowBase
 from otter.plugins.viz.ParamsWindow import ParamsWindow
 from otter.plugins.viz.ToolBar import ToolBar
@@ -20,10 +22,15 @@ from otter.plugins.viz.TextProps import TextProps
 class LoadThread(QThread):
     """ Worker thread for loading data set files """
 
+    # percent done, description of the current step
+    progress = pyqtSignal(int, str)
+
     def __init__(self, file_name):
         super().__init__()
         if file_name.endswith('.e') or file_name.endswith('.exo'):
             self._reader = ExodusIIReader(file_name)
+        elif NemesisReader.isNemesisFile(file_name):
+            self._reader = NemesisReader(file_name)
         elif file_name.endswith('.vtk'):
             self._reader = VTKReader(file_name)
         elif file_name.endswith('.h5'):
@@ -32,7 +39,14 @@ class LoadThread(QThread):
             self._reader = None
 
     def run(self):
-        self._reader.load()
+        self._reader.setProgressCallback(self.onReaderProgress)
+        try:
+            self._reader.load()
+        finally:
+            self._reader.setProgressCallback(None)
+
+    def onReaderProgress(self, fraction, text):
+        self.progress.emit(int(100 * fraction), text)
 
     def getReader(self):
         return self._reader
@@ -49,9 +63,14 @@ class MainWindow(PluginWindowBase):
         self._file_name = None
         self._vtk_renderer = vtk.vtkRenderer()
         self._load_thread = None
+        # cancelled load threads that did not stop yet
+        self._cancelled_threads = []
         self._progress = None
+        self._progress_label = None
 
         self.setupWidgets()
+        self._render_scheduler = RenderScheduler(
+            self._vtk_render_window, self)
         self.setupMenuBar()
         self.setupToolBar()
         self.updateWindowTitle()
@@ -72,10 +91,6 @@ class MainWindow(PluginWindowBase):
         self.show()
         self.updateMenuBar()
 
-        self._update_timer = QTimer()
-        self._update_timer.timeout.connect(self.onUpdateWindow)
-        self._update_timer.start(250)
-
     def setupWidgets(self):
         self._vtk_widget = QVTKRenderWindowInteractor(self)
         self._vtk_widget.GetRenderWindow().AddRenderer(self._vtk_renderer)
@@ -130,6 +145,9 @@ class MainWindow(PluginWindowBase):
     def getVtkInteractor(self):
         return self._vtk_interactor
 
+    def requestRender(self):
+        self._render_scheduler.requestRender()
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.updateToolBarGeometry()
@@ -168,20 +186,23 @@ class MainWindow(PluginWindowBase):
         self._vtk_renderer.RemoveAllViewProps()
         self._params_window.clear()
         self._params_window.addPipelineItem(self._bkgnd_props)
-
-    def onUpdateWindow(self):
-        self._vtk_render_window.Render()
+        self._render_scheduler.requestRender()
 
     def loadFile(self, file_name):
         self._load_thread = LoadThread(file_name)
         if self._load_thread.getReader() is not None:
+            self._progress_label = "Loading {}...".format(
+                os.path.basename(file_name))
             self._progress = QProgressDialog(
-                "Loading {}...".format(os.path.basename(file_name)),
-                None, 0, 0, self)
+                self._progress_label, "Cancel", 0, 100, self)
             self._progress.setWindowModality(Qt.WindowModal)
             self._progress.setMinimumDuration(0)
+            self._progress.setAutoReset(False)
+            self._progress.setAutoClose(False)
+            self._progress.canceled.connect(self.onFileLoadCancelled)
             self._progress.show()
 
+            self._load_thread.progress.connect(self.onFileLoadProgress)
             self._load_thread.finished.connect(self.onFileLoadFinished)
             self._load_thread.start(QThread.IdlePriority)
         else:
@@ -193,7 +214,46 @@ class MainWindow(PluginWindowBase):
                 "We support the following formats:\n"
                 "  ExodusII, VTK Unstructured Grid, HDF5 (PETSc)")
 
+    def _isStaleLoadSignal(self):
+        """
+        Signals of a cancelled load thread that were queued before it was
+        cancelled are still delivered, those must be ignored
+        """
+        return self.sender() is not self._load_thread
+
+    def onFileLoadProgress(self, percent, text):
+        if self._isStaleLoadSignal() or self._progress is None:
+            return
+        if len(text) > 0:
+            text = "{}\n{}".format(self._progress_label, text)
+        else:
+            text = self._progress_label
+        self._progress.setLabelText(text)
+        # a modal dialog processes events here, so loading can finish
+        # during the call
+        self._progress.setValue(percent)
+
+    def onFileLoadCancelled(self):
+        """
+        Called when the user cancels loading. The load thread can not be
+        stopped right away, so it is left to finish and its result is
+        dropped.
+        """
+        thread = self._load_thread
+        thread.getReader().cancel()
+        thread.progress.disconnect(self.onFileLoadProgress)
+        thread.finished.disconnect(self.onFileLoadFinished)
+        self._cancelled_threads.append(thread)
+        thread.finished.connect(
+            lambda: self._cancelled_threads.remove(thread))
+        self._load_thread = None
+
+        self._progress.hide()
+        self._progress = None
+
     def onFileLoadFinished(self):
+        if self._isStaleLoadSignal():
+            return
         reader = self._load_thread.getReader()
 
         self._progress.hide()
@@ -219,6 +279,7 @@ class MainWindow(PluginWindowBase):
             for act in actors:
                 self._vtk_renderer.AddViewProp(act)
         self.resetCamera()
+        self._render_scheduler.requestRender()
 
     def onClose(self):
         self.close()
@@ -249,6 +310,7 @@ class MainWindow(PluginWindowBase):
         actor = props.getVtkActor()
         if actor is not None:
             self._vtk_renderer.AddViewProp(actor)
+        self._render_scheduler.requestRender()
 
     def onAddFile(self):
         file_name, f = QFileDialog.getOpenFileName(
@@ -265,6 +327,7 @@ class MainWindow(PluginWindowBase):
         actor = props.getVtkActor()
         if actor is not None:
             self._vtk_renderer.RemoveViewProp(actor)
+        self._render_scheduler.requestRender()
 
     def updateToolBarGeometry(self):
         self._toolbar.adjustSize()
@@ -64,6 +64,9 @@ class TextProps(PropsBase):
         self._text_property.SetColor(clr)
         self._text_property.SetBold(False)
         self._text_property.SetItalic(False)
+        # text and font are changed by several widgets
+        self._actor.AddObserver('ModifiedEvent', self.onVtkModified)
+        self._text_property.AddObserver('ModifiedEvent', self.onVtkModified)
 
         self._vtk_widget = vtk.vtkTextWidget()
         self._vtk_widget.SetInteractor(self._vtk_interactor)
@@ -77,6 +80,9 @@ class TextProps(PropsBase):
         self._color_btn.setColor(qcolor)
         self._font_props.setVtkTextProperty(self._text_property)
 
+    def onVtkModified(self, obj, event):
+        self.parentWidget().requestRender()
+
     def onTextChanged(self, txt):
         self._actor.SetInput(txt)
 
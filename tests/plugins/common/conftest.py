@@ -0,0 +1,211 @@
+import itertools
+import h5py
+import netCDF4
+import numpy as np
+import pytest
+
+
+def write_plex(file_name, vertices, cells, faces, face_sets,
+               vertex_fields={}, cell_fields={}):
+    """
+    Write a small DMPlex mesh the way PETSc's HDF5 viewer does
+
+    DAG points are numbered cells, vertices, faces and (in 3D) edges. In 2D
+    `faces` are edges given by 2 vertices, in 3D they are polygons given by
+    their vertices in cyclic order. Edges store their vertices sorted, so
+    some of them are oriented against the faces using them.
+
+    @param vertices (n_vertices, dim) coordinates
+    @param cells (n_cells, n_corners) vertices of the cells
+    @param faces List of vertex tuples of the faces
+    @param face_sets dict of set id -> list of indices into `faces`
+    @param vertex_fields dict of field name -> (n_vertices, ...) values
+    @param cell_fields dict of field name -> (n_cells, ...) values
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    cells = np.asarray(cells)
+    n_cells = cells.shape[0]
+    n_verts, dim = vertices.shape
+
+    vert_pt = n_cells + np.arange(n_verts)
+    face_pt = n_cells + n_verts + np.arange(len(faces))
+    edges = []
+    if dim == 3:
+        for face in faces:
+            for a, b in zip(face, face[1:] + face[:1]):
+                if tuple(sorted((a, b))) not in edges:
+                    edges.append(tuple(sorted((a, b))))
+    edge_pt = n_cells + n_verts + len(faces) + np.arange(len(edges))
+
+    cones = []
+    for cell in cells:
+        cones.append([face_pt[i] for i, face in enumerate(faces)
+                      if set(face) <= set(cell)])
+    cones += [[] for i in range(n_verts)]
+    for face in faces:
+        if dim == 2:
+            cones.append([vert_pt[v] for v in face])
+        else:
+            cones.append([
+                edge_pt[edges.index(tuple(sorted((a, b))))]
+                for a, b in zip(face, face[1:] + face[:1])])
+    for edge in edges:
+        cones.append([vert_pt[v] for v in edge])
+
+    with h5py.File(file_name, 'w') as f:
+        f['geometry/vertices'] = vertices
+        f['topology/cones'] = np.array([len(c) for c in cones], np.int32)
+        points = np.array(list(itertools.chain(*cones)), np.int32)
+        f['topology/cells'] = points
+        f['topology/orientation'] = np.zeros_like(points)
+        f['labels/celltype/0/indices'] = vert_pt.astype(np.int32)
+        f['labels/celltype/1/indices'] = np.arange(n_cells, dtype=np.int32)
+        for id, indices in face_sets.items():
+            f['labels/Face Sets/{}/indices'.format(id)] = \
+                face_pt[indices].astype(np.int32)
+        ds = f.create_dataset('viz/topology/cells', data=cells)
+        ds.attrs['cell_corners'] = cells.shape[1]
+        ds.attrs['cell_dim'] = dim
+        for group, fields in [('vertex_fields', vertex_fields),
+                              ('cell_fields', cell_fields)]:
+            for name, values in fields.items():
+                values = np.asarray(values, dtype=np.float64)
+                ds = f.create_dataset(group + '/' + name, data=values)
+                ds.attrs['vector_field_type'] = \
+                    np.bytes_('scalar' if values.ndim == 1 else 'vector')
+
+
+@pytest.fixture
+def quad_file(tmp_path):
+    """
+    2x1 quads with sets of the left, bottom and right edges
+
+    3 - 4 - 5
+    |   |   |
+    0 - 1 - 2
+    """
+    file_name = str(tmp_path / 'quad.h5')
+    vertices = [[0, 0], [1, 0], [2, 0], [0, 1], [1, 1], [2, 1]]
+    write_plex(
+        file_name,
+        vertices=vertices,
+        cells=[[0, 1, 4, 3], [1, 2, 5, 4]],
+        faces=[(0, 1), (1, 2), (2, 5), (4, 5), (3, 4), (0, 3), (1, 4)],
+        face_sets={1: [5], 2: [0, 1], 3: [2]},
+        vertex_fields={
+            'u': [0., 1., 2., 3., 4., 5.],
+            'disp': np.array(vertices, dtype=np.float64) * 0.5
+        },
+        cell_fields={
+            'k': [10., 20.],
+            'grad': [[1., 2.], [3., 4.]]
+        })
+    return file_name
+
+
+@pytest.fixture
+def wedge_file(tmp_path):
+    """
+    One wedge with a set of all of its faces (2 triangles and 3 quads) and
+    a set of its top triangle
+    """
+    file_name = str(tmp_path / 'wedge.h5')
+    write_plex(
+        file_name,
+        vertices=[[0, 0, 0], [1, 0, 0], [0, 1, 0],
+                  [0, 0, 1], [1, 0, 1], [0, 1, 1]],
+        cells=[[0, 1, 2, 3, 4, 5]],
+        faces=[(0, 2, 1), (3, 4, 5), (0, 1, 4, 3), (1, 2, 5, 4),
+               (2, 0, 3, 5)],
+        face_sets={1: [0, 1, 2, 3, 4], 2: [1]},
+        cell_fields={'k': [7.]})
+    return file_name
+
+
+def _names(names, length=33):
+    """
+    Names as a netCDF character array
+    """
+    chars = np.zeros((len(names), length), dtype='S1')
+    for i, name in enumerate(names):
+        chars[i, :len(name)] = list(name)
+    return chars
+
+
+def write_exodus(file_name, n_times, shift=0., nodal='u'):
+    """
+    Write an ExodusII file with 2 hexes in one block, a nodal variable `u`
+    (x + t) and an element variable `e` (10 t) at times 0, 1, ...
+
+    @param n_times Number of time steps
+    @param shift Added to the x coordinates
+    @param nodal Name of the nodal variable
+    """
+    x = np.array([0, 1, 2, 0, 1, 2, 0, 1, 2, 0, 1, 2], dtype=float) + shift
+    y = np.array([0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 1, 1], dtype=float)
+    z = np.array([0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1], dtype=float)
+    with netCDF4.Dataset(file_name, 'w',
+                         format='NETCDF3_64BIT_OFFSET') as f:
+        f.api_version = np.float32(5.22)
+        f.version = np.float32(5.22)
+        f.floating_point_word_size = np.int32(8)
+        f.file_size = np.int32(1)
+        f.maximum_name_length = np.int32(32)
+        f.title = 'test'
+        for name, size in [('len_string', 33), ('len_line', 81),
+                           ('four', 4), ('len_name', 33), ('num_dim', 3),
+                           ('num_nodes', 12), ('num_elem', 2),
+                           ('num_el_blk', 1), ('num_el_in_blk1', 2),
+                           ('num_nod_per_el1', 8), ('num_nod_var', 1),
+                           ('num_elem_var', 1), ('time_step', None)]:
+            f.createDimension(name, size)
+        f.createVariable('time_whole', 'f8', ('time_step',))
+        for name, values in zip('xyz', (x, y, z)):
+            f.createVariable('coord' + name, 'f8', ('num_nodes',))[:] = \
+                values
+        f.createVariable('coor_names', 'S1', ('num_dim', 'len_name'))[:] = \
+            _names(['x', 'y', 'z'])
+        f.createVariable('eb_status', 'i4', ('num_el_blk',))[:] = 1
+        prop = f.createVariable('eb_prop1', 'i4', ('num_el_blk',))
+        prop.setncattr('name', 'ID')
+        prop[:] = 1
+        f.createVariable('eb_names', 'S1', ('num_el_blk', 'len_name'))[:] = \
+            _names(['block'])
+        connect = f.createVariable(
+            'connect1', 'i4', ('num_el_in_blk1', 'num_nod_per_el1'))
+        connect.elem_type = 'HEX8'
+        connect[:] = [[1, 2, 5, 4, 7, 8, 11, 10], [2, 3, 6, 5, 8, 9, 12, 11]]
+        f.createVariable(
+            'name_nod_var', 'S1', ('num_nod_var', 'len_name'))[:] = \
+            _names([nodal])
+        f.createVariable(
+            'name_elem_var', 'S1', ('num_elem_var', 'len_name'))[:] = \
+            _names(['e'])
+        f.createVariable(
+            'elem_var_tab', 'i4', ('num_el_blk', 'num_elem_var'))[:] = 1
+        f.createVariable('vals_nod_var1', 'f8', ('time_step', 'num_nodes'))
+        f.createVariable(
+            'vals_elem_var1eb1', 'f8', ('time_step', 'num_el_in_blk1'))
+    for step in range(n_times):
+        append_exodus_step(file_name)
+
+
+def append_exodus_step(file_name):
+    """
+    Append the next time step to a file written by `write_exodus`
+    """
+    with netCDF4.Dataset(file_name, 'a') as f:
+        step = f.dimensions['time_step'].size
+        f['time_whole'][step] = float(step)
+        f['vals_nod_var1'][step, :] = f['coordx'][:] + step
+        f['vals_elem_var1eb1'][step, :] = 10. * step
+
+
+@pytest.fixture
+def exodus_file(tmp_path):
+    """
+    ExodusII file with 3 time steps
+    """
+    file_name = str(tmp_path / 'out.e')
+    write_exodus(file_name, 3)
+    return file_name
@@ -0,0 +1,108 @@
+import vtk
+import numpy as np
+from vtk.util import numpy_support
+from otter.plugins.common.BlockExtractor import BlockExtractor
+
+
+def polydata(verts=0, lines=0, polys=0, offset=0.):
+    """
+    Polydata with the given number of cells of each kind, cells do not share
+    points
+    """
+    pd = vtk.vtkPolyData()
+    points = vtk.vtkPoints()
+    pd.SetPoints(points)
+    arrays = []
+    for n_cells, size in [(verts, 1), (lines, 2), (polys, 3)]:
+        ca = vtk.vtkCellArray()
+        for i in range(n_cells):
+            ids = []
+            for j in range(size):
+                ids.append(points.InsertNextPoint(
+                    offset + points.GetNumberOfPoints(), j, 0))
+            ca.InsertNextCell(size, ids)
+        arrays.append(ca)
+    pd.SetVerts(arrays[0])
+    pd.SetLines(arrays[1])
+    pd.SetPolys(arrays[2])
+    return pd
+
+
+def extracted(pd):
+    mb = vtk.vtkMultiBlockDataSet()
+    mb.SetBlock(0, pd)
+    return BlockExtractor(mb).extract(1)
+
+
+def test_extract():
+    source = vtk.vtkCubeSource()
+    source.Update()
+    block = extracted(source.GetOutput())
+    assert block.info == {'cells': 6, 'points': 24}
+    assert block.geometry.GetNumberOfCells() == 6
+    bmin, bmax = block.bounds
+    assert (bmin.x(), bmax.x()) == (-0.5, 0.5)
+
+
+def cube(center):
+    source = vtk.vtkCubeSource()
+    source.SetCenter(center, 0, 0)
+    source.Update()
+    return source.GetOutput()
+
+
+def test_extract_tree():
+    inner = vtk.vtkMultiBlockDataSet()
+    inner.SetBlock(0, cube(0))
+    inner.SetBlock(1, cube(2))
+    mb = vtk.vtkMultiBlockDataSet()
+    mb.SetBlock(0, inner)
+    mb.SetBlock(1, cube(5))
+    extractor = BlockExtractor(mb)
+
+    # all leaves under a node are extracted together
+    block = extractor.extract(1)
+    assert block.info == {'cells': 12, 'points': 48}
+    bmin, bmax = block.bounds
+    assert (bmin.x(), bmax.x()) == (-0.5, 2.5)
+
+    block = extractor.extract(4)
+    assert block.info == {'cells': 6, 'points': 24}
+    assert extractor.extract(None).info['cells'] == 18
+
+
+def test_extract_missing():
+    block = BlockExtractor(vtk.vtkMultiBlockDataSet()).extract(7)
+    assert block.info == {'cells': 0, 'points': 0}
+    assert block.geometry.GetNumberOfPoints() == 0
+
+
+def test_merge():
+    blocks = [
+        extracted(polydata(polys=2)),
+        extracted(polydata()),
+        extracted(polydata(verts=1, lines=1, polys=1, offset=100.))
+    ]
+    merged = BlockExtractor.merge(blocks)
+    assert merged.GetNumberOfPoints() == 6 + 6
+    assert merged.GetNumberOfVerts() == 1
+    assert merged.GetNumberOfLines() == 1
+    assert merged.GetNumberOfPolys() == 3
+
+    # cells are ordered verts, lines, polys, strips
+    block_index = numpy_support.vtk_to_numpy(
+        merged.GetCellData().GetArray(BlockExtractor.BLOCK_INDEX))
+    np.testing.assert_array_equal(block_index, [2, 2, 0, 0, 2])
+
+    # connectivity points to the points of the right block
+    ids = vtk.vtkIdList()
+    merged.GetCellPoints(4, ids)
+    assert merged.GetPoint(ids.GetId(0))[0] >= 100.
+    merged.GetCellPoints(3, ids)
+    assert merged.GetPoint(ids.GetId(0))[0] < 100.
+
+
+def test_merge_empty():
+    merged = BlockExtractor.merge([extracted(polydata())])
+    assert merged.GetNumberOfPoints() == 0
+    assert merged.GetNumberOfCells() == 0
@@ -0,0 +1,196 @@
+import vtk
+from otter.plugins.common.Reader import Reader
+from otter.plugins.common.ExodusIIReader import ExodusIIReader
+from .conftest import append_exodus_step, write_exodus
+
+
+def loaded(file_name):
+    reader = ExodusIIReader(file_name)
+    reader.load()
+    return reader
+
+
+def block(reader):
+    """
+    The element block of the output
+    """
+    output = reader.getVtkOutputPort().GetProducer().GetOutputDataObject(0)
+    it = vtk.vtkDataObjectTreeIterator()
+    it.SetDataSet(output)
+    it.InitTraversal()
+    return it.GetCurrentDataObject()
+
+
+def value(reader, name):
+    """
+    First value of a variable in the output or `None` if it is not there
+    """
+    arr = block(reader).GetPointData().GetArray(name)
+    if arr is None:
+        arr = block(reader).GetCellData().GetArray(name)
+    if arr is None:
+        return None
+    return arr.GetValue(0)
+
+
+def test_enable_disable_refs(exodus_file):
+    reader = loaded(exodus_file)
+    assert value(reader, 'u') is None
+    reader.enableVariable('u')
+    reader.enableVariable('u')
+    assert value(reader, 'u') == 2.
+    reader.disableVariable('u')
+    # still used once
+    assert value(reader, 'u') == 2.
+    reader.disableVariable('u')
+    assert value(reader, 'u') is None
+    # disabling more often than enabling does nothing
+    reader.disableVariable('u')
+    reader.enableVariable('u')
+    assert value(reader, 'u') == 2.
+    reader.enableVariable('nonexistent')
+    assert value(reader, 'nonexistent') is None
+
+
+def test_disabled_variable_not_restored(exodus_file):
+    reader = loaded(exodus_file)
+    reader.enableVariable('u')
+    reader.enableVariable('e')
+    assert value(reader, 'e') == 20.
+    reader.setTimeStep(0)
+    assert value(reader, 'e') == 0.
+    reader.disableVariable('e')
+    assert value(reader, 'e') is None
+    # the cached time step 2 still has 'e'
+    reader.setTimeStep(2)
+    assert value(reader, 'e') is None
+    assert value(reader, 'u') == 2.
+    reader.setTimeStep(1)
+    assert value(reader, 'e') is None
+    assert value(reader, 'u') == 1.
+
+
+def test_metadata(exodus_file):
+    reader = ExodusIIReader(exodus_file)
+    assert reader.loadMetadata()
+    assert [b.name for b in reader.getBlocks()] == ['block']
+    assert list(reader.getSideSets()) == []
+    assert list(reader.getNodeSets()) == []
+    assert sorted(v.name for v in reader.getVariableInfo()) == ['e', 'u']
+    assert reader.getTotalNumberOfElements() == 2
+    assert reader.getTotalNumberOfNodes() == 12
+    assert reader.getTimes() == [0., 1., 2.]
+    # no geometry was read
+    assert block(reader) is None
+
+    reader.load()
+    assert block(reader).GetNumberOfCells() == 2
+    assert block(reader).GetNumberOfPoints() == 12
+
+
+def count_reads(reader):
+    """
+    @return List that gets an entry every time the VTK reader reads
+    """
+    reads = []
+    reader._reader.AddObserver(
+        vtk.vtkCommand.StartEvent, lambda obj, event: reads.append(1))
+    return reads
+
+
+def wait_for_prefetch(reader):
+    thread = reader._prefetch_thread
+    if thread is not None:
+        thread.join()
+
+
+def test_time_steps(exodus_file):
+    reader = loaded(exodus_file)
+    reader.enableVariable('u')
+    assert reader.getTimeStep() == 2
+    reads = count_reads(reader)
+
+    reader.setTimeStep(0)
+    assert value(reader, 'u') == 0.
+    assert len(reads) == 1
+    # both time steps are cached now
+    reader.setTimeStep(2)
+    assert value(reader, 'u') == 2.
+    reader.setTimeStep(0)
+    assert value(reader, 'u') == 0.
+    assert len(reads) == 1
+
+
+def test_prefetch(exodus_file):
+    reader = loaded(exodus_file)
+    reader.enableVariable('u')
+    reader.enableVariable('e')
+    reads = count_reads(reader)
+
+    reader.prefetch([0, 1, 5])
+    wait_for_prefetch(reader)
+    for step in [1, 0]:
+        reader.setTimeStep(step)
+        assert value(reader, 'u') == step
+        assert value(reader, 'e') == 10. * step
+    assert len(reads) == 0
+
+    # the prefetched time step still has a variable enabled again
+    reader.disableVariable('e')
+    reader.enableVariable('e')
+    assert len(reads) == 1
+    reader.setTimeStep(1)
+    assert value(reader, 'e') == 10.
+    assert len(reads) == 1
+    # time step 2 is cached with 'e', which is disabled now
+    reader.disableVariable('e')
+    reader.prefetch([2])
+    wait_for_prefetch(reader)
+    reader.setTimeStep(2)
+    assert value(reader, 'u') == 2.
+    assert value(reader, 'e') is None
+    assert len(reads) == 1
+
+
+def test_update_nochange(exodus_file):
+    reader = loaded(exodus_file)
+    assert reader.update() == Reader.NOCHANGE
+
+
+def test_update_appended(exodus_file):
+    reader = loaded(exodus_file)
+    reader.enableVariable('u')
+    append_exodus_step(exodus_file)
+    assert reader.update() == Reader.APPENDED
+    assert reader.getTimes() == [0., 1., 2., 3.]
+    # the last time step was shown, so the new one is
+    assert reader.getTimeStep() == 3
+    assert value(reader, 'u') == 3.
+    assert reader.update() == Reader.NOCHANGE
+
+    reader.setTimeStep(1)
+    append_exodus_step(exodus_file)
+    assert reader.update() == Reader.APPENDED
+    assert reader.getTimeStep() == 1
+    assert value(reader, 'u') == 1.
+
+
+def test_update_rewritten_values(exodus_file):
+    reader = loaded(exodus_file)
+    reader.enableVariable('u')
+    reader.setTimeStep(0)
+    # same mesh and variables, values moved by 1 in x
+    write_exodus(exodus_file, 3, shift=1.)
+    assert reader.update() == Reader.APPENDED
+    assert reader.getTimeStep() == 0
+    assert value(reader, 'u') == 1.
+    reader.setTimeStep(2)
+    assert value(reader, 'u') == 3.
+
+
+def test_update_changed(exodus_file):
+    reader = loaded(exodus_file)
+    write_exodus(exodus_file, 3, nodal='v')
+    assert reader.update() == Reader.CHANGED
+    # the file was not read again, so it is still changed
+    assert reader.update() == Reader.CHANGED
@@ -0,0 +1,148 @@
+import vtk
+import numpy as np
+import pytest
+from vtk.util import numpy_support
+from otter.plugins.common.NemesisReader import NemesisReader
+
+
+def test_pieces():
+    assert NemesisReader.pieces('out.e.4.2') == \
+        ['out.e.4.0', 'out.e.4.1', 'out.e.4.2', 'out.e.4.3']
+    # width of the rank is kept
+    pieces = NemesisReader.pieces('/dir/out.e.16.03')
+    assert len(pieces) == 16
+    assert pieces[0] == '/dir/out.e.16.00'
+    assert pieces[-1] == '/dir/out.e.16.15'
+
+
+def test_not_pieces():
+    assert NemesisReader.pieces('out.e') is None
+    assert NemesisReader.pieces('out.e.4.4') is None
+    assert NemesisReader.pieces('out.e.0.0') is None
+    assert not NemesisReader.isNemesisFile('out.e.2')
+    assert NemesisReader.isNemesisFile('out.e.2.1')
+
+
+@pytest.fixture
+def reader(tmp_path):
+    # the files are not read until the reader is loaded
+    for rank in range(2):
+        (tmp_path / 'out.e.2.{}'.format(rank)).touch()
+    return NemesisReader(str(tmp_path / 'out.e.2.0'))
+
+
+def test_missing_pieces(tmp_path):
+    for rank in [0, 2]:
+        (tmp_path / 'out.e.4.{}'.format(rank)).touch()
+    reader = NemesisReader(str(tmp_path / 'out.e.4.2'))
+    assert reader.missingRanks() == [1, 3]
+    with pytest.raises(RuntimeError, match='ranks 1, 3'):
+        reader.loadMetadata()
+    with pytest.raises(RuntimeError, match='ranks 1, 3'):
+        reader.load()
+
+
+def test_no_pieces(tmp_path):
+    reader = NemesisReader(str(tmp_path / 'out.e.2.1'))
+    assert reader.missingRanks() == [0, 1]
+    with pytest.raises(RuntimeError, match='ranks 0, 1'):
+        reader.load()
+
+
+def grid(points, cells, node_ids=None, cell_type=vtk.VTK_QUAD):
+    """
+    Unstructured grid with a cell array 'u' holding cell indices and a point
+    array 'p' holding the x-coordinates
+    """
+    ug = vtk.vtkUnstructuredGrid()
+    pts = vtk.vtkPoints()
+    for pt in points:
+        pts.InsertNextPoint(pt)
+    ug.SetPoints(pts)
+    for cell in cells:
+        ug.InsertNextCell(cell_type, len(cell), cell)
+    points = np.array(points, dtype=np.float64)
+    p = numpy_support.numpy_to_vtk(points[:, 0].copy(), deep=True)
+    p.SetName('p')
+    ug.GetPointData().AddArray(p)
+    u = numpy_support.numpy_to_vtk(
+        np.arange(len(cells), dtype=np.float64), deep=True)
+    u.SetName('u')
+    ug.GetCellData().AddArray(u)
+    if node_ids is not None:
+        ids = numpy_support.numpy_to_vtk(
+            np.array(node_ids, dtype=np.int64), deep=True)
+        ids.SetName(NemesisReader.GLOBAL_NODE_ID)
+        ug.GetPointData().AddArray(ids)
+    return ug
+
+
+def two_quads(node_ids):
+    """
+    Two pieces with a quad each, sharing the edge at x = 1
+    """
+    left = grid([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)],
+                [[0, 1, 2, 3]], node_ids and node_ids[0])
+    right = grid([(1, 0, 0), (2, 0, 0), (2, 1, 0), (1, 1, 0)],
+                 [[0, 1, 2, 3]], node_ids and node_ids[1])
+    return [left, right]
+
+
+def check_two_quads(ug):
+    assert ug.GetNumberOfPoints() == 6
+    assert ug.GetNumberOfCells() == 2
+    # cells use the merged points
+    for cell in range(2):
+        ids = vtk.vtkIdList()
+        ug.GetCellPoints(cell, ids)
+        xs = sorted(ug.GetPoint(ids.GetId(i))[0] for i in range(4))
+        assert xs == [cell, cell, cell + 1, cell + 1]
+    p = numpy_support.vtk_to_numpy(ug.GetPointData().GetArray('p'))
+    points = numpy_support.vtk_to_numpy(ug.GetPoints().GetData())
+    np.testing.assert_array_equal(p, points[:, 0])
+    u = numpy_support.vtk_to_numpy(ug.GetCellData().GetArray('u'))
+    np.testing.assert_array_equal(u, [0, 0])
+
+
+def test_merge_by_node_ids(reader):
+    pieces = two_quads([[1, 2, 3, 4], [2, 5, 6, 3]])
+    ug, ids, first, cells = reader._merge(pieces)
+    check_two_quads(ug)
+    np.testing.assert_array_equal(ids, [1, 2, 3, 4, 5, 6])
+    assert len(first) == 6
+    assert cells is None
+
+
+def test_merge_by_coordinates(reader):
+    ug, ids, first, cells = reader._merge(two_quads(None))
+    check_two_quads(ug)
+    assert ids is None
+
+
+def test_merge_vertices(reader):
+    # nodes on the boundary of pieces are in node sets of both
+    left = grid([(0, 0, 0), (1, 0, 0)], [[0], [1]], [1, 2], vtk.VTK_VERTEX)
+    right = grid([(1, 0, 0), (2, 0, 0)], [[0], [1]], [2, 3], vtk.VTK_VERTEX)
+    ug, ids, first, cells = reader._merge([left, right])
+    assert ug.GetNumberOfPoints() == 3
+    assert ug.GetNumberOfCells() == 3
+    assert len(cells) == 3
+
+
+def test_merge_empty(reader):
+    ug, ids, first, cells = reader._merge([None, vtk.vtkUnstructuredGrid()])
+    assert ug.GetNumberOfPoints() == 0
+    assert ids is None
+
+
+def test_merge_arrays(reader):
+    pieces = two_quads([[1, 2, 3, 4], [2, 5, 6, 3]])
+    ug, ids, first, cells = reader._merge(pieces)
+    # values of another time step are merged with the same indices
+    target = vtk.vtkPointData()
+    reader._mergeArrays(
+        [p.GetPointData() for p in pieces], target, first, ['p'])
+    assert target.GetNumberOfArrays() == 1
+    np.testing.assert_array_equal(
+        numpy_support.vtk_to_numpy(target.GetArray('p')),
+        numpy_support.vtk_to_numpy(ug.GetPointData().GetArray('p')))
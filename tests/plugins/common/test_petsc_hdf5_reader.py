@@ -0,0 +1,219 @@
+import vtk
+import numpy as np
+import pytest
+from vtk.util import numpy_support
+from otter.plugins.common.Reader import Reader
+from otter.plugins.common import PetscHDF5Reader as petsc
+from otter.plugins.common.PetscHDF5Reader import PetscHDF5DataSetReader
+from otter.plugins.common.PetscHDF5Reader import PetscHDF5Reader
+
+
+def read(file_name):
+    reader = PetscHDF5DataSetReader()
+    reader.SetFileName(file_name)
+    reader.Update()
+    return reader, reader.GetOutputDataObject(0)
+
+
+def points(block):
+    return numpy_support.vtk_to_numpy(block.GetPoints().GetData())
+
+
+def cells(block):
+    return [[block.GetCell(i).GetPointId(j)
+             for j in range(block.GetCell(i).GetNumberOfPoints())]
+            for i in range(block.GetNumberOfCells())]
+
+
+def test_quad_cells(quad_file):
+    reader, output = read(quad_file)
+    block = output.GetBlock(0)
+    assert reader.getDimensionality() == 2
+    assert block.GetNumberOfPoints() == 6
+    np.testing.assert_array_equal(
+        points(block)[[0, 2, 3, 5]],
+        [[0, 0, 0], [2, 0, 0], [0, 1, 0], [2, 1, 0]])
+    assert cells(block) == [[0, 1, 4, 3], [1, 2, 5, 4]]
+    assert [block.GetCellType(i) for i in range(2)] == [vtk.VTK_QUAD] * 2
+
+
+def test_wedge_cells(wedge_file):
+    reader, output = read(wedge_file)
+    block = output.GetBlock(0)
+    assert reader.getDimensionality() == 3
+    assert block.GetNumberOfPoints() == 6
+    assert cells(block) == [[0, 1, 2, 3, 4, 5]]
+    assert block.GetCellType(0) == vtk.VTK_WEDGE
+
+
+def test_fields(quad_file):
+    reader, output = read(quad_file)
+    block = output.GetBlock(0)
+
+    u = numpy_support.vtk_to_numpy(block.GetPointData().GetArray('u'))
+    np.testing.assert_array_equal(u, [0., 1., 2., 3., 4., 5.])
+    disp = block.GetPointData().GetArray('disp')
+    assert disp.GetNumberOfComponents() == 2
+    np.testing.assert_array_equal(
+        numpy_support.vtk_to_numpy(disp),
+        [[0., 0.], [.5, 0.], [1., 0.], [0., .5], [.5, .5], [1., .5]])
+
+    k = numpy_support.vtk_to_numpy(block.GetCellData().GetArray('k'))
+    np.testing.assert_array_equal(k, [10., 20.])
+    grad = block.GetCellData().GetArray('grad')
+    assert grad.GetNumberOfComponents() == 2
+    np.testing.assert_array_equal(
+        numpy_support.vtk_to_numpy(grad), [[1., 2.], [3., 4.]])
+
+
+def test_variable_info(quad_file):
+    reader, output = read(quad_file)
+    info = reader.getVariableInfo()
+    assert sorted(info) == ['disp', 'grad', 'k', 'u']
+    assert info['u'].num_components == 1
+    assert info['disp'].num_components == 2
+    assert info['disp'].object_type == Reader.VAR_NODAL
+    assert info['grad'].object_type == Reader.VAR_CELL
+
+
+def test_cones(quad_file):
+    reader, output = read(quad_file)
+    # DAG points: cells 0-1, vertices 2-7, edges 8-14
+    sizes, cone = reader._cones(np.array([0, 8, 14, 3]))
+    np.testing.assert_array_equal(sizes, [4, 2, 2, 0])
+    np.testing.assert_array_equal(cone, [8, 12, 13, 14, 2, 3, 3, 6])
+
+
+def test_edge_sets(quad_file):
+    reader, output = read(quad_file)
+    info = reader.getSideSetInfo()
+    assert sorted(info) == ['1', '2', '3']
+
+    bottom = output.GetBlock(2)
+    np.testing.assert_array_equal(
+        points(bottom), [[0, 0, 0], [1, 0, 0], [2, 0, 0]])
+    assert cells(bottom) == [[0, 1], [1, 2]]
+    assert [bottom.GetCellType(i) for i in range(2)] == [vtk.VTK_LINE] * 2
+
+    right = output.GetBlock(3)
+    np.testing.assert_array_equal(points(right), [[2, 0, 0], [2, 1, 0]])
+    assert cells(right) == [[0, 1]]
+
+
+def same_polygon(a, b):
+    """
+    Check that `a` and `b` are the same polygon, starting anywhere and
+    going either way around
+    """
+    rotations = [b[i:] + b[:i] for i in range(len(b))]
+    return a in rotations or a[::-1] in rotations
+
+
+def test_mixed_face_set(wedge_file):
+    reader, output = read(wedge_file)
+    faces = output.GetBlock(1)
+    assert faces.GetNumberOfPoints() == 6
+    np.testing.assert_array_equal(points(faces), points(output.GetBlock(0)))
+    assert [faces.GetCellType(i) for i in range(5)] == \
+        [vtk.VTK_TRIANGLE] * 2 + [vtk.VTK_QUAD] * 3
+    expected = [[0, 2, 1], [3, 4, 5], [0, 1, 4, 3], [1, 2, 5, 4],
+                [2, 0, 3, 5]]
+    for face, exp in zip(cells(faces), expected):
+        assert same_polygon(face, exp)
+
+
+def test_single_face_set(wedge_file):
+    reader, output = read(wedge_file)
+    top = output.GetBlock(2)
+    np.testing.assert_array_equal(
+        points(top), [[0, 0, 1], [1, 0, 1], [0, 1, 1]])
+    assert top.GetCellType(0) == vtk.VTK_TRIANGLE
+    assert same_polygon(cells(top)[0], [0, 1, 2])
+
+
+needs_shared_memory = pytest.mark.skipif(
+    petsc.shared_memory is None, reason="needs Python 3.8")
+
+
+@pytest.fixture
+def in_process(monkeypatch):
+    """
+    Read all files in a worker process with a known shared memory name
+    """
+    monkeypatch.setattr(PetscHDF5Reader, 'PROCESS_MIN_SIZE', 0)
+    monkeypatch.setattr(petsc.secrets, 'token_hex', lambda n: 'test')
+    return 'otter_test'
+
+
+def loaded(reader):
+    reader.load()
+    return reader.getVtkOutputPort().GetProducer().GetOutputDataObject(0)
+
+
+@needs_shared_memory
+def test_load_in_process(quad_file, in_process):
+    expected = loaded(PetscHDF5Reader(quad_file))
+    reader = PetscHDF5Reader(quad_file)
+    output = loaded(reader)
+
+    assert output.GetNumberOfBlocks() == expected.GetNumberOfBlocks()
+    for i in range(output.GetNumberOfBlocks()):
+        block = output.GetBlock(i)
+        exp = expected.GetBlock(i)
+        np.testing.assert_array_equal(points(block), points(exp))
+        assert cells(block) == cells(exp)
+        for data, exp_data in [(block.GetPointData(), exp.GetPointData()),
+                               (block.GetCellData(), exp.GetCellData())]:
+            assert data.GetNumberOfArrays() == exp_data.GetNumberOfArrays()
+            for j in range(data.GetNumberOfArrays()):
+                name = exp_data.GetArrayName(j)
+                np.testing.assert_array_equal(
+                    numpy_support.vtk_to_numpy(data.GetArray(name)),
+                    numpy_support.vtk_to_numpy(exp_data.GetArray(name)))
+    assert sorted(v.name for v in reader.getVariableInfo()) == \
+        ['disp', 'grad', 'k', 'u']
+    assert len(reader.getSideSets()) == 3
+    assert reader.getDimensionality() == 2
+
+    # the shared memory is unlinked once received
+    with pytest.raises(FileNotFoundError):
+        petsc.shared_memory.SharedMemory(in_process)
+
+
+@needs_shared_memory
+def test_progress_in_process(quad_file, in_process):
+    progress = []
+    reader = PetscHDF5Reader(quad_file)
+    reader.setProgressCallback(lambda f, text: progress.append((f, text)))
+    reader.load()
+    assert len(progress) > 0
+    assert all(0. <= f <= 1. for f, text in progress)
+    assert progress[-1][0] == 1.
+    assert 'MiB' in progress[-1][1]
+
+
+@needs_shared_memory
+def test_cancel_in_process(quad_file, in_process):
+    reader = PetscHDF5Reader(quad_file)
+    reader.setProgressCallback(lambda f, text: reader.cancel())
+    reader.load()
+    assert reader.isCancelled()
+    assert list(reader.getBlocks()) == []
+    with pytest.raises(FileNotFoundError):
+        petsc.shared_memory.SharedMemory(in_process)
+
+
+@needs_shared_memory
+def test_cancel_after_done(quad_file, in_process):
+    class CancelledReader(PetscHDF5Reader):
+        def _receive(self, conn):
+            # the worker already shared its arrays
+            assert super()._receive(conn) is not None
+            self.cancel()
+            return None
+
+    reader = CancelledReader(quad_file)
+    reader.load()
+    assert list(reader.getBlocks()) == []
+    with pytest.raises(FileNotFoundError):
+        petsc.shared_memory.SharedMemory(in_process)
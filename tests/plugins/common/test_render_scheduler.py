@@ -0,0 +1,84 @@
+import vtk
+import pytest
+from otter.plugins.common.RenderScheduler import RenderScheduler
+
+
+@pytest.fixture
+def window(qtbot):
+    window = vtk.vtkRenderWindow()
+    window.SetOffScreenRendering(1)
+    window.SetSize(50, 50)
+    renderer = vtk.vtkRenderer()
+    window.AddRenderer(renderer)
+    source = vtk.vtkSphereSource()
+    mapper = vtk.vtkPolyDataMapper()
+    mapper.SetInputConnection(source.GetOutputPort())
+    actor = vtk.vtkActor()
+    actor.SetMapper(mapper)
+    renderer.AddActor(actor)
+    window.Render()
+    yield window
+    window.Finalize()
+
+
+def count_renders(window):
+    renders = []
+    window.AddObserver('StartEvent', lambda obj, event: renders.append(1))
+    return renders
+
+
+def test_requests_merged(qtbot, window):
+    scheduler = RenderScheduler(window)
+    renders = count_renders(window)
+    assert not scheduler.isDirty()
+
+    for i in range(3):
+        scheduler.requestRender()
+    assert scheduler.isDirty()
+    assert len(renders) == 0
+    qtbot.waitUntil(lambda: not scheduler.isDirty())
+    qtbot.wait(50)
+    assert len(renders) == 1
+    assert scheduler.renderedFrames() == 1
+    assert scheduler.skippedFrames() == 2
+
+    # rendering resets the dirty flag, so the next request renders again
+    scheduler.requestRender()
+    assert scheduler.isDirty()
+    qtbot.waitUntil(lambda: not scheduler.isDirty())
+    qtbot.wait(50)
+    assert len(renders) == 2
+    assert scheduler.renderedFrames() == 2
+    assert scheduler.skippedFrames() == 2
+
+
+def test_idle(qtbot, window):
+    scheduler = RenderScheduler(window)
+    renders = count_renders(window)
+    qtbot.wait(50)
+    assert len(renders) == 0
+    assert scheduler.renderedFrames() == 0
+
+
+def test_camera_modified(qtbot, window):
+    scheduler = RenderScheduler(window)
+    renders = count_renders(window)
+    camera = window.GetRenderers().GetFirstRenderer().GetActiveCamera()
+    camera.Azimuth(10)
+    camera.Elevation(10)
+    assert scheduler.isDirty()
+    qtbot.waitUntil(lambda: not scheduler.isDirty())
+    qtbot.wait(50)
+    assert len(renders) == 1
+
+
+def test_rendered_by_someone_else(qtbot, window):
+    scheduler = RenderScheduler(window)
+    renders = count_renders(window)
+    scheduler.requestRender()
+    # e.g. the interactor renders before the scheduler gets to it
+    window.Render()
+    assert not scheduler.isDirty()
+    qtbot.wait(50)
+    assert len(renders) == 1
+    assert scheduler.renderedFrames() == 0
@@ -0,0 +1,103 @@
+import vtk
+from otter.plugins.common.TimeStepCache import TimeStepCache
+
+
+def array(name, n_values, value=0.):
+    arr = vtk.vtkDoubleArray()
+    arr.SetName(name)
+    arr.SetNumberOfTuples(n_values)
+    arr.Fill(value)
+    return arr
+
+
+def entry(name='u', mib=1):
+    """
+    Arrays of a single leaf taking `mib` MiB
+    """
+    return {1: (None, [(True, array(name, mib * 1024 * 128))])}
+
+
+def test_put_get():
+    cache = TimeStepCache(10)
+    leaves = entry()
+    cache.put(0, ['u'], leaves)
+    assert cache.has(0, ['u'])
+    assert cache.has(0, [])
+    assert not cache.has(0, ['u', 'v'])
+    assert not cache.has(1, ['u'])
+    assert cache.get(0, ['u']) is leaves
+    assert cache.get(0, ['v']) is None
+
+    cache.clear()
+    assert not cache.has(0, ['u'])
+
+
+def test_replace():
+    cache = TimeStepCache(10)
+    cache.put(0, ['u'], entry())
+    leaves = entry('v')
+    cache.put(0, ['u', 'v'], leaves)
+    assert cache.get(0, ['v']) is leaves
+
+
+def test_eviction():
+    cache = TimeStepCache(2)
+    cache.put(0, ['u'], entry())
+    cache.put(1, ['u'], entry())
+    # step 0 is used, so step 1 is the least recently used one
+    assert cache.get(0, ['u']) is not None
+    cache.put(2, ['u'], entry())
+    assert cache.has(0, ['u'])
+    assert not cache.has(1, ['u'])
+    assert cache.has(2, ['u'])
+
+
+def test_oversized_entry():
+    # the last entry is kept even if it is larger than the cache
+    cache = TimeStepCache(1)
+    cache.put(0, ['u'], entry())
+    cache.put(1, ['u'], entry(mib=3))
+    assert not cache.has(0, ['u'])
+    assert cache.has(1, ['u'])
+
+
+def multi_block(value):
+    mb = vtk.vtkMultiBlockDataSet()
+    for i in range(2):
+        source = vtk.vtkSphereSource()
+        source.Update()
+        pd = source.GetOutput()
+        pd.GetPointData().AddArray(
+            array('u', pd.GetNumberOfPoints(), value + i))
+        pd.GetCellData().AddArray(array('e', pd.GetNumberOfCells(), value))
+        mb.SetBlock(i, pd)
+    return mb
+
+
+def test_extract_apply():
+    source = multi_block(1.)
+    leaves = TimeStepCache.extract(source, ['u', 'e'], points=True)
+    assert sorted(leaves.keys()) == [1, 2]
+    points, arrays = leaves[2]
+    assert points is source.GetBlock(1).GetPoints()
+    assert [nodal for nodal, arr in arrays] == [True, False]
+
+    target = multi_block(0.)
+    TimeStepCache.apply(target, leaves)
+    block = target.GetBlock(1)
+    assert block.GetPointData().GetArray('u').GetValue(0) == 2.
+    assert block.GetCellData().GetArray('e').GetValue(0) == 1.
+    assert block.GetPoints() is source.GetBlock(1).GetPoints()
+
+
+def test_apply_names_remove():
+    leaves = TimeStepCache.extract(multi_block(1.), ['u', 'e'])
+    target = multi_block(0.)
+    TimeStepCache.remove(target, ['e'])
+    assert target.GetBlock(0).GetCellData().GetArray('e') is None
+
+    # 'e' was disabled since the arrays were cached
+    TimeStepCache.apply(target, leaves, ['u'])
+    block = target.GetBlock(1)
+    assert block.GetPointData().GetArray('u').GetValue(0) == 2.
+    assert block.GetCellData().GetArray('e') is None
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from otter.plugins.computed_vs_measured.Comparison import Comparison
+from otter.plugins.computed_vs_measured.Comparison import readValues
+
+
+@pytest.fixture
+def files(tmp_path):
+    contents = {
+        'm1.csv': 'time,a,b\n1,2,4\n',
+        'c1.csv': 'time,b,a\n1,5,2\n',
+        'm2.csv': 'time,a\n1,0\n',
+        'c2.csv': 'time,a\n1,1\n',
+        'm3.csv': 'time,a\n1,1\n',
+        'c3.csv': 'time,x\n1,1\n',
+        'bad.csv': 'time,a\n',
+    }
+    names = {}
+    for name, text in contents.items():
+        names[name] = str(tmp_path / name)
+        with open(names[name], 'w') as f:
+            f.write(text)
+    return names
+
+
+def test_read_values(files):
+    values = readValues(files['m1.csv'])
+    assert list(values.index) == ['a', 'b']
+    np.testing.assert_array_equal(values, [2, 4])
+
+
+def test_points(files):
+    comparison = Comparison([[files['m1.csv'], files['c1.csv']]])
+    points = comparison.points
+    # values are matched by name, not by position
+    assert points.loc[(0, 'a'), 'computed'] == 2
+    assert points.loc[(0, 'b'), 'computed'] == 5
+    assert points.loc[(0, 'b'), 'abs_err'] == 1
+    assert points.loc[(0, 'b'), 'rel_err'] == 25
+    assert comparison.range() == (2, 5)
+
+
+def test_skipped(files):
+    comparison = Comparison([
+        [files['m1.csv'], files['c1.csv']],
+        [files['m3.csv'], files['c3.csv']],
+        [files['bad.csv'], files['c2.csv']],
+    ])
+    assert comparison.skipped == {
+        1: "different values",
+        2: "unreadable file"
+    }
+    assert list(comparison.points.index.get_level_values('pair')) == [0, 0]
+
+
+def test_nothing_to_compare(files):
+    comparison = Comparison([[files['bad.csv'], files['c2.csv']]])
+    assert len(comparison.points) == 0
+    assert comparison.range() is None
+
+
+def test_stats(files):
+    comparison = Comparison([
+        [files['m1.csv'], files['c1.csv']],
+        [files['m2.csv'], files['c2.csv']],
+    ])
+    stats = comparison.stats()
+    assert stats.loc[0, 'count'] == 2
+    assert stats.loc[0, 'max_abs_err'] == 1
+    assert stats.loc[0, 'mean_abs_err'] == 0.5
+    assert stats.loc[0, 'max_rel_err'] == 25
+    # a zero measured value has no relative error
+    assert stats.loc[1, 'max_abs_err'] == 1
+    assert np.isnan(stats.loc[1, 'max_rel_err'])
+
+
+def test_outside(files):
+    comparison = Comparison([
+        [files['m1.csv'], files['c1.csv']],
+        [files['m2.csv'], files['c2.csv']],
+    ])
+    assert list(comparison.outside(abs_err=0.5)) == [1, 1]
+    assert list(comparison.outside(rel_err=30)) == [0, 1]
+    assert list(comparison.outside()) == [0, 0]
@@ -0,0 +1,88 @@
+import os
+from otter.plugins.computed_vs_measured.Pairing import Pairing
+
+
+def path(*parts):
+    return os.path.normcase(os.path.abspath(os.path.join(*parts)))
+
+
+def test_key_gold_dir():
+    pairing = Pairing()
+    assert pairing.key(path('test', 'gold', 'out.csv')) == \
+        (path('test', 'out.csv'), True)
+    assert pairing.key(path('test', 'out.csv')) == \
+        (path('test', 'out.csv'), False)
+
+
+def test_key_closest_gold_dir():
+    pairing = Pairing()
+    key, measured = pairing.key(path('gold', 'test', 'gold', 'out.csv'))
+    assert measured
+    assert key == path('gold', 'test', 'out.csv')
+
+
+def test_key_gold_suffix():
+    pairing = Pairing()
+    assert pairing.key(path('test', 'out_gold.csv')) == \
+        (path('test', 'out.csv'), True)
+    # the suffix alone is not a name
+    assert pairing.key(path('test', '_gold.csv')) == \
+        (path('test', '_gold.csv'), False)
+
+
+def test_custom_settings():
+    pairing = Pairing(gold_dirs='reference', gold_suffixes='.ref')
+    assert pairing.key(path('reference', 'out.csv')) == \
+        (path('out.csv'), True)
+    assert pairing.key(path('out.ref.csv')) == (path('out.csv'), True)
+    assert pairing.key(path('gold', 'out.csv')) == \
+        (path('gold', 'out.csv'), False)
+
+
+def test_add():
+    pairing = Pairing()
+    files = [
+        path('b', 'out.csv'),
+        path('a', 'gold', 'out.csv'),
+        path('b', 'gold', 'out.csv'),
+        path('a', 'out.csv'),
+        path('c', 'out.csv')
+    ]
+    pairs = pairing.add(files)
+    assert pairs == [
+        [path('a', 'gold', 'out.csv'), path('a', 'out.csv')],
+        [path('b', 'gold', 'out.csv'), path('b', 'out.csv')]
+    ]
+    assert pairing.pairs() == pairs
+    assert pairing.unmatched() == {path('c', 'out.csv'): "no measured file"}
+
+
+def test_add_incremental():
+    pairing = Pairing()
+    assert pairing.add([path('a', 'out.csv')]) == []
+    assert pairing.unmatched() == {path('a', 'out.csv'): "no measured file"}
+
+    pairs = pairing.add([path('a', 'out_gold.csv')])
+    assert pairs == [[path('a', 'out_gold.csv'), path('a', 'out.csv')]]
+    assert pairing.unmatched() == {}
+
+    # files that were added before are skipped
+    assert pairing.add([path('a', 'out.csv')]) == []
+    assert len(pairing.pairs()) == 1
+
+
+def test_duplicates():
+    pairing = Pairing()
+    pairing.add([path('a', 'gold', 'out.csv'), path('a', 'out.csv')])
+    pairing.add([path('a', 'out_gold.csv')])
+    unmatched = pairing.unmatched()
+    assert list(unmatched.keys()) == [path('a', 'out_gold.csv')]
+    assert unmatched[path('a', 'out_gold.csv')].startswith("duplicate of")
+
+
+def test_clear():
+    pairing = Pairing()
+    pairing.add([path('a', 'gold', 'out.csv'), path('a', 'out.csv')])
+    pairing.clear()
+    assert pairing.pairs() == []
+    assert pairing.unmatched() == {}
@@ -0,0 +1,79 @@
+import pytest
+from otter.plugins.csvplotter.Dashboard import Dashboard
+from .test_moose_data_frame import write
+
+
+@pytest.fixture
+def files(tmp_path):
+    names = []
+    for i in range(3):
+        name = str(tmp_path / 'out{}.csv'.format(i))
+        write(name, 'time,a,b\n0,{0},1\n1,{0},2\n'.format(i))
+        names.append(name)
+    return names
+
+
+@pytest.fixture
+def dashboard(qtbot):
+    dashboard = Dashboard()
+    # ticks are run by the tests
+    dashboard.TICK = 1000000
+    yield dashboard
+    dashboard.setFiles([])
+
+
+def tick(qtbot, dashboard):
+    """
+    Run a tick and wait for its reads
+
+    @return List of lists of files passed by `updated`
+    """
+    updates = []
+    dashboard.updated.connect(updates.append)
+    with qtbot.waitSignal(dashboard.updated):
+        dashboard.onTick()
+    # nothing else is emitted for the tick
+    qtbot.wait(100)
+    dashboard.updated.disconnect(updates.append)
+    return updates
+
+
+def test_single_update_per_tick(qtbot, files, dashboard):
+    dashboard.setFiles(files, ['time', 'a'])
+    updates = tick(qtbot, dashboard)
+    assert len(updates) == 1
+    assert sorted(updates[0]) == files
+    for i, name in enumerate(files):
+        data = dashboard.data(name)
+        assert list(data.data.columns) == ['time', 'a']
+        assert list(data.data['a']) == [i, i]
+        assert data.first_new_row == 0
+
+    write(files[0], '2,0,3\n', 'a')
+    write(files[2], '2,2,3\n', 'a')
+    dashboard.onFileChanged(files[0])
+    dashboard.onFileChanged(files[2])
+    updates = tick(qtbot, dashboard)
+    assert len(updates) == 1
+    assert sorted(updates[0]) == [files[0], files[2]]
+    assert len(dashboard.data(files[0]).data) == 3
+    assert dashboard.data(files[0]).first_new_row == 2
+    assert len(dashboard.data(files[1]).data) == 2
+
+
+def test_added_columns(qtbot, files, dashboard):
+    dashboard.setFiles(files, ['time', 'a'])
+    tick(qtbot, dashboard)
+    dashboard.setColumns(['time', 'b'])
+    updates = tick(qtbot, dashboard)
+    assert len(updates) == 1
+    assert sorted(updates[0]) == files
+    data = dashboard.data(files[1]).data
+    assert sorted(data.columns) == ['a', 'b', 'time']
+    assert list(data['b']) == [1, 2]
+
+    # nothing new to read
+    dashboard.setColumns(['time', 'a'])
+    dashboard.onTick()
+    qtbot.wait(100)
+    assert dashboard.data(files[1]).data is data
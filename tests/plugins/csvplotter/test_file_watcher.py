@@ -0,0 +1,103 @@
+import os
+import time
+import pytest
+from otter.plugins.csvplotter.FileWatcher import FileWatcher
+
+
+@pytest.fixture
+def watcher(qtbot):
+    watcher = FileWatcher()
+    watcher.DEBOUNCE = 100
+    watcher.MAX_DELAY = 600
+    yield watcher
+    watcher.removeAllPaths()
+
+
+def record(watcher):
+    """
+    @return List getting (time, path) of every reported change
+    """
+    changes = []
+    watcher.fileChanged.connect(
+        lambda path: changes.append((time.monotonic(), path)))
+    return changes
+
+
+def write(path, text, mode='a'):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def test_debounce_per_file(qtbot, tmp_path, watcher):
+    a = str(tmp_path / 'a.csv')
+    b = str(tmp_path / 'b.csv')
+    write(a, 'x\n', 'w')
+    write(b, 'x\n', 'w')
+    watcher.addPath(a)
+    watcher.addPath(b)
+    changes = record(watcher)
+
+    start = time.monotonic()
+    write(b, '1\n')
+    # 'a' keeps being written to for longer than the debounce time
+    for i in range(8):
+        write(a, '{}\n'.format(i))
+        last_write = time.monotonic()
+        qtbot.wait(30)
+    qtbot.waitUntil(lambda: len(changes) == 2)
+    qtbot.wait(300)
+
+    assert [path for t, path in changes] == [b, a]
+    t_b, t_a = changes[0][0], changes[1][0]
+    # 'b' did not wait for 'a'
+    assert t_b < last_write
+    assert t_b - start >= watcher.DEBOUNCE / 1000 - 0.02
+    assert t_a - last_write >= watcher.DEBOUNCE / 1000 - 0.02
+
+
+def test_unfinished_line(qtbot, tmp_path, watcher):
+    a = str(tmp_path / 'a.csv')
+    write(a, 'x\n', 'w')
+    watcher.addPath(a)
+    changes = record(watcher)
+
+    # finishing the line reports the change
+    write(a, '1,')
+    qtbot.wait(250)
+    assert changes == []
+    write(a, '2\n')
+    qtbot.waitUntil(lambda: len(changes) == 1)
+
+    # a line that is never finished is reported after MAX_DELAY
+    start = time.monotonic()
+    write(a, '3,')
+    qtbot.waitUntil(lambda: len(changes) == 2, timeout=2000)
+    assert changes[1][0] - start >= watcher.MAX_DELAY / 1000 - 0.02
+
+
+def test_replaced_file(qtbot, tmp_path, watcher):
+    a = str(tmp_path / 'a.csv')
+    write(a, 'x\n', 'w')
+    watcher.addPath(a)
+    changes = record(watcher)
+
+    # written to a new file that is renamed over the watched one
+    tmp = str(tmp_path / 'a.csv.tmp')
+    write(tmp, 'x\n1\n', 'w')
+    os.replace(tmp, a)
+    qtbot.waitUntil(lambda: len(changes) == 1)
+    assert changes[0][1] == a
+    assert watcher.files() == [a]
+
+    # the new file is watched
+    write(a, '2\n')
+    qtbot.waitUntil(lambda: len(changes) == 2)
+
+
+def test_created_later(qtbot, tmp_path, watcher):
+    a = str(tmp_path / 'a.csv')
+    watcher.addPath(a)
+    changes = record(watcher)
+    write(a, 'x\n', 'w')
+    qtbot.waitUntil(lambda: len(changes) == 1)
+    assert changes[0][1] == a
@@ -0,0 +1,206 @@
+import os
+import numpy as np
+import pandas
+import pytest
+from otter.plugins.csvplotter.MooseDataFrame import MooseDataFrame
+from otter.plugins.csvplotter.PostprocessorReader import PostprocessorReader
+
+
+def write(path, text, mode='w'):
+    """
+    Write into a file and move its modification time forward, so the change
+    is seen even on file systems with a coarse time stamp resolution
+    """
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, mode) as f:
+        f.write(text)
+    mtime = max(os.stat(path).st_mtime_ns, mtime + 1000000000)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def rows(start, end):
+    return ''.join('{},{},{}\n'.format(i * 0.5, i, i * i)
+                   for i in range(start, end))
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = str(tmp_path / 'out.csv')
+    write(path, 'time,step,u\n' + rows(0, 10))
+    return path
+
+
+def test_read(csv_file):
+    df = MooseDataFrame(csv_file)
+    assert list(df.data.columns) == ['time', 'step', 'u']
+    assert len(df.data) == 10
+    assert df.first_new_row == 0
+    assert df.update() == MooseDataFrame.NOCHANGE
+
+
+def test_missing_file(tmp_path):
+    df = MooseDataFrame(str(tmp_path / 'none.csv'))
+    assert df.update() == MooseDataFrame.INVALID
+    assert df.empty()
+
+
+def test_columns(csv_file):
+    reader = PostprocessorReader(csv_file, columns=['u'])
+    assert list(reader.data.columns) == ['u']
+    assert list(reader.variables()) == ['time', 'step', 'u']
+    assert 'step' in reader
+
+
+def test_load_drop_columns(csv_file):
+    reader = PostprocessorReader(csv_file, columns=[])
+    assert len(reader.data.columns) == 0
+
+    reader.loadColumns(['time', 'u'])
+    assert list(reader.data.columns) == ['time', 'u']
+    np.testing.assert_array_equal(reader.data['u'], np.arange(10) ** 2)
+
+    reader.dropColumns(['time'])
+    assert list(reader.data.columns) == ['u']
+
+    # accessing a column loads it
+    np.testing.assert_array_equal(reader['step'], np.arange(10))
+    assert 'step' in reader.data.columns
+
+
+def test_append(csv_file):
+    df = MooseDataFrame(csv_file)
+    write(csv_file, rows(10, 15), 'a')
+    assert df.update() == MooseDataFrame.UPDATED
+    assert df.first_new_row == 10
+    pandas.testing.assert_frame_equal(df.data, pandas.read_csv(csv_file))
+
+
+def test_append_many(csv_file):
+    df = MooseDataFrame(csv_file)
+    # enough rows to grow the column buffers several times
+    for start in range(10, 5000, 490):
+        write(csv_file, rows(start, start + 490), 'a')
+        df.update()
+        assert df.first_new_row == start
+    expected = pandas.read_csv(csv_file)
+    pandas.testing.assert_frame_equal(df.data, expected)
+    assert df.data['step'].dtype == np.int64
+
+
+def test_append_columns(csv_file):
+    df = MooseDataFrame(csv_file, columns=['u'])
+    write(csv_file, rows(10, 12), 'a')
+    df.update()
+    assert list(df.data.columns) == ['u']
+    np.testing.assert_array_equal(df.data['u'], np.arange(12) ** 2)
+
+
+def test_partial_row(csv_file):
+    df = MooseDataFrame(csv_file)
+    write(csv_file, '5,10,1', 'a')
+    df.update()
+    assert len(df.data) == 11
+    assert df.complete_rows == 10
+
+    # the row is read again once its line is finished
+    write(csv_file, '00\n', 'a')
+    df.update()
+    assert df.first_new_row == 10
+    assert df.complete_rows == 11
+    assert df.data['u'].iloc[-1] == 100
+
+
+def test_truncated(csv_file):
+    df = MooseDataFrame(csv_file)
+    write(csv_file, 'time,step,u\n' + rows(0, 3))
+    assert df.update() == MooseDataFrame.UPDATED
+    assert df.first_new_row == 0
+    assert len(df.data) == 3
+
+
+def test_header_changed(csv_file):
+    df = MooseDataFrame(csv_file)
+    write(csv_file, 'time,step,v\n' + rows(0, 12))
+    df.update()
+    assert df.first_new_row == 0
+    assert list(df.data.columns) == ['time', 'step', 'v']
+    assert len(df.data) == 12
+
+
+def test_index(csv_file):
+    df = MooseDataFrame(csv_file, index='time')
+    write(csv_file, rows(10, 12), 'a')
+    df.update()
+    assert df.data.index.name == 'time'
+    np.testing.assert_array_equal(df.data.index, np.arange(12) * 0.5)
+
+
+def test_no_cache(csv_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(MooseDataFrame, 'CACHE_MIN_SIZE', 0)
+    df = MooseDataFrame(csv_file)
+    df.waitForCache()
+    assert os.listdir(str(tmp_path)) == ['out.csv']
+
+
+def test_cache(csv_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(MooseDataFrame, 'CACHE_MIN_SIZE', 0)
+    cache_dir = str(tmp_path / 'cache')
+    df = MooseDataFrame(csv_file, cache_dir=cache_dir, columns=['step'])
+    df.waitForCache()
+    assert len(os.listdir(cache_dir)) == 1
+
+    cached = MooseDataFrame(csv_file, cache_dir=cache_dir, columns=['step'])
+    assert cached._base is not None
+    # column types are kept
+    assert cached.data['step'].dtype == np.int64
+    cached.loadColumns(['u'])
+    expected = pandas.read_csv(csv_file)[['step', 'u']]
+    pandas.testing.assert_frame_equal(cached.data, expected)
+
+    # rows appended to a cached file are read from the file
+    write(csv_file, rows(10, 12), 'a')
+    cached.update()
+    assert cached.first_new_row == 10
+    pandas.testing.assert_frame_equal(
+        cached.data, pandas.read_csv(csv_file)[['step', 'u']])
+
+
+def test_cache_stale(csv_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(MooseDataFrame, 'CACHE_MIN_SIZE', 0)
+    cache_dir = str(tmp_path / 'cache')
+    MooseDataFrame(csv_file, cache_dir=cache_dir).waitForCache()
+    write(csv_file, 'time,step,u\n' + rows(0, 4))
+
+    df = MooseDataFrame(csv_file, cache_dir=cache_dir)
+    assert df._base is None
+    assert len(df.data) == 4
+
+
+def test_usecols(csv_file, monkeypatch):
+    # only columns in use are handed to the CSV parser
+    calls = []
+    read_csv = pandas.read_csv
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs.get('usecols'))
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pandas, 'read_csv', spy)
+    reader = PostprocessorReader(csv_file, columns=['u'])
+    assert calls[-1] == ['u']
+
+    del calls[:]
+    reader.loadColumns(['time'])
+    assert calls == [['time']]
+
+    del calls[:]
+    write(csv_file, rows(10, 11), 'a')
+    reader.update()
+    assert calls == [['time', 'u']]
+
+    del calls[:]
+    reader.dropColumns(['time'])
+    write(csv_file, rows(11, 12), 'a')
+    reader.update()
+    assert calls == [['u']]
+    assert list(reader.data.columns) == ['u']
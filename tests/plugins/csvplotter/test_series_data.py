@@ -0,0 +1,98 @@
+import numpy as np
+from otter.plugins.csvplotter.SeriesData import SeriesData
+
+
+def test_append():
+    data = SeriesData()
+    assert len(data) == 0
+    assert data.xmin is None
+
+    x = np.arange(3000, dtype=np.float64)
+    for i in range(0, len(x), 700):
+        data.append(x[i:i + 700], 2 * x[i:i + 700])
+    assert len(data) == len(x)
+    np.testing.assert_array_equal(data.x, x)
+    np.testing.assert_array_equal(data.y, 2 * x)
+
+
+def test_append_mismatched():
+    data = SeriesData()
+    data.append([1, 2, 3], [4, 5])
+    assert len(data) == 2
+
+
+def test_extrema():
+    data = SeriesData()
+    data.append([0, 1, 2], [5, np.nan, -1])
+    assert (data.xmin, data.xmax) == (0, 2)
+    assert (data.ymin, data.ymax) == (-1, 5)
+
+    data.append([3], [np.nan])
+    assert (data.ymin, data.ymax) == (-1, 5)
+    data.append([4], [7])
+    assert (data.xmax, data.ymax) == (4, 7)
+
+    data.clear()
+    assert data.ymin is None
+
+
+def test_extrema_nan_only():
+    data = SeriesData()
+    data.append([0], [np.nan])
+    assert data.ymin is None
+    assert data.ymax is None
+
+
+def test_decimate_small():
+    data = SeriesData()
+    data.append(np.arange(10), np.arange(10))
+    x, y = data.decimate(2, 5, 100)
+    # the closest values outside of the range are kept
+    np.testing.assert_array_equal(x, [1, 2, 3, 4, 5, 6])
+
+
+def test_decimate():
+    n = 100000
+    x = np.linspace(0, 1, n)
+    y = np.sin(20 * x)
+    y[12345] = 10
+    y[54321] = -10
+    data = SeriesData()
+    data.append(x, y)
+
+    xd, yd = data.decimate(0, 1, 100)
+    assert len(xd) <= 4 * 100
+    assert xd[0] == x[0]
+    assert xd[-1] == x[-1]
+    # peaks stay visible
+    assert yd.max() == 10
+    assert yd.min() == -10
+    assert np.all(np.diff(xd) > 0)
+
+
+def test_decimate_log():
+    x = np.geomspace(1e-3, 1e3, 100000)
+    data = SeriesData()
+    data.append(x, x)
+    xd, yd = data.decimate(1e-3, 1e3, 60, log=True)
+    assert len(xd) <= 4 * 60
+    # buckets are equally wide on the log scale
+    counts, unused = np.histogram(np.log10(xd), bins=6)
+    assert counts.min() > 0
+
+
+def test_decimate_unsorted():
+    data = SeriesData()
+    data.append(np.arange(5000), np.arange(5000))
+    data.append([0], [0])
+    x, y = data.decimate(0, 5000, 10)
+    assert len(x) == 5001
+
+
+def test_decimate_nan():
+    data = SeriesData()
+    y = np.full(10000, np.nan)
+    y[5000] = 1
+    data.append(np.arange(10000), y)
+    x, yd = data.decimate(0, 10000, 10)
+    assert 5000 in x
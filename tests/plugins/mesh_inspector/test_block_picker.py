@@ -0,0 +1,118 @@
+import vtk
+import numpy as np
+import pytest
+from vtk.util import numpy_support
+from otter.plugins.mesh_inspector.BlockPicker import BlockPicker
+
+
+def plane(z, resolution=4):
+    """
+    Unit square at height `z` split into quads
+    """
+    source = vtk.vtkPlaneSource()
+    source.SetOrigin(-.5, -.5, z)
+    source.SetPoint1(.5, -.5, z)
+    source.SetPoint2(-.5, .5, z)
+    source.SetResolution(resolution, resolution)
+    source.Update()
+    return source.GetOutput()
+
+
+@pytest.fixture
+def scene():
+    """
+    Renderer looking down the z-axis at a plane at z = 0 ('near') above a
+    plane at z = -1 ('far')
+    """
+    window = vtk.vtkRenderWindow()
+    window.SetOffScreenRendering(1)
+    window.SetSize(200, 200)
+    renderer = vtk.vtkRenderer()
+    window.AddRenderer(renderer)
+    picker = BlockPicker(renderer)
+    planes = {}
+    # added far first, so the order of adding does not decide
+    for key, z in [('far', -1.), ('near', 0.)]:
+        geometry = plane(z)
+        mapper = vtk.vtkPolyDataMapper()
+        mapper.SetInputData(geometry)
+        actor = vtk.vtkActor()
+        actor.SetMapper(mapper)
+        renderer.AddActor(actor)
+        picker.add(key, actor, geometry)
+        planes[key] = (actor, geometry)
+    camera = renderer.GetActiveCamera()
+    camera.SetPosition(0, 0, 5)
+    camera.SetFocalPoint(0, 0, 0)
+    renderer.ResetCameraClippingRange()
+    yield renderer, picker, planes
+    window.Finalize()
+
+
+def display(renderer, point):
+    """
+    @return display coordinates of a world point
+    """
+    renderer.SetWorldPoint(*point, 1.)
+    renderer.WorldToDisplay()
+    x, y, z = renderer.GetDisplayPoint()
+    return x, y
+
+
+def test_nearest_block(scene):
+    renderer, picker, planes = scene
+    picked = picker.pick(*display(renderer, (.1, .1, 0.)))
+    assert picked.key == 'near'
+    assert picked.geometry is planes['near'][1]
+    np.testing.assert_allclose(picked.position, [.1, .1, 0.], atol=1e-3)
+    # the cell of the point
+    assert picked.cell_id == 10
+
+    # nothing outside of the planes
+    assert picker.pick(*display(renderer, (2., 2., 0.))) is None
+
+
+def test_built_locators(scene):
+    renderer, picker, planes = scene
+    picker.build()
+    for i in range(100):
+        picked = picker.pick(*display(renderer, (.1, .1, 0.)))
+        assert picked.key == 'near'
+        if picker.isReady():
+            break
+
+
+def test_hidden_block(scene):
+    renderer, picker, planes = scene
+    planes['near'][0].VisibilityOff()
+    picked = picker.pick(*display(renderer, (.1, .1, 0.)))
+    assert picked.key == 'far'
+
+
+def test_hidden_cells(scene):
+    renderer, picker, planes = scene
+    geometry = planes['near'][1]
+    ghosts = np.zeros(geometry.GetNumberOfCells(), dtype=np.uint8)
+    ghosts[10] = vtk.vtkDataSetAttributes.HIDDENCELL
+    arr = numpy_support.numpy_to_vtk(ghosts, deep=True)
+    arr.SetName(vtk.vtkDataSetAttributes.GhostArrayName())
+    geometry.GetCellData().AddArray(arr)
+
+    picked = picker.pick(*display(renderer, (.1, .1, 0.)))
+    assert picked.key == 'far'
+    # the next cell is not hidden
+    picked = picker.pick(*display(renderer, (.3, .1, 0.)))
+    assert picked.key == 'near'
+    assert picked.cell_id == 11
+
+
+def test_closest_point(scene):
+    renderer, picker, planes = scene
+    geometry = planes['near'][1]
+    for pt, corner in [((.03, .03, 0.), (0., 0., 0.)),
+                       ((.22, .04, 0.), (.25, 0., 0.)),
+                       ((.04, .2, 0.), (0., .25, 0.))]:
+        picked = picker.pick(*display(renderer, pt))
+        assert picked.cell_id == 10
+        np.testing.assert_allclose(
+            geometry.GetPoint(picked.point_id), corner, atol=1e-12)